@@ -1,14 +1,18 @@
-from analysis_mock import analysis_mock
-from transcript_mock import transcript_mock
+from startup import StartupProfile
+# Started first so the start-up report covers the imports below
+startup_profile = StartupProfile()
+
 import os
-import tempfile
-import shutil
+import asyncio
+import json
 import time
 import secrets
-from typing import Dict, Optional, List, Union
+import uuid
+import hashlib
+from typing import Dict, Optional
 from pydantic import BaseModel, Field
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends, Header, Request
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import FastAPI, HTTPException, Form, Depends, Request
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import APIKeyHeader
@@ -16,9 +20,22 @@ from starlette.status import HTTP_403_FORBIDDEN, HTTP_429_TOO_MANY_REQUESTS
 import uvicorn
 from dotenv import load_dotenv
 import pathlib
+from contextlib import asynccontextmanager
+startup_profile.mark("import web framework")
 
 from transcription import AudioTranscriber
 from meeting_analysis import MeetingAnalyzer
+from jobs import JobManager, QueueFullError, JOB_COMPLETED
+from cache import MemoryLRUCache, SQLiteLRUCache
+from ratelimit import MemoryRateLimiter, SQLiteRateLimiter
+from outbound import OutboundHTTP, RetryPolicy, TimeoutPolicy, TRANSCRIPTION_BUDGET
+from scheduler import OutboundScheduler, call_context, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from ingest import ingest_upload
+from hedging import Hedger
+from metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, Counter, Gauge, Histogram, ERRORS
+import tracing
+from tracing import JSONLExporter, OTLPExporter, span, current_span
+startup_profile.mark("import pipeline modules")
 
 # Load environment variables from .env.local file
 env_path = pathlib.Path('.') / '.env.local'
@@ -43,11 +60,130 @@ api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
 print(f"API Key for development: {API_KEY}")
 
-# Rate limiting configuration
-RATE_LIMIT_DURATION = 3600  # 1 hour in seconds
-RATE_LIMIT_REQUESTS = 100   # Number of requests allowed per duration
-# Dictionary to store request counts: {ip_address: (count, timestamp)}
-request_tracker = {}
+# Rate limiting configuration: each client (IP address, per API key when a valid one is sent)
+# may spend RATE_LIMIT_REQUESTS units per RATE_LIMIT_DURATION; a plain request costs one unit
+RATE_LIMIT_DURATION = float(os.environ.get("RATE_LIMIT_DURATION", "3600"))  # Seconds
+# Sized in units: the default keeps the former 100 requests per hour for audio uploads, and allows
+# about 333 analyses or 1000 plain requests per hour, which the former limit capped at 100 too
+RATE_LIMIT_REQUESTS = float(os.environ.get("RATE_LIMIT_REQUESTS", "1000"))
+# "memory" (per process) or "sqlite" (shared by all workers using RATE_LIMIT_PATH)
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_PATH = os.environ.get("RATE_LIMIT_PATH", os.path.join("cache", "ratelimit.sqlite3"))
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000"))  # Clients tracked by the memory backend
+# Units charged for audio uploads and for transcript analysis requests
+RATE_LIMIT_UPLOAD_COST = float(os.environ.get("RATE_LIMIT_UPLOAD_COST", "10"))
+RATE_LIMIT_ANALYSIS_COST = float(os.environ.get("RATE_LIMIT_ANALYSIS_COST", "3"))
+# Units charged for polling a job's status; free by default, so clients can follow their own jobs
+RATE_LIMIT_POLL_COST = float(os.environ.get("RATE_LIMIT_POLL_COST", "0"))
+# Paths that are not rate limited
+RATE_LIMIT_EXEMPT_PATHS = ("/api/docs", "/api/redoc", "/api/openapi.json", "/static/", "/metrics")
+
+# OpenAI calls: shared keep-alive connection pool, retries of connection errors, 429 and 5xx
+# responses (exponential backoff with jitter, honoring Retry-After), and timeouts growing
+# with the request size from OPENAI_TIMEOUT_SECONDS by the slowest tolerated rates
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "4"))
+OPENAI_RETRY_MAX_DELAY = float(os.environ.get("OPENAI_RETRY_MAX_DELAY", "30"))  # Seconds
+OPENAI_TIMEOUT_SECONDS = float(os.environ.get("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_MIN_UPLOAD_KBPS = float(os.environ.get("OPENAI_MIN_UPLOAD_KBPS", "256"))        # KB/s
+OPENAI_MIN_PROCESSING_KBPS = float(os.environ.get("OPENAI_MIN_PROCESSING_KBPS", "512"))  # KB/s
+# Provider rate limits the process keeps under, per model (0: no limit). Calls that would exceed
+# them wait in a queue served by priority (extract-* requests first) and round-robin between jobs
+OPENAI_RPM = int(os.environ.get("OPENAI_RPM", "0"))
+OPENAI_TPM = int(os.environ.get("OPENAI_TPM", "0"))
+OPENAI_TRANSCRIPTION_RPM = int(os.environ.get("OPENAI_TRANSCRIPTION_RPM", "0"))
+# Hedged requests: a transcription or analysis call slower than the HEDGE_PERCENTILE of recent
+# calls of its kind is sent again and the first answer used, adding at most HEDGE_MAX_EXTRA calls per call
+HEDGE_REQUESTS = os.environ.get("HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "95"))
+HEDGE_MAX_EXTRA = float(os.environ.get("HEDGE_MAX_EXTRA", "0.05"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))  # Calls of a kind observed before hedging it
+
+# Load the transcription and analysis client libraries in the background once the server
+# is up, so the first request does not pay for them (otherwise they load on first use)
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Serve /metrics without the API key, for scrapers that cannot send headers on a private network
+METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC", "false").lower() in ("1", "true", "yes")
+
+# Export of the per-request and per-job tracing spans: "" (trace ids only), "jsonl" (appended
+# to TRACE_JSONL_PATH) or "otlp" (OTLP/HTTP JSON to the collector at OTEL_EXPORTER_OTLP_ENDPOINT)
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "").lower()
+TRACE_JSONL_PATH = os.environ.get("TRACE_JSONL_PATH", os.path.join("traces", "traces.jsonl"))
+OTEL_EXPORTER_OTLP_ENDPOINT = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318")
+OTEL_SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "meeting-analysis-api")
+# Response header carrying the trace id of each request
+TRACE_ID_HEADER = "X-Trace-Id"
+
+# Background job configuration
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))          # Concurrent transcribe/analyze pipelines
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "20"))   # Jobs allowed to wait for a worker
+
+# Number of audio chunks uploaded to the transcription API in parallel per job
+TRANSCRIPTION_CONCURRENCY = int(os.environ.get("TRANSCRIPTION_CONCURRENCY", "4"))
+# Format of the audio chunks uploaded for transcription: wav, flac, mp3 or opus
+TRANSCRIPTION_CHUNK_CODEC = os.environ.get("TRANSCRIPTION_CHUNK_CODEC", "mp3")
+TRANSCRIPTION_CHUNK_BITRATE = os.environ.get("TRANSCRIPTION_CHUNK_BITRATE")  # e.g. "24k"; codec default if unset
+# Drop long silences (energy-based voice activity detection) before transcription
+TRANSCRIPTION_TRIM_SILENCE = os.environ.get("TRANSCRIPTION_TRIM_SILENCE", "true").lower() in ("1", "true", "yes")
+TRANSCRIPTION_MIN_SILENCE_SECONDS = float(os.environ.get("TRANSCRIPTION_MIN_SILENCE_SECONDS", "1.0"))
+# Number of LLM calls in flight per transcript analysis
+ANALYSIS_CONCURRENCY = int(os.environ.get("ANALYSIS_CONCURRENCY", "8"))
+# Analysis models: ANALYSIS_MODEL by default; chunk extraction ("map") and intermediate
+# consolidation ("reduce") can use a cheaper model, the call producing the final result ("final") a stronger one
+ANALYSIS_MODEL = os.environ.get("ANALYSIS_MODEL", "gpt-4o")
+# Transcript chunk size for analysis, in model tokens, and the tokens of whole sentences repeated between chunks
+ANALYSIS_CHUNK_TOKENS = int(os.environ.get("ANALYSIS_CHUNK_TOKENS", "8000"))
+ANALYSIS_OVERLAP_TOKENS = int(os.environ.get("ANALYSIS_OVERLAP_TOKENS", "200"))
+# "per_task" (one prompt per analysis and chunk) or "single_pass" (one structured prompt per chunk)
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "per_task")
+
+# How per-chunk results are combined: "merge" (drop near-duplicate points) or
+# "map_reduce" (the model consolidates them in tiers of at most ANALYSIS_REDUCE_FAN_IN results)
+ANALYSIS_COMBINE = os.environ.get("ANALYSIS_COMBINE", "merge")
+ANALYSIS_REDUCE_FAN_IN = int(os.environ.get("ANALYSIS_REDUCE_FAN_IN", "4"))
+# With map_reduce the final result always comes from ANALYSIS_FINAL_MODEL, so the earlier stages default to a cheaper model
+ANALYSIS_TIER_MODEL_DEFAULT = "gpt-4o-mini" if ANALYSIS_COMBINE == "map_reduce" else ANALYSIS_MODEL
+ANALYSIS_MAP_MODEL = os.environ.get("ANALYSIS_MAP_MODEL", ANALYSIS_TIER_MODEL_DEFAULT)
+ANALYSIS_REDUCE_MODEL = os.environ.get("ANALYSIS_REDUCE_MODEL", ANALYSIS_TIER_MODEL_DEFAULT)
+ANALYSIS_FINAL_MODEL = os.environ.get("ANALYSIS_FINAL_MODEL", ANALYSIS_MODEL)
+# Optional extractive pre-filter: analyze only the most informative sentences, up to a
+# fraction of the transcript tokens and/or a token budget (unset: the whole transcript)
+ANALYSIS_PREFILTER_RATIO = float(os.environ["ANALYSIS_PREFILTER_RATIO"]) if os.environ.get("ANALYSIS_PREFILTER_RATIO") else None
+ANALYSIS_PREFILTER_TOKENS = int(os.environ["ANALYSIS_PREFILTER_TOKENS"]) if os.environ.get("ANALYSIS_PREFILTER_TOKENS") else None
+
+# Transcript cache keyed on audio hash, transcription model and language
+TRANSCRIPT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", os.path.join("cache", "transcripts.sqlite3"))
+TRANSCRIPT_CACHE_MAX_MB = float(os.environ.get("TRANSCRIPT_CACHE_MAX_MB", "200"))
+# Per-chunk LLM result cache shared by analyze-meeting and the extract-* endpoints:
+# "memory" (in-process LRU, for development) or "sqlite" (persistent, shared by workers)
+ANALYSIS_CACHE_BACKEND = os.environ.get("ANALYSIS_CACHE_BACKEND", "memory")
+ANALYSIS_CACHE_PATH = os.environ.get("ANALYSIS_CACHE_PATH", os.path.join("cache", "analysis.sqlite3"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.environ.get("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+ANALYSIS_CACHE_MAX_MB = float(os.environ.get("ANALYSIS_CACHE_MAX_MB", "100"))
+ANALYSIS_CACHE_TTL = float(os.environ.get("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds
+# Largest accepted upload; enforced from Content-Length and while the upload streams in
+MAX_UPLOAD_MB = float(os.environ.get("MAX_UPLOAD_MB", "500"))
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+
+# Seconds between keep-alive comments on idle event streams, so proxies do not drop them
+SSE_KEEPALIVE_SECONDS = float(os.environ.get("SSE_KEEPALIVE_SECONDS", "15"))
+
+# OpenAPI description of the multipart body parsed by ingest_upload
+AUDIO_UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["audio_file"],
+                    "properties": {"audio_file": {"type": "string", "format": "binary"}}
+                }
+            }
+        }
+    }
+}
 
 # Response Models
 class ErrorResponse(BaseModel):
@@ -57,6 +193,24 @@ class ErrorResponse(BaseModel):
 class AnalysisResponse(BaseModel):
     transcript: str = Field(..., description="The transcript of the meeting audio")
     analysis: Dict = Field(..., description="Analysis results including insights, action items, and bullet points")
+    usage: Dict = Field(default_factory=dict, description="Model, calls, tokens and latency of each pipeline stage")
+
+class JobSubmittedResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier of the queued job")
+    status: str = Field(..., description="Current job state")
+    status_url: str = Field(..., description="URL to poll for the job status")
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier of the job")
+    status: str = Field(..., description="Job state: queued, running, completed or failed")
+    created_at: float = Field(..., description="Submission timestamp")
+    started_at: Optional[float] = Field(None, description="Timestamp when a worker picked up the job")
+    finished_at: Optional[float] = Field(None, description="Timestamp when the job finished")
+    current_stage: Optional[str] = Field(None, description="Pipeline stage currently running")
+    stages: Dict = Field(..., description="Start and finish timestamps for each pipeline stage")
+    stats: Dict = Field(default_factory=dict, description="Pipeline statistics such as audio seconds and removed silence")
+    result: Optional[Dict] = Field(None, description="Transcript and analysis once the job completed")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
 
 class InsightsResponse(BaseModel):
     insights: str = Field(..., description="Key insights extracted from the meeting transcript")
@@ -67,8 +221,20 @@ class ActionItemsResponse(BaseModel):
 class BulletPointsResponse(BaseModel):
     bullet_points: str = Field(..., description="Bullet point summary of the meeting")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start warming the backends without delaying the first response."""
+    if WARMUP_ON_STARTUP:
+        startup_profile.warm_up([
+            ("warm transcriber", transcriber.warm_up),
+            ("warm analyzer", analyzer.warm_up),
+        ])
+    yield
+    tracing.TRACER.flush()
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="Meeting Analysis API",
     description="API for processing meeting recordings and extracting insights, actions, and summaries",
     version="1.0.0",
@@ -84,15 +250,93 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_ID_HEADER],
 )
 
 # Mount static files directory
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
+# HTTP clients shared by the transcriber and the analyzer, with their calls admitted by one scheduler
+outbound_scheduler = OutboundScheduler(rpm=OPENAI_RPM, tpm=OPENAI_TPM,
+                                       limits={TRANSCRIPTION_BUDGET: (OPENAI_TRANSCRIPTION_RPM, None)})
+outbound = OutboundHTTP(max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                        retry=RetryPolicy(max_retries=OPENAI_MAX_RETRIES, max_delay=OPENAI_RETRY_MAX_DELAY),
+                        timeouts=TimeoutPolicy(base=OPENAI_TIMEOUT_SECONDS,
+                                               upload_bytes_per_second=OPENAI_MIN_UPLOAD_KBPS * 1024,
+                                               processing_bytes_per_second=OPENAI_MIN_PROCESSING_KBPS * 1024),
+                        scheduler=outbound_scheduler)
+
+# Hedgers of slow transcription and analysis calls, each with its own latency tracking and extra-call budget
+transcription_hedger = analysis_hedger = None
+if HEDGE_REQUESTS:
+    transcription_hedger = Hedger("transcription", percentile=HEDGE_PERCENTILE, max_extra=HEDGE_MAX_EXTRA,
+                                  min_samples=HEDGE_MIN_SAMPLES, min_delay=5.0)
+    analysis_hedger = Hedger("analysis", percentile=HEDGE_PERCENTILE, max_extra=HEDGE_MAX_EXTRA,
+                             min_samples=HEDGE_MIN_SAMPLES)
+
 # Initialize the transcriber and analyzer
 # Set max_chunk_size_mb to 24 MB (slightly under the 25MB API limit)
-transcriber = AudioTranscriber(use_openai=True, max_chunk_size_mb=24)
-analyzer = MeetingAnalyzer(model_id="gpt-4o")
+transcriber = AudioTranscriber(use_openai=True, max_chunk_size_mb=24, max_concurrent_chunks=TRANSCRIPTION_CONCURRENCY,
+                               chunk_codec=TRANSCRIPTION_CHUNK_CODEC, chunk_bitrate=TRANSCRIPTION_CHUNK_BITRATE,
+                               trim_silence=TRANSCRIPTION_TRIM_SILENCE,
+                               min_silence_seconds=TRANSCRIPTION_MIN_SILENCE_SECONDS, outbound=outbound,
+                               hedger=transcription_hedger)
+if ANALYSIS_CACHE_BACKEND == "sqlite":
+    analysis_cache = SQLiteLRUCache(ANALYSIS_CACHE_PATH, max_size_mb=ANALYSIS_CACHE_MAX_MB, ttl=ANALYSIS_CACHE_TTL)
+else:
+    analysis_cache = MemoryLRUCache(max_entries=ANALYSIS_CACHE_MAX_ENTRIES, ttl=ANALYSIS_CACHE_TTL)
+analyzer = MeetingAnalyzer(model_id=ANALYSIS_MODEL, chunk_tokens=ANALYSIS_CHUNK_TOKENS, overlap_tokens=ANALYSIS_OVERLAP_TOKENS,
+                           max_concurrency=ANALYSIS_CONCURRENCY, analysis_mode=ANALYSIS_MODE,
+                           result_cache=analysis_cache, combine_strategy=ANALYSIS_COMBINE,
+                           reduce_fan_in=ANALYSIS_REDUCE_FAN_IN,
+                           stage_models={"map": ANALYSIS_MAP_MODEL, "reduce": ANALYSIS_REDUCE_MODEL,
+                                         "final": ANALYSIS_FINAL_MODEL},
+                           prefilter_ratio=ANALYSIS_PREFILTER_RATIO, prefilter_tokens=ANALYSIS_PREFILTER_TOKENS,
+                           outbound=outbound, hedger=analysis_hedger)
+
+transcript_cache = SQLiteLRUCache(TRANSCRIPT_CACHE_PATH, max_size_mb=TRANSCRIPT_CACHE_MAX_MB)
+
+if RATE_LIMIT_BACKEND == "sqlite":
+    rate_limiter = SQLiteRateLimiter(RATE_LIMIT_PATH, RATE_LIMIT_REQUESTS, RATE_LIMIT_DURATION)
+else:
+    rate_limiter = MemoryRateLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_DURATION, max_keys=RATE_LIMIT_MAX_KEYS)
+
+if TRACE_EXPORTER == "jsonl":
+    tracing.configure(JSONLExporter(TRACE_JSONL_PATH))
+elif TRACE_EXPORTER == "otlp":
+    tracing.configure(OTLPExporter(OTEL_EXPORTER_OTLP_ENDPOINT, service_name=OTEL_SERVICE_NAME))
+
+# Worker pool running the transcribe -> analyze pipeline off the event loop
+job_manager = JobManager(num_workers=JOB_WORKERS, max_queue_size=JOB_QUEUE_SIZE)
+
+# Prometheus metrics of the HTTP API; the pipeline modules declare their own
+HTTP_REQUESTS = Counter("http_requests", "HTTP requests by method, route and status", ["method", "route", "status"])
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds",
+                                 "Seconds until the response starts, by method and route", ["method", "route"])
+HTTP_REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being handled")
+UPLOAD_SECONDS = Histogram("upload_duration_seconds", "Duration of audio uploads, decoding included")
+UPLOAD_BYTES = Counter("upload_bytes", "Bytes of audio uploaded by clients")
+JOBS_RUNNING = Gauge("jobs_running", "Meeting jobs being processed")
+JOBS_RUNNING.set_function(lambda: job_manager.stats()["running"])
+JOBS_QUEUED = Gauge("jobs_queued", "Meeting jobs waiting for a worker")
+JOBS_QUEUED.set_function(lambda: job_manager.stats()["queue_depth"])
+SCHEDULER_WAITING = Gauge("openai_scheduler_waiting", "OpenAI calls waiting for rate-limit budget", ["model"])
+SCHEDULER_WAITING.set_function(lambda: {(model,): budget["waiting"]
+                                        for model, budget in outbound_scheduler.stats()["models"].items()})
+startup_profile.mark("create backends")
+
+EMPTY_TRANSCRIPT_CONTENT = {
+    "transcript": "Não foi possível transcrever o áudio. Por favor, verifique a qualidade do áudio e tente novamente.",
+    "analysis": {
+        "insights": "Não foi possível gerar insights sem transcrição.",
+        "action_items": "Não foi possível identificar itens de ação sem transcrição.",
+        "bullet_points": "Não foi possível gerar pontos de resumo sem transcrição."
+    }
+}
+
+class EmptyTranscriptError(Exception):
+    """Raised when the transcription produced no text."""
 
 # API Key validation dependency
 async def get_api_key(api_key: str = Depends(api_key_header)):
@@ -104,66 +348,152 @@ async def get_api_key(api_key: str = Depends(api_key_header)):
     )
 
 # Rate limiting middleware
+def rate_limit_key(request: Request) -> str:
+    """Identify the client a request is charged to: its IP address, together with its API key if valid."""
+    client_ip = "ip:" + (request.client.host if request.client else "unknown")
+    api_key = request.headers.get(API_KEY_NAME)
+    # Invalid keys are charged to the IP address alone, so rotating made-up keys does not bypass the limit
+    if api_key and secrets.compare_digest(api_key, API_KEY):
+        # The API key is shared by every client of the deployment, so the IP address still tells them
+        # apart; buckets may be persisted, so the key itself is not stored
+        return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:32] + ":" + client_ip
+    return client_ip
+
+def rate_limit_cost(request: Request) -> float:
+    """Units a request costs: audio uploads and LLM analyses weigh more than status calls."""
+    path = request.url.path
+    if request.method == "POST" and path.endswith("/analyze-meeting"):
+        return RATE_LIMIT_UPLOAD_COST
+    if request.method == "POST" and path.endswith(("/extract-insights", "/extract-action-items",
+                                                   "/generate-bullet-points")):
+        return RATE_LIMIT_ANALYSIS_COST
+    if request.method == "GET" and path.startswith("/api/v1/jobs/"):
+        return RATE_LIMIT_POLL_COST
+    return 1.0
+
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
-    # Skip rate limiting for documentation
-    if request.url.path in ["/api/docs", "/api/redoc", "/api/openapi.json", "/static"]:
+    # Skip rate limiting for documentation and static files
+    if request.url.path.startswith(RATE_LIMIT_EXEMPT_PATHS):
         return await call_next(request)
-        
-    # Get client IP
-    client_ip = request.client.host
     
-    # Check if client has exceeded rate limit
-    current_time = time.time()
-    if client_ip in request_tracker:
-        count, timestamp = request_tracker[client_ip]
-        
-        # Reset count if duration has passed
-        if current_time - timestamp > RATE_LIMIT_DURATION:
-            request_tracker[client_ip] = (1, current_time)
-        # Increment count if within duration
-        elif count < RATE_LIMIT_REQUESTS:
-            request_tracker[client_ip] = (count + 1, timestamp)
-        # Return 429 if rate limit exceeded
-        else:
-            return JSONResponse(
-                status_code=HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": "Rate limit exceeded", "code": 429},
-            )
+    cost = rate_limit_cost(request)
+    if cost <= 0:
+        return await call_next(request)
+    
+    if RATE_LIMIT_BACKEND == "sqlite":
+        # The SQLite limiter may wait on other workers' transactions, so it runs off the event loop
+        allowed, retry_after = await asyncio.to_thread(rate_limiter.acquire, rate_limit_key(request), cost)
     else:
-        # First request from this client
-        request_tracker[client_ip] = (1, current_time)
-        
+        allowed, retry_after = rate_limiter.acquire(rate_limit_key(request), cost)
+    if not allowed:
+        return JSONResponse(
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Rate limit exceeded", "code": 429},
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
+    
     return await call_next(request)
 
-# API Routes
-@app.post("/api/v1/analyze-meeting", response_model=AnalysisResponse)
-async def analyze_meeting(
-    audio_file: UploadFile = File(...),
-    api_key: str = Depends(get_api_key)
-):
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    # Registered after the rate limiter, so it wraps it and rate-limited requests are counted too
+    started = time.perf_counter()
+    HTTP_REQUESTS_IN_PROGRESS.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_PROGRESS.dec()
+        # Label by route template rather than path, keeping job ids out of the label values
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route)
+        HTTP_REQUESTS.inc(request.method, route, status)
+
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    # Root span of the request, continuing the caller's trace if it sent a traceparent header
+    attributes = {"http.method": request.method, "http.path": request.url.path}
+    with span("request", attributes, traceparent=request.headers.get("traceparent")) as request_span:
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        request_span.name = f"{request.method} {route}"
+        request_span.set("http.route", route)
+        request_span.set("http.status_code", response.status_code)
+        response.headers[TRACE_ID_HEADER] = request_span.trace_id
+        return response
+
+async def ingest_audio(request: Request):
+    """Ingest the uploaded audio file of a request, recording its duration and size."""
+    started = time.perf_counter()
+    try:
+        with span("ingest") as ingest_span:
+            upload = await ingest_upload(request, "audio_file", UPLOAD_DIR, MAX_UPLOAD_BYTES)
+            ingest_span.set("upload.bytes", upload.size)
+            ingest_span.set("upload.content_type", upload.content_type)
+    except HTTPException as e:
+        ERRORS.inc("upload", e.status_code)
+        raise
+    UPLOAD_SECONDS.observe(time.perf_counter() - started)
+    UPLOAD_BYTES.inc(amount=upload.size)
+    return upload
+
+# Meeting processing pipeline
+def transcribe_with_cache(temp_file_path: str, audio_hash: str, stats: Optional[Dict] = None,
+                          on_chunk=None) -> str:
     """
-    Process an uploaded meeting audio file and return analysis.
+    Transcribe an audio file, reusing the cached transcript of identical audio.
     
     Args:
-        audio_file: The uploaded audio file of the meeting
+        temp_file_path: Path of the uploaded audio file
+        audio_hash: SHA-256 hex digest of the uploaded audio file
+        stats: Optional dict filled with cache and audio preparation statistics
+        on_chunk: Optional callback receiving (index, total, text) as each chunk
+                  is transcribed; not called on a cache hit
         
     Returns:
-        Dict containing analysis results (insights, action items, bullet points)
+        The transcript text
     """
-    # Validate file type
-    if not audio_file.content_type.startswith(("audio/", "video/")):
-        raise HTTPException(status_code=400, detail="File must be an audio file")
+    if stats is None:
+        stats = {}
+    cache_key = transcriber.cache_key(audio_hash)
+    transcript = transcript_cache.get(cache_key)
+    if transcript is not None:
+        print("Transcript cache hit")
+        stats["transcript_cache"] = "hit"
+        current_span().set("transcript_cache", "hit")
+        return transcript
     
-    # Save uploaded file temporarily
-    temp_file_path = os.path.join(UPLOAD_DIR, f"{int(time.time())}_{audio_file.filename}")
-    try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(audio_file.file, buffer)
+    stats["transcript_cache"] = "miss"
+    current_span().set("transcript_cache", "miss")
+    transcript = transcriber.transcribe(temp_file_path, stats, on_chunk)
+    # Only cache usable transcripts so bad audio can be retried
+    if transcript and transcript.strip():
+        transcript_cache.set(cache_key, transcript)
+    return transcript
+
+def run_meeting_pipeline(job, temp_file_path: str, audio_hash: str) -> Dict:
+    """
+    Transcribe and analyze a saved meeting recording. Runs on a job worker thread.
+    
+    Progress is published as job events: "transcript_chunk" for each chunk as
+    it is transcribed, "transcript" with the full text, and "analysis_section"
+    for each analysis as it completes.
+    
+    Args:
+        job: The job running this pipeline, used to record stage timings and events
+        temp_file_path: Path of the uploaded audio file; removed when done
+        audio_hash: SHA-256 hex digest of the uploaded audio file
         
+    Returns:
+        Dict containing the transcript and the analysis results
+    """
+    try:
         # Get file size in MB for logging
         file_size_mb = os.path.getsize(temp_file_path) / (1024 * 1024)
-        print(f"Processing audio file: {audio_file.filename} ({file_size_mb:.2f} MB)")
+        print(f"Processing audio file: {os.path.basename(temp_file_path)} ({file_size_mb:.2f} MB)")
         
         # Check if file exceeds maximum allowed size (we'll still try to process it with chunking)
         if file_size_mb > 100:  # Set a reasonable upper limit
@@ -171,53 +501,371 @@ async def analyze_meeting(
         
         # Step 1: Transcribe the audio
         print("Starting transcription...")
-        transcript = transcriber.transcribe(temp_file_path) # uncomment for production
-        # transcript = transcript_mock # For development testing
+        with job.stage("transcription"):
+            transcript = transcribe_with_cache(  # uncomment for production
+                temp_file_path, audio_hash, job.stats,
+                on_chunk=lambda index, total, text: job.emit(
+                    "transcript_chunk", {"index": index, "total": total, "text": text}
+                )
+            )
+            # transcript = transcript_mock # For development testing (from transcript_mock import transcript_mock)
         
         # Check if transcription was successful
         if not transcript or len(transcript.strip()) == 0:
             print("Warning: Empty transcript generated")
-            return JSONResponse(
-                status_code=422,
-                content={
-                    "transcript": "Não foi possível transcrever o áudio. Por favor, verifique a qualidade do áudio e tente novamente.",
-                    "analysis": {
-                        "insights": "Não foi possível gerar insights sem transcrição.",
-                        "action_items": "Não foi possível identificar itens de ação sem transcrição.",
-                        "bullet_points": "Não foi possível gerar pontos de resumo sem transcrição."
-                    }
-                }
-            )
+            raise EmptyTranscriptError(EMPTY_TRANSCRIPT_CONTENT["transcript"])
             
         print(f"Transcription complete: {len(transcript)} characters")
+        job.emit("transcript", {"text": transcript})
+        transcription_times = job.stages["transcription"]
+        job.stats.setdefault("usage", {})["transcription"] = {
+            "model": transcriber.model if transcriber.use_openai else "local",
+            "calls": job.stats.get("chunks", 0) if job.stats.get("transcript_cache") == "miss" else 0,
+            "latency_seconds": round(transcription_times["finished_at"] - transcription_times["started_at"], 3)
+        }
         
         # Step 2: Analyze the transcript
         print("Starting analysis...")
-        analysis_results = analyzer.analyze_transcript(transcript) # uncomment for production
-        # analysis_results = analysis_mock # For development testing
+        with job.stage("analysis"):
+            analysis_results = analyzer.analyze_transcript(  # uncomment for production
+                transcript,
+                on_section=lambda section, text: job.emit("analysis_section", {"section": section, "text": text}),
+                stats=job.stats
+            )
+            # analysis_results = analysis_mock # For development testing (from analysis_mock import analysis_mock)
         print("Analysis complete")
         
         # Return the full analysis with transcript included
         return {
             "transcript": transcript,
-            "analysis": analysis_results
+            "analysis": analysis_results,
+            "usage": job.stats.get("usage", {})
         }
     
-    except Exception as e:
-        error_msg = str(e)
-        print(f"Error processing file: {error_msg}")
-        
-        # Provide more helpful error message for common errors
-        if "413: Maximum content size limit" in error_msg:
-            error_msg = "The audio file is too large for the transcription service. Consider using a smaller file."
-        
-        raise HTTPException(status_code=500, detail=error_msg)
-    
     finally:
         # Clean up the temporary file
         if os.path.exists(temp_file_path):
             os.remove(temp_file_path)
 
+def run_meeting_job(job, temp_file_path: str, audio_hash: str) -> Dict:
+    """Run the meeting pipeline as a traced job, with its OpenAI calls scheduled as batch work of the job."""
+    attributes = {"job.id": job.id, "audio.bytes": os.path.getsize(temp_file_path)}
+    with call_context(job=job.id, priority=PRIORITY_BATCH), span("meeting_job", attributes) as job_span:
+        # Lets a job polled by id be matched with its trace
+        job.stats["trace_id"] = job_span.trace_id
+        return run_meeting_pipeline(job, temp_file_path, audio_hash)
+
+def interactive_calls():
+    """Schedule the OpenAI calls of the current request ahead of batch work, as a job of its own."""
+    return call_context(job=f"request-{uuid.uuid4().hex}", priority=PRIORITY_INTERACTIVE)
+
+def format_processing_error(error: Exception) -> str:
+    """Turn a pipeline exception into a user-facing error message."""
+    error_msg = str(error)
+    
+    # Provide more helpful error message for common errors
+    if "413: Maximum content size limit" in error_msg:
+        error_msg = "The audio file is too large for the transcription service. Consider using a smaller file."
+    
+    return error_msg
+
+def submit_meeting_job(temp_file_path: str, audio_hash: str):
+    """
+    Queue a saved recording for processing.
+    
+    Raises:
+        HTTPException: 503 if the job queue is full
+    """
+    try:
+        return job_manager.submit(run_meeting_job, temp_file_path, audio_hash)
+    except QueueFullError as e:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise HTTPException(status_code=503, detail=str(e))
+
+async def wait_for_job(job, timeout: Optional[float] = None) -> bool:
+    """
+    Wait for a job to finish without blocking the event loop.
+    
+    Returns:
+        True if the job finished, False if the timeout expired first
+    """
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Event()
+    
+    def on_done(_):
+        loop.call_soon_threadsafe(finished.set)
+    
+    job.add_done_callback(on_done)
+    try:
+        await asyncio.wait_for(finished.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        # Long-polling a slow job must not pile up callbacks of the waits that timed out
+        job.remove_done_callback(on_done)
+
+def sse_event(event: str, data: Dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def job_event_stream(job, status_url: str):
+    """
+    Stream a job's progress events as server-sent events until it finishes.
+    
+    Events emitted before the client connected are replayed first. The
+    stream ends with a "result" event (the same body analyze-meeting returns)
+    or an "error" event with the HTTP status code analyze-meeting would use.
+    Idle periods are filled with keep-alive comments.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    
+    def on_event(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+    
+    def on_done(_):
+        loop.call_soon_threadsafe(events.put_nowait, None)
+    
+    history = job.add_event_listener(on_event)
+    job.add_done_callback(on_done)
+    try:
+        yield sse_event("job", {"job_id": job.id, "status_url": status_url})
+        for event, data in history:
+            yield sse_event(event, data)
+        
+        while True:
+            try:
+                event = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            yield sse_event(*event)
+        
+        if job.state == JOB_COMPLETED:
+            yield sse_event("result", job.result)
+        elif isinstance(job.error, EmptyTranscriptError):
+            yield sse_event("error", {"code": 422, **EMPTY_TRANSCRIPT_CONTENT})
+        else:
+            yield sse_event("error", {"code": 500, "detail": format_processing_error(job.error)})
+    finally:
+        job.remove_event_listener(on_event)
+        job.remove_done_callback(on_done)
+
+def event_stream_response(stream) -> StreamingResponse:
+    """Wrap an event generator in a text/event-stream response that proxies do not buffer."""
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def task_event_stream(task: str, transcript: str):
+    """
+    Stream one analysis of a transcript token by token as server-sent events.
+    
+    Emits "token" events with the text generated for each transcript chunk,
+    then a "result" event with the combined result the matching extract-*
+    endpoint returns.
+    """
+    if not transcript or len(transcript.strip()) < 50:
+        yield sse_event("result", {"task": task, "text": "A transcrição é muito curta para análise."})
+        return
+    
+    try:
+        with interactive_calls():
+            async for event, data in analyzer.astream_task(task, transcript):
+                yield sse_event(event, data)
+    except Exception as e:
+        print(f"Error streaming {task}: {str(e)}")
+        yield sse_event("error", {"code": 500, "detail": f"Error streaming {task}: {str(e)}"})
+
+# API Routes
+@app.post("/api/v1/analyze-meeting", response_model=AnalysisResponse, openapi_extra=AUDIO_UPLOAD_REQUEST_BODY)
+async def analyze_meeting(
+    request: Request,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Process an uploaded meeting audio file and return analysis.
+    
+    The processing runs on the background worker pool; this endpoint waits
+    for it to finish. Use /api/v1/jobs/analyze-meeting to get a job id instead.
+    
+    The audio file is sent as the multipart field `audio_file`; it is decoded
+    while it uploads.
+    
+    Args:
+        request: The request carrying the uploaded audio file of the meeting
+        
+    Returns:
+        Dict containing analysis results (insights, action items, bullet points)
+    """
+    upload = await ingest_audio(request)
+    job = submit_meeting_job(upload.path, upload.audio_hash)
+    await wait_for_job(job)
+    
+    if job.state == JOB_COMPLETED:
+        return job.result
+    
+    if isinstance(job.error, EmptyTranscriptError):
+        return JSONResponse(status_code=422, content=EMPTY_TRANSCRIPT_CONTENT)
+    
+    print(f"Error processing file: {job.error}")
+    raise HTTPException(status_code=500, detail=format_processing_error(job.error))
+
+@app.post("/api/v1/jobs/analyze-meeting", response_model=JobSubmittedResponse, status_code=202,
+          openapi_extra=AUDIO_UPLOAD_REQUEST_BODY)
+async def submit_analyze_meeting_job(
+    request: Request,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Queue an uploaded meeting audio file for processing and return immediately.
+    
+    Args:
+        request: The request carrying the uploaded audio file (multipart field `audio_file`)
+        
+    Returns:
+        Dict containing the job id and the URL to poll for its status
+    """
+    upload = await ingest_audio(request)
+    job = submit_meeting_job(upload.path, upload.audio_hash)
+    return {
+        "job_id": job.id,
+        "status": job.state,
+        "status_url": str(request.url_for("get_job_status", job_id=job.id))
+    }
+
+@app.post("/api/v1/stream/analyze-meeting", openapi_extra=AUDIO_UPLOAD_REQUEST_BODY,
+          response_class=StreamingResponse)
+async def stream_analyze_meeting(
+    request: Request,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Process an uploaded meeting audio file and stream progress as server-sent events.
+    
+    Emits "job" (job id), "stage", "transcript_chunk" (each chunk as it is
+    transcribed, in completion order), "transcript", "analysis_section" (each
+    analysis as it completes) and finally "result" or "error". The job keeps
+    running if the client disconnects; reconnect with /api/v1/jobs/{job_id}/events.
+    
+    Args:
+        request: The request carrying the uploaded audio file (multipart field `audio_file`)
+        
+    Returns:
+        A text/event-stream response
+    """
+    upload = await ingest_audio(request)
+    job = submit_meeting_job(upload.path, upload.audio_hash)
+    status_url = str(request.url_for("get_job_status", job_id=job.id))
+    return event_stream_response(job_event_stream(job, status_url))
+
+@app.get("/api/v1/jobs")
+async def get_job_stats(api_key: str = Depends(get_api_key)):
+    """
+    Report queue depth and worker utilization of the job pool.
+    
+    Returns:
+        Dict containing worker, queue and job counters
+    """
+    return job_manager.stats()
+
+@app.get("/api/v1/cache/stats")
+async def get_cache_stats(api_key: str = Depends(get_api_key)):
+    """
+    Report hit, miss and eviction counters of the caches and the rate limiter.
+    
+    Returns:
+        Dict containing the statistics of each cache
+    """
+    # SQLite backends query their files, so the counters are read off the event loop
+    return await asyncio.to_thread(lambda: {
+        "transcripts": transcript_cache.stats(),
+        "analysis": analysis_cache.stats(),
+        "rate_limit": rate_limiter.stats()
+    })
+
+@app.get("/api/v1/outbound/stats")
+async def get_outbound_stats(api_key: str = Depends(get_api_key)):
+    """
+    Report the OpenAI rate-limit budgets, queue waits, retries and hedged calls.
+    
+    Returns:
+        Dict containing the scheduler budgets and wait times, the HTTP
+        client's attempt and retry counters, and the hedging statistics of
+        transcription and analysis calls (null when hedging is off)
+    """
+    return {
+        "scheduler": outbound_scheduler.stats(),
+        "http": outbound.stats(),
+        "hedging": {
+            "transcription": transcription_hedger.stats() if transcription_hedger else None,
+            "analysis": analysis_hedger.stats() if analysis_hedger else None
+        }
+    }
+
+def get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def job_status(job) -> Dict:
+    """Serialize a job, replacing raw errors with user-facing messages."""
+    status = job.to_dict()
+    if job.error is not None:
+        status["error"] = format_processing_error(job.error)
+    return status
+
+@app.get("/api/v1/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str, api_key: str = Depends(get_api_key)):
+    """
+    Get the state, per-stage timestamps and (once completed) result of a job.
+    
+    Args:
+        job_id: The job id returned on submission
+        
+    Returns:
+        Dict containing the job status
+    """
+    return job_status(get_job_or_404(job_id))
+
+@app.get("/api/v1/jobs/{job_id}/wait", response_model=JobStatusResponse)
+async def wait_job_status(job_id: str, timeout: float = 30.0, api_key: str = Depends(get_api_key)):
+    """
+    Long-poll a job: return as soon as it finishes or after `timeout` seconds.
+    
+    Args:
+        job_id: The job id returned on submission
+        timeout: Maximum number of seconds to wait (capped at 300)
+        
+    Returns:
+        Dict containing the job status
+    """
+    job = get_job_or_404(job_id)
+    await wait_for_job(job, timeout=min(max(timeout, 0.0), 300.0))
+    return job_status(job)
+
+@app.get("/api/v1/jobs/{job_id}/events", response_class=StreamingResponse)
+async def stream_job_events(job_id: str, request: Request, api_key: str = Depends(get_api_key)):
+    """
+    Stream a job's progress as server-sent events, replaying earlier events first.
+    
+    Args:
+        job_id: The job id returned on submission
+        
+    Returns:
+        A text/event-stream response (see /api/v1/stream/analyze-meeting)
+    """
+    job = get_job_or_404(job_id)
+    status_url = str(request.url_for("get_job_status", job_id=job.id))
+    return event_stream_response(job_event_stream(job, status_url))
+
 @app.post("/api/v1/extract-insights", response_model=InsightsResponse)
 async def extract_insights(
     transcript: str = Form(...),
@@ -236,7 +884,8 @@ async def extract_insights(
         if not transcript or len(transcript.strip()) < 50:
             return {"insights": "A transcrição é muito curta para análise."}
             
-        insights = analyzer.extract_insights(transcript)
+        with interactive_calls():
+            insights = await analyzer.aextract_insights(transcript)
         return {"insights": insights}
     except Exception as e:
         print(f"Error extracting insights: {str(e)}")
@@ -260,7 +909,8 @@ async def extract_action_items(
         if not transcript or len(transcript.strip()) < 50:
             return {"action_items": "A transcrição é muito curta para análise."}
             
-        action_items = analyzer.extract_action_items(transcript)
+        with interactive_calls():
+            action_items = await analyzer.aextract_action_items(transcript)
         return {"action_items": action_items}
     except Exception as e:
         print(f"Error extracting action items: {str(e)}")
@@ -284,12 +934,61 @@ async def generate_bullet_points(
         if not transcript or len(transcript.strip()) < 50:
             return {"bullet_points": "A transcrição é muito curta para análise."}
             
-        bullet_points = analyzer.generate_bullet_points(transcript)
+        with interactive_calls():
+            bullet_points = await analyzer.agenerate_bullet_points(transcript)
         return {"bullet_points": bullet_points}
     except Exception as e:
         print(f"Error generating bullet points: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating bullet points: {str(e)}")
 
+@app.post("/api/v1/stream/extract-insights", response_class=StreamingResponse)
+async def stream_extract_insights(
+    transcript: str = Form(...),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Extract insights from a meeting transcript, streaming tokens as server-sent events.
+    
+    Args:
+        transcript: The text transcript of the meeting
+        
+    Returns:
+        A text/event-stream response of "token" events and a final "result"
+    """
+    return event_stream_response(task_event_stream("insights", transcript))
+
+@app.post("/api/v1/stream/extract-action-items", response_class=StreamingResponse)
+async def stream_extract_action_items(
+    transcript: str = Form(...),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Extract action items from a meeting transcript, streaming tokens as server-sent events.
+    
+    Args:
+        transcript: The text transcript of the meeting
+        
+    Returns:
+        A text/event-stream response of "token" events and a final "result"
+    """
+    return event_stream_response(task_event_stream("action_items", transcript))
+
+@app.post("/api/v1/stream/generate-bullet-points", response_class=StreamingResponse)
+async def stream_generate_bullet_points(
+    transcript: str = Form(...),
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Generate bullet points from a meeting transcript, streaming tokens as server-sent events.
+    
+    Args:
+        transcript: The text transcript of the meeting
+        
+    Returns:
+        A text/event-stream response of "token" events and a final "result"
+    """
+    return event_stream_response(task_event_stream("bullet_points", transcript))
+
 @app.get("/api/v1/health")
 async def health_check():
     """
@@ -304,6 +1003,36 @@ async def health_check():
         "timestamp": time.time()
     }
 
+@app.get("/api/v1/ready")
+async def readiness_check():
+    """
+    Report whether the transcription and analysis backends are warmed.
+    
+    The server answers requests as soon as it is up; until the backends are
+    warmed the first request using them also pays for loading them. Without
+    a warm-up (disabled or failed) the service is ready, and reports the
+    backends warmed once requests have loaded them.
+    
+    Returns:
+        Start-up state ("up", "warming", "warmed" or "failed") and the duration
+        of each start-up step, with status 503 while warming and 200 otherwise
+    """
+    if not startup_profile.warmed and transcriber.loaded and analyzer.loaded:
+        startup_profile.loaded_on_first_use()
+    report = startup_profile.report()
+    return JSONResponse(status_code=200 if startup_profile.ready else 503, content=report)
+
+@app.get("/metrics", include_in_schema=False, dependencies=[] if METRICS_PUBLIC else [Depends(get_api_key)])
+async def metrics():
+    """
+    Expose the Prometheus metrics of this process. Requires the API key unless METRICS_PUBLIC is set.
+    
+    Returns:
+        Stage latency histograms, counters of requests, chunks, tokens, bytes
+        and errors, and job gauges, in the Prometheus text format
+    """
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/swagger")
 async def swagger_ui():
     """Redirect to Swagger UI HTML page"""
@@ -314,5 +1043,7 @@ async def root():
     """Redirect to API documentation"""
     return RedirectResponse(url="/api/docs")
 
+startup_profile.mark("register routes")
+
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
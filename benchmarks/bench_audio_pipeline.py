@@ -0,0 +1,123 @@
+"""
+Benchmark of the audio preparation step of AudioTranscriber.
+
+Compares the legacy path (convert_to_wav followed by split_audio, which
+re-runs ffmpeg once per chunk) with the single-pass prepare_chunks
+pipeline on synthetic audio generated with ffmpeg. Reports wall time,
+ffmpeg CPU time, bytes written to disk and chunk count as JSON.
+
+Usage:
+    python -m benchmarks.bench_audio_pipeline --minutes 60 --chunk-mb 24
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import ffmpeg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription import AudioTranscriber
+
+
+def generate_audio(path, minutes):
+    """Generate a speech-length MP3 file with ffmpeg (tone mixed with noise).
+    
+    Args:
+        path (str): Output path
+        minutes (float): Duration of the audio in minutes
+    """
+    seconds = minutes * 60
+    tone = ffmpeg.input(f"sine=frequency=220:duration={seconds}", f="lavfi")
+    noise = ffmpeg.input(f"anoisesrc=color=pink:amplitude=0.2:duration={seconds}", f="lavfi")
+    (
+        ffmpeg
+        .filter([tone, noise], "amix", inputs=2)
+        .output(path, ac=1, ar="44100", audio_bitrate="64k")
+        .run(quiet=True, overwrite_output=True)
+    )
+
+
+def measure(func):
+    """Run a function and measure wall time and child process CPU time.
+    
+    Returns:
+        tuple: (function result, wall seconds, ffmpeg CPU seconds)
+    """
+    cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    result = func()
+    wall = time.perf_counter() - started
+    cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+    return result, wall, cpu
+
+
+def run_legacy(transcriber, audio_path):
+    """Legacy path: full WAV conversion, then one ffmpeg run per chunk."""
+    def prepare():
+        wav_path = transcriber.convert_to_wav(audio_path)
+        wav_size = os.path.getsize(wav_path)
+        chunk_paths = transcriber.split_audio(wav_path)
+        chunk_bytes = sum(os.path.getsize(p) for p in chunk_paths if p != wav_path)
+        transcriber._cleanup_chunks(chunk_paths, wav_path)
+        os.unlink(wav_path)
+        return len(chunk_paths), wav_size + chunk_bytes
+
+    (chunks, written), wall, cpu = measure(prepare)
+    return {"chunks": chunks, "bytes_written": written, "wall_seconds": wall, "ffmpeg_cpu_seconds": cpu}
+
+
+def run_single_pass(transcriber, audio_path):
+    """Single-pass path: one ffmpeg run writes every chunk."""
+    def prepare():
+        chunk_paths = transcriber.prepare_chunks(audio_path)
+        written = sum(os.path.getsize(p) for p in chunk_paths)
+        transcriber._cleanup_chunks(chunk_paths, audio_path)
+        return len(chunk_paths), written
+
+    (chunks, written), wall, cpu = measure(prepare)
+    return {"chunks": chunks, "bytes_written": written, "wall_seconds": wall, "ffmpeg_cpu_seconds": cpu}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio chunk preparation")
+    parser.add_argument("--minutes", type=float, default=60, help="Duration of the synthetic audio")
+    parser.add_argument("--chunk-mb", type=float, default=24, help="Maximum chunk size in MB")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    # The transcriber is only used for audio preparation; no API calls are made
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    transcriber = AudioTranscriber(use_openai=True, max_chunk_size_mb=args.chunk_mb)
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        audio_path = os.path.join(work_dir, "meeting.mp3")
+        generate_audio(audio_path, args.minutes)
+
+        results = {
+            "minutes": args.minutes,
+            "chunk_mb": args.chunk_mb,
+            "input_bytes": os.path.getsize(audio_path),
+            "legacy": run_legacy(transcriber, audio_path),
+            "single_pass": run_single_pass(transcriber, audio_path),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of the transcription chunk codecs of AudioTranscriber.
+
+For every codec in CHUNK_CODECS, prepares the chunks of a synthetic
+meeting recording and reports chunk count, bytes uploaded and preparation
+time as JSON. With --transcribe the chunks are also sent to the
+transcription API (OPENAI_BASE_URL is honored, so a local stub server can
+be used) and the end-to-end time is reported.
+
+Usage:
+    python -m benchmarks.bench_chunk_codecs --minutes 120
+    python -m benchmarks.bench_chunk_codecs --minutes 10 --transcribe
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription import AudioTranscriber, CHUNK_CODECS
+from benchmarks.bench_audio_pipeline import generate_audio
+
+
+def run_codec(codec, audio_path, chunk_mb, transcribe):
+    """Prepare (and optionally transcribe) the audio with one chunk codec.
+    
+    Args:
+        codec (str): Codec name from CHUNK_CODECS
+        audio_path (str): Path to the input audio
+        chunk_mb (float): Maximum chunk size in MB
+        transcribe (bool): Whether to send the chunks to the transcription API
+        
+    Returns:
+        dict: Chunk count, bytes uploaded and timings
+    """
+    transcriber = AudioTranscriber(use_openai=True, max_chunk_size_mb=chunk_mb, chunk_codec=codec)
+    
+    started = time.perf_counter()
+    chunk_paths = transcriber.prepare_chunks(audio_path)
+    prepare_seconds = time.perf_counter() - started
+    result = {
+        "chunks": len(chunk_paths),
+        "bytes_uploaded": sum(os.path.getsize(p) for p in chunk_paths),
+        "prepare_seconds": prepare_seconds,
+    }
+    
+    try:
+        if transcribe:
+            transcript = transcriber.transcribe_chunks_with_openai(chunk_paths)
+            result["end_to_end_seconds"] = time.perf_counter() - started
+            result["transcript_characters"] = len(transcript)
+    finally:
+        transcriber._cleanup_chunks(chunk_paths, audio_path)
+    
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription chunk codecs")
+    parser.add_argument("--minutes", type=float, default=120, help="Duration of the synthetic audio")
+    parser.add_argument("--chunk-mb", type=float, default=24, help="Maximum chunk size in MB")
+    parser.add_argument("--codecs", default=",".join(CHUNK_CODECS), help="Comma-separated codecs to compare")
+    parser.add_argument("--transcribe", action="store_true", help="Also send the chunks to the transcription API")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+    
+    if not args.transcribe:
+        # Only audio preparation is measured; no API calls are made
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    
+    work_dir = tempfile.mkdtemp()
+    try:
+        audio_path = os.path.join(work_dir, "meeting.mp3")
+        generate_audio(audio_path, args.minutes)
+        
+        results = {"minutes": args.minutes, "chunk_mb": args.chunk_mb, "codecs": {}}
+        for codec in args.codecs.split(","):
+            results["codecs"][codec] = run_codec(codec, audio_path, args.chunk_mb, args.transcribe)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
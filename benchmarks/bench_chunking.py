@@ -0,0 +1,118 @@
+"""
+Comparison of the transcript chunkers of MeetingAnalyzer.
+
+Builds synthetic meeting transcripts of several lengths (about 150 words
+per minute, with some unpunctuated stretches as Whisper produces for
+fast speech) and reports, for the previous character-based splitter and
+the token-budget chunker, the number of chunks (LLM calls per analysis)
+and the input tokens they send, as JSON. Token counts use tiktoken when
+it is installed and an estimate otherwise.
+
+Usage:
+    python -m benchmarks.bench_chunking --minutes 10,60,120
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meeting_analysis import MeetingAnalyzer, ANALYSIS_TASKS
+from benchmarks.bench_combine_results import VOCABULARY
+
+WORDS_PER_MINUTE = 150
+
+
+def generate_transcript(minutes, seed=3):
+    """Generate a transcript of sentences of 4 to 30 words.
+
+    Args:
+        minutes (float): Meeting length
+        seed (int): Random seed
+
+    Returns:
+        str: The transcript
+    """
+    rng = random.Random(seed)
+    words_left = int(minutes * WORDS_PER_MINUTE)
+    sentences = []
+    while words_left > 0:
+        length = min(words_left, rng.randint(4, 30))
+        words_left -= length
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length)).capitalize()
+        # One in ten sentences runs on without punctuation
+        sentences.append(sentence if rng.random() < 0.1 else sentence + rng.choice(".?!"))
+    return " ".join(sentences)
+
+
+def legacy_split(transcript, chunk_size=10000, overlap=1000):
+    """The previous splitter: fixed character windows, moved to a nearby '. ' if any."""
+    if len(transcript) <= chunk_size:
+        return [transcript]
+    chunks = []
+    start = 0
+    while start < len(transcript):
+        end = start + chunk_size
+        if end < len(transcript):
+            search_area = transcript[max(end - 200, start):min(end + 200, len(transcript))]
+            for punct in ['. ', '! ', '? ']:
+                last_boundary = search_area.rfind(punct)
+                if last_boundary != -1:
+                    end = max(end - 200, start) + last_boundary + 2
+                    break
+        chunks.append(transcript[start:min(end, len(transcript))])
+        start = max(0, end - overlap)
+    return chunks
+
+
+def describe(analyzer, transcript, chunks):
+    """Count calls and input tokens for a list of chunks."""
+    chunk_tokens = analyzer.token_counter.count_many(chunks)
+    transcript_tokens = analyzer.token_counter.count(transcript)
+    return {
+        "chunks": len(chunks),
+        "llm_calls": len(chunks) * len(ANALYSIS_TASKS),
+        "chunk_tokens": sum(chunk_tokens),
+        "overlap_tokens": sum(chunk_tokens) - transcript_tokens,
+        "largest_chunk_tokens": max(chunk_tokens),
+        "input_tokens": sum(chunk_tokens) * len(ANALYSIS_TASKS),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcript chunkers")
+    parser.add_argument("--minutes", default="10,60,120", help="Comma-separated transcript lengths")
+    parser.add_argument("--chunk-tokens", type=int, default=8000, help="Token budget per chunk")
+    parser.add_argument("--overlap-tokens", type=int, default=200, help="Overlap between chunks in tokens")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    # No model calls are made
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    analyzer = MeetingAnalyzer(model_id="gpt-4o", chunk_tokens=args.chunk_tokens,
+                               overlap_tokens=args.overlap_tokens)
+
+    results = {"tokenizer": analyzer.token_counter.name, "chunk_tokens": analyzer.chunk_tokens, "transcripts": {}}
+    for minutes in args.minutes.split(","):
+        transcript = generate_transcript(float(minutes))
+        stats = {}
+        chunks = analyzer._split_transcript_into_chunks(transcript, stats)
+        results["transcripts"][minutes] = {
+            "characters": len(transcript),
+            "transcript_tokens": stats["transcript_tokens"],
+            "legacy": describe(analyzer, transcript, legacy_split(transcript)),
+            "token_budget": describe(analyzer, transcript, chunks),
+        }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Micro-benchmark of MeetingAnalyzer._combine_analysis_results.
+
+Builds synthetic per-chunk model outputs (numbered points, a share of them
+repeating an earlier point with its words reordered and one word changed)
+and times the previous pairwise character-comparison merge against the
+near-duplicate index. Reports time, points kept and how many of the
+planted duplicates each version removed, as JSON.
+
+Usage:
+    python -m benchmarks.bench_combine_results --chunks 300
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from meeting_analysis import MeetingAnalyzer
+
+VOCABULARY = (
+    "equipe projeto cliente prazo entrega orçamento reunião relatório sistema banco dados migração "
+    "contrato fornecedor campanha marketing vendas meta trimestre produto lançamento versão teste "
+    "servidor custo risco plano revisão aprovação contratação treinamento suporte documentação "
+    "integração pagamento fatura auditoria segurança acesso usuário painel métrica indicador"
+).split()
+
+
+def generate_outputs(chunks, points_per_chunk, duplicate_rate, seed=7):
+    """Generate per-chunk analysis outputs with planted near-duplicates.
+
+    Args:
+        chunks (int): Number of chunk outputs
+        points_per_chunk (int): Points in each output
+        duplicate_rate (float): Share of points that repeat an earlier point
+        seed (int): Random seed
+
+    Returns:
+        tuple: (list of output strings, number of planted duplicates)
+    """
+    rng = random.Random(seed)
+    originals = []
+    outputs = []
+    duplicates = 0
+    for _ in range(chunks):
+        lines = []
+        for n in range(1, points_per_chunk + 1):
+            if originals and rng.random() < duplicate_rate:
+                # Same point, reworded: words shuffled and one replaced
+                words = list(rng.choice(originals))
+                rng.shuffle(words)
+                words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+                duplicates += 1
+            else:
+                words = rng.sample(VOCABULARY, rng.randint(10, 16))
+                originals.append(words)
+            lines.append(f"{n}. {' '.join(words).capitalize()}.")
+        outputs.append("\n".join(lines))
+    return outputs, duplicates
+
+
+def legacy_combine(analyzer, results_list):
+    """The previous merge: pairwise position-by-position character comparison."""
+    combined = ""
+    seen_points = set()
+    for result in results_list:
+        result = analyzer._strip_html_markdown(result)
+        points = []
+        current_point = ""
+        for line in result.split('\n'):
+            line = line.strip()
+            if line and (line.startswith('•') or line.startswith('-') or (line[0].isdigit() and line[1:3] in ['. ', ') '])):
+                if current_point:
+                    points.append(current_point)
+                current_point = line
+            elif current_point:
+                current_point += '\n' + line
+        if current_point:
+            points.append(current_point)
+        for point in points:
+            simplified = ''.join(c.lower() for c in point if c.isalnum() or c.isspace())
+            is_duplicate = False
+            for seen in seen_points:
+                if len(simplified) > 0 and len(seen) > 0:
+                    similarity = sum(1 for a, b in zip(simplified, seen) if a == b) / max(len(simplified), len(seen))
+                    if similarity > 0.8:
+                        is_duplicate = True
+                        break
+            if not is_duplicate:
+                seen_points.add(simplified)
+                combined += point + '\n\n'
+    return combined.strip()
+
+
+def measure(combine, outputs, total_points, planted):
+    """Time one merge function and count the points it kept."""
+    started = time.perf_counter()
+    combined = combine(outputs)
+    seconds = time.perf_counter() - started
+    kept = len([line for line in combined.split("\n\n") if line])
+    return {
+        "seconds": seconds,
+        "points_kept": kept,
+        "duplicates_removed": total_points - kept,
+        "planted_duplicates": planted,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark merging of per-chunk analysis results")
+    parser.add_argument("--chunks", type=int, default=300, help="Number of chunk outputs")
+    parser.add_argument("--points", type=int, default=5, help="Points per chunk output")
+    parser.add_argument("--duplicate-rate", type=float, default=0.3, help="Share of reworded duplicate points")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the current implementation")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    # No model calls are made
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    analyzer = MeetingAnalyzer()
+    outputs, planted = generate_outputs(args.chunks, args.points, args.duplicate_rate)
+    total_points = args.chunks * args.points
+
+    results = {"chunks": args.chunks, "points": total_points, "duplicate_rate": args.duplicate_rate}
+    results["current"] = measure(analyzer._combine_analysis_results, outputs, total_points, planted)
+    if not args.skip_legacy:
+        results["legacy"] = measure(lambda o: legacy_combine(analyzer, o), outputs, total_points, planted)
+        results["speedup"] = results["legacy"]["seconds"] / results["current"]["seconds"]
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+End-to-end benchmark of the meeting pipeline, run fully offline.
+
+For each meeting length, synthetic speech-like audio is generated with
+ffmpeg: a voiced tone in syllable-rate bursts separated by pauses, over a
+low noise floor, so silence trimming and chunking behave as on a
+recording. Meetings are then processed by the application's own job
+pipeline (transcription, then analysis), with OpenAI replaced by the local
+stub and its latency and error injection. The transcript and analysis
+caches are bypassed so every run pays for the full pipeline.
+
+Each scenario reports as JSON:
+  - latency: end-to-end seconds of meetings run one at a time, with the
+    transcription and analysis stages
+  - throughput: meetings and audio minutes processed per minute when
+    --concurrency meetings are submitted at once
+  - memory: peak RSS of the process and of its ffmpeg children over the
+    scenario, next to the RSS before it
+  - the OpenAI requests, retries and injected errors
+
+The pipeline is configured with the server's environment variables
+(JOB_WORKERS, TRANSCRIPTION_CHUNK_CODEC, ANALYSIS_COMBINE, ...).
+
+Usage:
+    python -m benchmarks.bench_meetings --minutes 1 10 120 --runs 3 --concurrency 4
+    python -m benchmarks.bench_meetings --minutes 10 --latency 0.5 --jitter 0.5 \\
+        --latency-distribution exponential --error-rate 0.05 --output results.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import ffmpeg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_openai import LATENCY_DISTRIBUTIONS, StubOpenAIServer
+
+# Seconds between memory samples
+MEMORY_SAMPLE_INTERVAL = 0.05
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def generate_speech(path, minutes, bitrate="64k"):
+    """Generate speech-like MP3 audio with ffmpeg.
+
+    A 150 Hz voiced tone with one harmonic is modulated at a syllable rate
+    of 4 Hz and gated by two slow, incommensurate sines, giving talk spurts
+    of a few seconds separated by pauses of up to about two seconds; pink
+    noise provides a noise floor.
+
+    Args:
+        path (str): Output path
+        minutes (float): Duration of the audio in minutes
+        bitrate (str): MP3 bitrate
+    """
+    seconds = minutes * 60
+    voice = ("0.4*(sin(2*PI*150*t)+0.5*sin(2*PI*300*t))*(0.6+0.4*sin(2*PI*4*t))"
+             "*gt(sin(2*PI*t/7.3)+0.6*sin(2*PI*t/2.9)\\,-0.8)")
+    speech = ffmpeg.input(f"aevalsrc={voice}:s=16000:d={seconds}", f="lavfi")
+    noise = ffmpeg.input(f"anoisesrc=color=pink:amplitude=0.01:duration={seconds}:r=16000", f="lavfi")
+    (
+        ffmpeg
+        .filter([speech, noise], "amix", inputs=2)
+        .output(path, ac=1, audio_bitrate=bitrate)
+        .run(quiet=True, overwrite_output=True)
+    )
+
+
+def _rss(pid="self"):
+    """Resident set size of a process in bytes, or 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _child_pids():
+    pids = []
+    for path in glob.glob("/proc/self/task/*/children"):
+        try:
+            with open(path) as f:
+                pids.extend(f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+class MemorySampler:
+    """Samples the RSS of this process and of its children (ffmpeg) in a background thread.
+
+    Reads /proc, so the peaks are only sampled on Linux; elsewhere the
+    process' lifetime maximum RSS is reported instead.
+    """
+
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.baseline = 0
+        self.peak = 0
+        self.peak_children = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.baseline = self.peak = _rss()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss())
+            self.peak_children = max(self.peak_children, sum(_rss(pid) for pid in _child_pids()))
+
+    def report(self):
+        mb = 1024 * 1024
+        if not os.path.exists("/proc/self/statm"):
+            # ru_maxrss is in KB on Linux and bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            scale = 1 if sys.platform == "darwin" else 1024
+            return {"process_peak_rss_mb": round(maxrss * scale / mb, 1)}
+        return {
+            "process_baseline_rss_mb": round(self.baseline / mb, 1),
+            "process_peak_rss_mb": round(self.peak / mb, 1),
+            "children_peak_rss_mb": round(self.peak_children / mb, 1),
+        }
+
+
+def _percentile(values, percentile):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_meetings(app, audio_path, work_dir, count):
+    """Submit ``count`` meetings at once to the job pipeline and wait for them.
+
+    Returns:
+        list: Finished jobs
+    """
+    jobs = []
+    for _ in range(count):
+        # The pipeline deletes its input, and a fresh hash misses the transcript cache
+        upload_path = os.path.join(work_dir, f"upload_{uuid.uuid4().hex}.mp3")
+        shutil.copyfile(audio_path, upload_path)
+        jobs.append(app.submit_meeting_job(upload_path, uuid.uuid4().hex))
+    for job in jobs:
+        job.wait()
+    return jobs
+
+
+def summarize_jobs(jobs, error_messages):
+    """Latency and outcome of finished jobs."""
+    failed = [job for job in jobs if job.error is not None]
+    failed_analyses = [job for job in jobs if job.error is None
+                       and error_messages.intersection(job.result["analysis"].values())]
+    completed = [job for job in jobs if job.error is None and job not in failed_analyses]
+
+    def stage_seconds(job, name):
+        times = job.stages.get(name, {})
+        if times.get("finished_at") is None:
+            return None
+        return times["finished_at"] - times["started_at"]
+
+    latencies = [job.finished_at - job.created_at for job in completed]
+    summary = {
+        "meetings": len(jobs),
+        "completed": len(completed),
+        "failed": len(failed),
+        "failed_analyses": len(failed_analyses),
+        "errors": sorted({str(job.error) for job in failed})[:5],
+    }
+    if latencies:
+        summary["latency_seconds"] = {
+            "mean": round(statistics.mean(latencies), 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "max": round(max(latencies), 3),
+        }
+        for stage in ("transcription", "analysis"):
+            seconds = [stage_seconds(job, stage) for job in completed]
+            summary[f"{stage}_seconds"] = round(statistics.mean(s for s in seconds if s is not None), 3)
+        summary["chunks"] = completed[0].stats.get("chunks")
+        summary["removed_silence_seconds"] = completed[0].stats.get("removed_silence_seconds")
+        summary["transcript_chars"] = len(completed[0].result["transcript"])
+        summary["analysis_chunks"] = completed[0].stats.get("analysis_chunks")
+        # Per-stage calls, tokens and latency of the analysis (map, reduce, final)
+        summary["usage"] = {stage: usage for stage, usage in completed[0].stats.get("usage", {}).items()
+                            if stage != "transcription"}
+    return summary
+
+
+def run_scenario(app, minutes, audio_path, work_dir, runs, concurrency, error_messages):
+    """Benchmark one meeting length: sequential runs for latency, then a concurrent batch."""
+    before = app.outbound.stats()
+    with MemorySampler() as memory:
+        sequential = []
+        for _ in range(runs):
+            sequential.extend(run_meetings(app, audio_path, work_dir, 1))
+
+        started = time.perf_counter()
+        concurrent = run_meetings(app, audio_path, work_dir, concurrency) if concurrency else []
+        wall = time.perf_counter() - started
+    after = app.outbound.stats()
+
+    result = {
+        "minutes": minutes,
+        "audio_bytes": os.path.getsize(audio_path),
+        "latency": summarize_jobs(sequential, error_messages),
+        "memory": memory.report(),
+        "openai": {
+            "attempts": after["attempts"] - before["attempts"],
+            "retries": after["retries"] - before["retries"],
+            "retry_reasons": {reason: count - before["retry_reasons"].get(reason, 0)
+                              for reason, count in after["retry_reasons"].items()
+                              if count > before["retry_reasons"].get(reason, 0)},
+        },
+    }
+    if concurrent:
+        completed = sum(1 for job in concurrent if job.error is None)
+        result["throughput"] = {
+            **summarize_jobs(concurrent, error_messages),
+            "concurrency": concurrency,
+            "wall_seconds": round(wall, 3),
+            "meetings_per_minute": round(completed / wall * 60, 3),
+            "audio_minutes_per_minute": round(completed * minutes / wall * 60, 3),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the meeting pipeline offline against the OpenAI stub")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 120],
+                        help="Meeting lengths to benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Meetings run one at a time per length, for latency")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Meetings submitted at once per length, for throughput (0 to skip)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Stub jitter in seconds")
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="exponential",
+                        help="Distribution of the stub jitter")
+    parser.add_argument("--transcription-seconds-per-mb", type=float, default=1.0,
+                        help="Stub transcription delay per MB of audio")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stub requests that fail")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After of injected 429s")
+    parser.add_argument("--seed", type=int, default=0, help="Stub random seed")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_meetings_")
+    stub = StubOpenAIServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                            retry_after=args.retry_after, seed=args.seed,
+                            latency_distribution=args.latency_distribution,
+                            transcription_seconds_per_mb=args.transcription_seconds_per_mb).start()
+    # Point the application at the stub, with caches that never hit
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    os.environ["WARMUP_ON_STARTUP"] = "false"
+    os.environ["TRANSCRIPT_CACHE_PATH"] = os.path.join(work_dir, "transcripts.sqlite3")
+    os.environ["ANALYSIS_CACHE_BACKEND"] = "memory"
+    os.environ["ANALYSIS_CACHE_MAX_ENTRIES"] = "0"
+    os.environ["JOB_QUEUE_SIZE"] = str(max(int(os.environ.get("JOB_QUEUE_SIZE", 20)), args.concurrency))
+
+    import app
+    from meeting_analysis import TASK_MESSAGES
+
+    error_messages = {messages[1] for messages in TASK_MESSAGES.values()}
+    results = {
+        "config": {
+            "stub": {"latency": args.latency, "jitter": args.jitter,
+                     "latency_distribution": args.latency_distribution,
+                     "transcription_seconds_per_mb": args.transcription_seconds_per_mb,
+                     "error_rate": args.error_rate},
+            "job_workers": app.JOB_WORKERS,
+            "transcription_concurrency": app.TRANSCRIPTION_CONCURRENCY,
+            "chunk_codec": app.TRANSCRIPTION_CHUNK_CODEC,
+            "analysis_concurrency": app.ANALYSIS_CONCURRENCY,
+            "analysis_combine": app.ANALYSIS_COMBINE,
+            "analysis_mode": app.ANALYSIS_MODE,
+        },
+        "scenarios": [],
+    }
+    try:
+        for minutes in args.minutes:
+            audio_path = os.path.join(work_dir, f"meeting_{minutes:g}min.mp3")
+            started = time.perf_counter()
+            generate_speech(audio_path, minutes)
+            print(f"Generated {minutes:g} minutes of audio in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            results["scenarios"].append(run_scenario(app, minutes, audio_path, work_dir, args.runs,
+                                                     args.concurrency, error_messages))
+            os.remove(audio_path)
+        results["stub"] = stub.stats()
+    finally:
+        stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Resilience benchmark of the outbound OpenAI client layer.
+
+Runs meetings (transcription of a set of audio chunks, then analysis of
+transcript_mock) against the local OpenAI stub with injected latency and
+errors, once with retries disabled and once with the retry policy, and
+reports as JSON how many meetings completed without a failed chunk or
+analysis, the time taken, the retries made and the errors injected.
+
+Usage:
+    python -m benchmarks.bench_outbound --meetings 5 --error-rate 0.1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_openai import StubOpenAIServer
+from meeting_analysis import MeetingAnalyzer, TASK_MESSAGES
+from outbound import OutboundHTTP, RetryPolicy
+from transcript_mock import transcript_mock
+from transcription import AudioTranscriber
+
+
+def make_chunks(directory, count, size_kb):
+    """Write placeholder audio chunks; the stub does not decode them."""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"chunk_{i:03d}.wav")
+        with open(path, "wb") as f:
+            f.write(os.urandom(size_kb * 1024))
+        paths.append(path)
+    return paths
+
+
+def run_meetings(outbound, meetings, chunk_paths, chunk_tokens):
+    """Transcribe and analyze several meetings, counting the ones that fully succeed.
+
+    Returns:
+        dict: Meetings completed, failed transcriptions and analyses, seconds
+    """
+    transcriber = AudioTranscriber(max_concurrent_chunks=4, outbound=outbound)
+    analyzer = MeetingAnalyzer(model_id="gpt-4o-mini", chunk_tokens=chunk_tokens, outbound=outbound)
+    error_messages = {messages[1] for messages in TASK_MESSAGES.values()}
+    completed = failed_transcriptions = failed_analyses = 0
+    started = time.perf_counter()
+    for meeting in range(meetings):
+        try:
+            transcriber.transcribe_chunks_with_openai(chunk_paths)
+        except Exception:
+            failed_transcriptions += 1
+            continue
+        # Distinct transcripts so the analysis cache does not hide calls
+        analysis = analyzer.analyze_transcript(f"Reunião {meeting}. " + transcript_mock)
+        if error_messages.intersection(analysis.values()):
+            failed_analyses += 1
+            continue
+        completed += 1
+    return {
+        "meetings_completed": completed,
+        "failed_transcriptions": failed_transcriptions,
+        "failed_analyses": failed_analyses,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OpenAI calls against an error-injecting stub")
+    parser.add_argument("--meetings", type=int, default=5, help="Meetings per configuration")
+    parser.add_argument("--chunks", type=int, default=12, help="Audio chunks per meeting")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="Size of each audio chunk in KB")
+    parser.add_argument("--chunk-tokens", type=int, default=2000, help="Transcript tokens per analysis call")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Share of stub requests that fail")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After of injected 429s")
+    parser.add_argument("--max-retries", type=int, default=4, help="Retries of the retrying configuration")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    directory = tempfile.mkdtemp(prefix="bench_outbound_")
+    results = {"meetings": args.meetings, "chunks": args.chunks, "error_rate": args.error_rate}
+    try:
+        chunk_paths = make_chunks(directory, args.chunks, args.chunk_kb)
+        for name, retries in (("no_retry", 0), ("retry", args.max_retries)):
+            with StubOpenAIServer(latency=args.latency, error_rate=args.error_rate,
+                                  retry_after=args.retry_after) as stub:
+                os.environ["OPENAI_BASE_URL"] = stub.base_url
+                outbound = OutboundHTTP(retry=RetryPolicy(max_retries=retries, base_delay=0.1))
+                result = run_meetings(outbound, args.meetings, chunk_paths, args.chunk_tokens)
+                results[name] = {**result, "outbound": outbound.stats(), "stub": stub.stats()}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
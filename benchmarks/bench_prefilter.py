@@ -0,0 +1,114 @@
+"""
+Offline benchmark of the extractive transcript pre-filter.
+
+Runs ExtractiveFilter over transcript_mock (repeated to reach longer
+meetings) at several keep ratios and reports, as JSON, the tokens saved,
+the filter runtime and how much of the reference analysis in
+analysis_mock is still supported by the kept text: the share of the
+analysis' content words that occur in the filtered transcript, relative
+to the share in the full transcript. The same coverage is reported for a
+baseline keeping randomly chosen sentences up to the same token count.
+No model calls are made.
+
+Usage:
+    python -m benchmarks.bench_prefilter --ratios 0.3,0.5,0.7 --repeat 1,4
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_mock import analysis_mock
+from transcript_mock import transcript_mock
+from extractive import ExtractiveFilter
+from tokenizer import TokenCounter, sentence_spans
+
+
+def reference_words(filter_):
+    """Content words of the reference analysis."""
+    return {word for text in analysis_mock.values() for word in filter_._words(text)}
+
+
+def coverage(filter_, words, text):
+    """Share of the reference words that occur in a text."""
+    return len(words & set(filter_._words(text))) / max(1, len(words))
+
+
+def random_baseline(counter, transcript, tokens, seed=11):
+    """Keep random sentences, in order, until they reach a token count."""
+    sentences = [transcript[start:end] for start, end in sentence_spans(transcript)]
+    sentence_tokens = counter.count_many(sentences)
+    order = list(range(len(sentences)))
+    random.Random(seed).shuffle(order)
+    kept = set()
+    used = 0
+    for i in order:
+        if used + sentence_tokens[i] <= tokens:
+            kept.add(i)
+            used += sentence_tokens[i]
+    return "".join(sentences[i] for i in sorted(kept))
+
+
+def run(counter, transcript, ratio):
+    """Filter one transcript at one keep ratio.
+
+    Args:
+        counter (TokenCounter): Token counter
+        transcript (str): Transcript text
+        ratio (float): Fraction of tokens to keep
+
+    Returns:
+        dict: Tokens before and after, runtime and reference coverage of the
+              filter and of the random baseline
+    """
+    filter_ = ExtractiveFilter(counter, keep_ratio=ratio)
+    stats = {}
+    started = time.perf_counter()
+    filtered = filter_.filter(transcript, stats)
+    seconds = time.perf_counter() - started
+
+    words = reference_words(filter_)
+    full_coverage = coverage(filter_, words, transcript)
+    return {
+        "tokens_in": stats["prefilter_tokens_in"],
+        "tokens_out": stats["prefilter_tokens_out"],
+        "tokens_saved": stats["prefilter_tokens_in"] - stats["prefilter_tokens_out"],
+        "sentences_in": stats["prefilter_sentences_in"],
+        "sentences_out": stats["prefilter_sentences_out"],
+        "seconds": seconds,
+        "reference_coverage": coverage(filter_, words, filtered) / full_coverage,
+        "random_baseline_coverage": coverage(
+            filter_, words, random_baseline(counter, transcript, stats["prefilter_tokens_out"])) / full_coverage,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extractive transcript pre-filter")
+    parser.add_argument("--ratios", default="0.3,0.5,0.7", help="Comma-separated keep ratios")
+    parser.add_argument("--repeat", default="1,4,16", help="Comma-separated transcript repetitions")
+    parser.add_argument("--model", default="gpt-4o", help="Model whose tokenizer is used")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    counter = TokenCounter(args.model)
+    results = {"tokenizer": counter.name, "runs": []}
+    for repeat in args.repeat.split(","):
+        transcript = " ".join([transcript_mock] * int(repeat))
+        for ratio in args.ratios.split(","):
+            result = run(counter, transcript, float(ratio))
+            results["runs"].append({"repeat": int(repeat), "keep_ratio": float(ratio), **result})
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
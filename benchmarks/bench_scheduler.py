@@ -0,0 +1,109 @@
+"""
+Benchmark of the outbound scheduler under a provider request-rate limit.
+
+Several meeting analyses run at once as batch jobs against the local
+OpenAI stub, which answers 429 beyond a request rate, while interactive
+extract-insights calls arrive in between. Runs once without a scheduler
+(calls go out at once and rely on retries) and once with the scheduler
+set to the stub's limit, and reports as JSON the 429s received, the
+time to finish each batch job, the latency of the interactive calls and
+the scheduler's queue waits.
+
+Usage:
+    python -m benchmarks.bench_scheduler --jobs 4 --rate-limit 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_openai import StubOpenAIServer
+from meeting_analysis import MeetingAnalyzer
+from outbound import OutboundHTTP, RetryPolicy
+from scheduler import OutboundScheduler, call_context, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from transcript_mock import transcript_mock
+
+MODEL = "gpt-4o-mini"
+
+
+def run_scenario(base_url, scheduler, jobs, interactive, chunk_tokens):
+    """Run batch analyses and interactive calls concurrently.
+
+    Returns:
+        dict: Seconds to finish each batch job and latency of each interactive call
+    """
+    os.environ["OPENAI_BASE_URL"] = base_url
+    outbound = OutboundHTTP(retry=RetryPolicy(max_retries=8, base_delay=0.2), scheduler=scheduler)
+    analyzer = MeetingAnalyzer(model_id=MODEL, chunk_tokens=chunk_tokens, outbound=outbound)
+    started = time.perf_counter()
+    job_seconds = [None] * jobs
+    interactive_seconds = []
+
+    def batch_job(i):
+        with call_context(job=f"job-{i}", priority=PRIORITY_BATCH):
+            analyzer.analyze_transcript(f"Reunião {i}. " + transcript_mock)
+        job_seconds[i] = time.perf_counter() - started
+
+    async def interactive_calls():
+        for i in range(interactive):
+            await asyncio.sleep(0.5)
+            call_started = time.perf_counter()
+            with call_context(job=f"request-{i}", priority=PRIORITY_INTERACTIVE):
+                await analyzer.aextract_insights(f"Pergunta {i}. " + transcript_mock[:2000])
+            interactive_seconds.append(time.perf_counter() - call_started)
+
+    threads = [threading.Thread(target=batch_job, args=(i,)) for i in range(jobs)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(interactive_calls())
+    for thread in threads:
+        thread.join()
+    return {
+        "seconds": time.perf_counter() - started,
+        "job_seconds": job_seconds,
+        "interactive_seconds": interactive_seconds,
+        "interactive_median_seconds": statistics.median(interactive_seconds) if interactive_seconds else None,
+        "retries": outbound.stats()["retries"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the outbound scheduler against a rate-limited stub")
+    parser.add_argument("--jobs", type=int, default=4, help="Concurrent batch analyses")
+    parser.add_argument("--interactive", type=int, default=4, help="Interactive calls during the batch")
+    parser.add_argument("--rate-limit", type=int, default=20, help="Requests per second the stub accepts")
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub latency in seconds")
+    parser.add_argument("--chunk-tokens", type=int, default=1000, help="Transcript tokens per analysis call")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    results = {"jobs": args.jobs, "rate_limit_per_second": args.rate_limit}
+    for name in ("unscheduled", "scheduled"):
+        scheduler = None
+        if name == "scheduled":
+            # A little under the provider limit; bursts of at most one second of budget
+            scheduler = OutboundScheduler(rpm=int(args.rate_limit * 60 * 0.9), burst_seconds=1)
+        with StubOpenAIServer(latency=args.latency, rate_limit=args.rate_limit) as stub:
+            result = run_scenario(stub.base_url, scheduler, args.jobs, args.interactive, args.chunk_tokens)
+            result["stub"] = stub.stats()
+        if scheduler:
+            result["scheduler"] = scheduler.stats()
+        results[name] = result
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
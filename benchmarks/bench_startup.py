@@ -0,0 +1,119 @@
+"""
+Cold-start benchmark of the API server.
+
+Starts ``uvicorn app:app`` in a fresh process several times and reports,
+as JSON, the seconds until the first successful response of
+/api/v1/health (the server is up) and, when the readiness endpoint
+exists, until /api/v1/ready reports the backends as warmed. No model
+calls are made; a placeholder OPENAI_API_KEY is used if none is set.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    """Pick an unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_status(url):
+    """Status code of a GET request, or None if the server does not answer yet."""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+
+def start_once(timeout):
+    """Start the server once and time its health and readiness.
+
+    Args:
+        timeout (float): Seconds to wait for each milestone
+
+    Returns:
+        dict: Seconds to the first health response and to "warmed" (None if
+              the readiness endpoint is missing or did not report it in time)
+    """
+    port = free_port()
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.setdefault("API_KEY", "benchmark")
+    base = f"http://127.0.0.1:{port}/api/v1"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        health = None
+        while time.perf_counter() - started < timeout:
+            if get_status(f"{base}/health") == 200:
+                health = time.perf_counter() - started
+                break
+            time.sleep(0.01)
+
+        warmed = None
+        while health is not None and time.perf_counter() - started < timeout:
+            status = get_status(f"{base}/ready")
+            if status == 200:
+                warmed = time.perf_counter() - started
+                break
+            if status == 404:
+                break
+            time.sleep(0.01)
+        return {"health_seconds": health, "warmed_seconds": warmed}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def summarize(values):
+    """Median, minimum and maximum of the measurements that completed."""
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return {"median": statistics.median(values), "min": min(values), "max": max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API server cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Server starts to measure")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for each milestone")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    runs = [start_once(args.timeout) for _ in range(args.runs)]
+    results = {
+        "runs": runs,
+        "health_seconds": summarize([run["health_seconds"] for run in runs]),
+        "warmed_seconds": summarize([run["warmed_seconds"] for run in runs]),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
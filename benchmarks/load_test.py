@@ -0,0 +1,418 @@
+"""
+Concurrent load test of the HTTP API.
+
+Starts the local OpenAI stub and the application under uvicorn in a
+subprocess wired to it (or targets a running server with --url), then
+keeps --concurrency virtual users sending a weighted mix of requests for
+--duration seconds: audio uploads to /api/v1/analyze-meeting and
+transcripts to the extract endpoints. Every upload and transcript is made
+unique so the transcript and analysis caches do not hide the work.
+
+Reports as JSON, per endpoint and overall, the requests sent, p50, p95
+and p99 latency, error rate, rate-limit rejections (429) and queue-full
+rejections (503), plus a timeline of requests in flight, completions and
+errors with the CPU and RSS of the server process and its ffmpeg
+children. Use it to check a capacity change (JOB_WORKERS, concurrency
+limits, codecs) before deploying it: with --cpus 1 the server is pinned
+to one CPU and its peak RSS is compared with --memory-limit-mb, as on
+a fly.io shared-cpu-1x machine with 1024 MB.
+
+The server inherits this process' environment, so it is configured with
+the usual variables. The rate limit is lifted unless RATE_LIMIT_REQUESTS
+is set; set it to measure rejections at the production limit.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 8 --duration 120 --cpus 1
+    python -m benchmarks.load_test --mix analyze-meeting=1 --audio-minutes 30 --concurrency 4
+    python -m benchmarks.load_test --url http://localhost:8000 --api-key KEY --pid 1234
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import secrets
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_meetings import generate_speech
+from benchmarks.stub_openai import LATENCY_DISTRIBUTIONS, StubOpenAIServer, make_transcript
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoints the load is made of, by name in --mix
+ENDPOINTS = {
+    "analyze-meeting": "/api/v1/analyze-meeting",
+    "extract-insights": "/api/v1/extract-insights",
+    "extract-action-items": "/api/v1/extract-action-items",
+    "generate-bullet-points": "/api/v1/generate-bullet-points",
+}
+DEFAULT_MIX = "analyze-meeting=1,extract-insights=1,extract-action-items=1,generate-bullet-points=1"
+# Words of the transcripts sent to the extract endpoints, about a 30 minute meeting
+TRANSCRIPT_WORDS = 4500
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def parse_mix(text):
+    """Parse "name=weight,..." into a dict of endpoint names to weights."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def unique_audio(audio):
+    """Prefix MP3 audio with an ID3 tag holding a random id, so every upload hashes differently.
+
+    Decoders skip the tag, so the audio itself is unchanged.
+    """
+    text = b"\x00loadtest\x00" + uuid.uuid4().hex.encode()
+    frame = b"TXXX" + struct.pack(">I", len(text)) + b"\x00\x00" + text
+    size = len(frame)
+    # Tag size is a 28-bit synchsafe integer
+    synchsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b"ID3\x03\x00\x00" + synchsafe + frame + audio
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _process_usage(pid):
+    """CPU seconds and RSS bytes of a process and its children, or None if it is gone.
+
+    CPU time covers the process, its finished children and the running
+    ones, so it grows steadily as ffmpeg processes come and go.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+    # utime, stime, cutime, cstime
+    ticks = sum(int(value) for value in fields[11:15])
+    for path in glob.glob(f"/proc/{pid}/task/*/children"):
+        try:
+            with open(path) as f:
+                children = f.read().split()
+        except OSError:
+            continue
+        for child in children:
+            usage = _process_usage(child)
+            if usage is not None:
+                ticks += usage[0] * CLOCK_TICKS
+                rss += usage[1]
+    return ticks / CLOCK_TICKS, rss
+
+
+def _percentile(values, percentile):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LoadStats:
+    """Outcomes of the requests sent, overall and over time."""
+
+    def __init__(self):
+        self.results = {name: [] for name in ENDPOINTS}
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+
+    def record(self, name, status, seconds):
+        self.results[name].append((status, seconds))
+        self.completed += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    @staticmethod
+    def summarize(results, duration):
+        latencies = [seconds for status, seconds in results if status is not None and status < 400]
+        statuses = {}
+        for status, _ in results:
+            key = str(status) if status is not None else "connection_error"
+            statuses[key] = statuses.get(key, 0) + 1
+        errors = sum(1 for status, _ in results if status is None or status >= 400)
+        summary = {
+            "requests": len(results),
+            "ok": len(latencies),
+            "error_rate": round(errors / len(results), 4) if results else 0.0,
+            "rate_limited": statuses.get("429", 0),
+            "queue_full": statuses.get("503", 0),
+            "statuses": statuses,
+            "requests_per_second": round(len(results) / duration, 3) if duration else None,
+        }
+        if latencies:
+            summary["latency_seconds"] = {
+                "p50": round(_percentile(latencies, 50), 3),
+                "p95": round(_percentile(latencies, 95), 3),
+                "p99": round(_percentile(latencies, 99), 3),
+                "max": round(max(latencies), 3),
+            }
+        return summary
+
+    def report(self, duration):
+        endpoints = {name: self.summarize(results, duration) for name, results in self.results.items() if results}
+        everything = [result for results in self.results.values() for result in results]
+        return {"overall": self.summarize(everything, duration), "endpoints": endpoints}
+
+
+class Sampler:
+    """Records load and server resource use every interval, in a background thread."""
+
+    def __init__(self, stats, pid=None, interval=1.0):
+        self.stats = stats
+        self.pid = pid
+        self.interval = interval
+        self.timeline = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        started = time.monotonic()
+        previous = _process_usage(self.pid) if self.pid else None
+        previous_time = started
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            sample = {
+                "t": round(now - started, 2),
+                "in_flight": self.stats.in_flight,
+                "completed": self.stats.completed,
+                "errors": self.stats.errors,
+            }
+            usage = _process_usage(self.pid) if self.pid else None
+            if usage is not None:
+                if previous is not None:
+                    sample["cpu_percent"] = round((usage[0] - previous[0]) / (now - previous_time) * 100, 1)
+                sample["rss_mb"] = round(usage[1] / (1024 * 1024), 1)
+                previous, previous_time = usage, now
+            self.timeline.append(sample)
+
+    def report(self, memory_limit_mb=None):
+        cpu = [sample["cpu_percent"] for sample in self.timeline if "cpu_percent" in sample]
+        rss = [sample["rss_mb"] for sample in self.timeline if "rss_mb" in sample]
+        if not rss:
+            return None
+        server = {
+            "cpu_percent_mean": round(sum(cpu) / len(cpu), 1) if cpu else None,
+            "cpu_percent_peak": max(cpu) if cpu else None,
+            "rss_mb_start": rss[0],
+            "rss_mb_peak": max(rss),
+        }
+        if memory_limit_mb:
+            server["memory_limit_mb"] = memory_limit_mb
+            server["exceeds_memory_limit"] = max(rss) > memory_limit_mb
+        return server
+
+
+async def run_user(client, stats, mix, audio, deadline, think_time, rng):
+    """One virtual user: send requests drawn from the mix until the deadline."""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        if name == "analyze-meeting":
+            request = {"files": {"audio_file": ("meeting.mp3", unique_audio(audio), "audio/mpeg")}}
+        else:
+            # A distinct first sentence gives a distinct analysis cache key
+            request = {"data": {"transcript": f"Reunião {uuid.uuid4().hex}. " + make_transcript(TRANSCRIPT_WORDS)}}
+        stats.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = await client.post(ENDPOINTS[name], **request)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = None
+        finally:
+            stats.in_flight -= 1
+        stats.record(name, status, time.monotonic() - started)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+async def run_load(url, api_key, mix, audio, concurrency, duration, think_time, request_timeout, stats, seed):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, headers={"X-API-Key": api_key}, limits=limits,
+                                 timeout=request_timeout) as client:
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*(run_user(client, stats, mix, audio, deadline, think_time, random.Random(seed + i))
+                               for i in range(concurrency)))
+
+
+def _tail(path, lines=20):
+    with open(path, errors="replace") as f:
+        return "".join(f.readlines()[-lines:])
+
+
+def start_server(work_dir, stub_url, api_key, cpus, log_path):
+    """Start the application under uvicorn, wired to the stub, and wait until it answers.
+
+    Returns:
+        tuple: (subprocess.Popen, base URL)
+    """
+    port = _free_port()
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": stub_url,
+        "API_KEY": api_key,
+        "TRANSCRIPT_CACHE_PATH": os.path.join(work_dir, "transcripts.sqlite3"),
+        "ANALYSIS_CACHE_PATH": os.path.join(work_dir, "analysis.sqlite3"),
+        "RATE_LIMIT_PATH": os.path.join(work_dir, "ratelimit.sqlite3"),
+    }
+    env.setdefault("OPENAI_API_KEY", "load-test")
+    env.setdefault("RATE_LIMIT_REQUESTS", "1000000000")
+    log = open(log_path, "w")
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1",
+                                "--port", str(port), "--no-access-log"],
+                               cwd=REPO_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    log.close()
+    if cpus and hasattr(os, "sched_setaffinity"):
+        # ffmpeg processes started by the server inherit the affinity
+        os.sched_setaffinity(process.pid, set(sorted(os.sched_getaffinity(0))[:cpus]))
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}:\n{_tail(log_path)}")
+        try:
+            if httpx.get(url + "/api/v1/health", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server did not start within 60s:\n{_tail(log_path)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against the OpenAI stub")
+    parser.add_argument("--url", help="Target a running server instead of starting one")
+    parser.add_argument("--api-key", help="API key of the server given with --url")
+    parser.add_argument("--pid", type=int, help="Process id of the server given with --url, to sample its CPU and RSS")
+    parser.add_argument("--concurrency", type=int, default=8, help="Virtual users sending requests")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted endpoints, e.g. analyze-meeting=2,extract-insights=1")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean seconds a user waits between requests")
+    parser.add_argument("--audio-minutes", type=float, default=5, help="Length of the uploaded meeting")
+    parser.add_argument("--audio-file", help="Upload this MP3 file instead of generating one")
+    parser.add_argument("--request-timeout", type=float, default=600, help="Seconds before a request is abandoned")
+    parser.add_argument("--cpus", type=int, help="Pin the started server to this many CPUs")
+    parser.add_argument("--memory-limit-mb", type=float, default=1024, help="Memory budget the server RSS is checked against")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between timeline samples")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Stub jitter in seconds")
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="exponential",
+                        help="Distribution of the stub jitter")
+    parser.add_argument("--transcription-seconds-per-mb", type=float, default=1.0,
+                        help="Stub transcription delay per MB of audio")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stub requests that fail")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the stub and the request mix")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.url and not args.api_key:
+        parser.error("--api-key is required with --url")
+
+    work_dir = tempfile.mkdtemp(prefix="load_test_")
+    stub = server = None
+    try:
+        if args.audio_file:
+            with open(args.audio_file, "rb") as f:
+                audio = f.read()
+        else:
+            audio_path = os.path.join(work_dir, "meeting.mp3")
+            generate_speech(audio_path, args.audio_minutes, bitrate="32k")
+            with open(audio_path, "rb") as f:
+                audio = f.read()
+
+        if args.url:
+            url, api_key, pid = args.url.rstrip("/"), args.api_key, args.pid
+        else:
+            stub = StubOpenAIServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                    seed=args.seed, latency_distribution=args.latency_distribution,
+                                    transcription_seconds_per_mb=args.transcription_seconds_per_mb).start()
+            api_key = secrets.token_urlsafe(16)
+            server, url = start_server(work_dir, stub.base_url, api_key, args.cpus,
+                                       os.path.join(work_dir, "server.log"))
+            pid = server.pid
+
+        stats = LoadStats()
+        sampler = Sampler(stats, pid, args.sample_interval)
+        sampler.start()
+        started = time.monotonic()
+        asyncio.run(run_load(url, api_key, mix, audio, args.concurrency, args.duration, args.think_time,
+                             args.request_timeout, stats, args.seed))
+        elapsed = time.monotonic() - started
+        sampler.stop()
+
+        results = {
+            "config": {
+                "url": args.url, "concurrency": args.concurrency, "duration": args.duration, "mix": mix,
+                "think_time": args.think_time, "audio_bytes": len(audio), "cpus": args.cpus,
+                "stub": None if args.url else {
+                    "latency": args.latency, "jitter": args.jitter,
+                    "latency_distribution": args.latency_distribution,
+                    "transcription_seconds_per_mb": args.transcription_seconds_per_mb,
+                    "error_rate": args.error_rate,
+                },
+            },
+            # Users finish their last request after the deadline, so this exceeds --duration
+            "elapsed_seconds": round(elapsed, 3),
+            **stats.report(elapsed),
+            "server": sampler.report(args.memory_limit_mb),
+            "timeline": sampler.timeline,
+        }
+        if stub is not None:
+            results["stub"] = stub.stats()
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if stub is not None:
+            stub.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
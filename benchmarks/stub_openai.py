@@ -0,0 +1,286 @@
+"""
+Local stand-in for the OpenAI API with injectable latency and errors.
+
+Serves the two endpoints the application calls, /v1/audio/transcriptions
+and /v1/chat/completions (plain, JSON-object and streamed responses),
+with canned Portuguese output. Each request can be delayed (a fixed
+latency plus uniform or exponentially distributed jitter, and for
+transcriptions a processing time per MB of audio) and can fail with a 429
+(with Retry-After), 500 or 503, and a request rate limit can be enforced
+like the provider's, so retries, timeouts, scheduling and throughput can
+be exercised offline. GET /stats reports the requests
+served and the errors injected.
+
+Point the application at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1.
+
+Usage:
+    python -m benchmarks.stub_openai --port 8099 --latency 0.2 --error-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS_TEXT = "1. Ponto discutido na reunião.\n2. Próximo passo combinado com a equipe."
+STRUCTURED_TEXT = json.dumps({
+    "insights": ["Ponto discutido na reunião."],
+    "action_items": [{"task": "Enviar o relatório", "owner": "Ana", "deadline": "sexta-feira"}],
+    "bullet_points": ["Reunião de acompanhamento do projeto."],
+}, ensure_ascii=False)
+# Words of transcript returned per KB of uploaded audio
+TRANSCRIPT_WORDS_PER_KB = 2
+# Sentences transcripts are made of, numbered so that they differ
+TRANSCRIPT_SENTENCES = (
+    "Vamos revisar o andamento do projeto {n} com a equipe",
+    "O prazo da entrega {n} depende da aprovação do cliente",
+    "Precisamos decidir quem acompanha a pendência {n} esta semana",
+    "Os números do trimestre mostram crescimento na região {n}",
+    "Fica combinado enviar o relatório {n} até sexta-feira",
+)
+# Jitter distributions: uniform up to jitter seconds, or exponential with a mean of jitter seconds
+LATENCY_DISTRIBUTIONS = ("uniform", "exponential")
+
+
+def make_transcript(words):
+    """Build a transcript of about ``words`` words from numbered sentences."""
+    sentences = []
+    count = 0
+    n = 0
+    while count < words:
+        sentence = TRANSCRIPT_SENTENCES[n % len(TRANSCRIPT_SENTENCES)].format(n=n) + "."
+        sentences.append(sentence)
+        count += len(sentence.split())
+        n += 1
+    return " ".join(sentences)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on a response (timeouts, cancelled hedged calls) are expected
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubOpenAIServer:
+    """Threaded HTTP server imitating the OpenAI endpoints used by the application."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_statuses=(429, 500, 503), retry_after=1.0, stream_chunks=5, rate_limit=None,
+                 rate_window=1.0, seed=0, latency_distribution="uniform", transcription_seconds_per_mb=0.0):
+        """Initialize the server.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port to listen on; 0 picks a free one
+            latency (float): Seconds added to every response
+            jitter (float): Extra random delay: up to this many seconds, or on
+                            average this many with the exponential distribution
+            error_rate (float): Share of requests answered with an error
+            error_statuses (tuple): Statuses injected errors are drawn from
+            retry_after (float): Retry-After seconds sent with injected 429s
+            stream_chunks (int): Pieces a streamed completion is sent in
+            rate_limit (int): Requests accepted per rate_window; further ones
+                              get a 429 until the window ends (None: no limit)
+            rate_window (float): Seconds of the rate limit window
+            seed (int): Random seed
+            latency_distribution (str): Distribution of the jitter, "uniform"
+                                        or "exponential" (a long tail of slow
+                                        responses)
+            transcription_seconds_per_mb (float): Delay added to a transcription
+                                                  per MB of uploaded audio, as
+                                                  Whisper takes longer on longer
+                                                  chunks
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.retry_after = retry_after
+        self.stream_chunks = max(1, stream_chunks)
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.latency_distribution = latency_distribution
+        self.transcription_seconds_per_mb = transcription_seconds_per_mb
+        self.requests = 0
+        self.errors = {}
+        self._window_start = 0.0
+        self._window_requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _HTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """str: Base URL to use as OPENAI_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve requests in a background thread.
+
+        Returns:
+            StubOpenAIServer: This server
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def stats(self):
+        """Requests served and errors injected, by status."""
+        with self._lock:
+            return {"requests": self.requests, "errors": dict(self.errors)}
+
+    def _draw(self):
+        """Count a request and decide its delay, error status if any, and Retry-After."""
+        with self._lock:
+            self.requests += 1
+            if self.latency_distribution == "exponential" and self.jitter > 0:
+                delay = self.latency + self._random.expovariate(1 / self.jitter)
+            else:
+                delay = self.latency + self._random.uniform(0, self.jitter)
+            if self.rate_limit:
+                now = time.monotonic()
+                if now - self._window_start >= self.rate_window:
+                    self._window_start = now
+                    self._window_requests = 0
+                self._window_requests += 1
+                if self._window_requests > self.rate_limit:
+                    self.errors[429] = self.errors.get(429, 0) + 1
+                    return 0.0, 429, self._window_start + self.rate_window - now
+            status = None
+            if self._random.random() < self.error_rate:
+                status = self._random.choice(self.error_statuses)
+                self.errors[status] = self.errors.get(status, 0) + 1
+            return delay, status, self.retry_after
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, server.stats())
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                delay, status, retry_after = server._draw()
+                if self.path.endswith("/audio/transcriptions"):
+                    delay += len(body) / (1024 * 1024) * server.transcription_seconds_per_mb
+                time.sleep(delay)
+                if status is not None:
+                    headers = {"Retry-After": f"{retry_after:.3f}"} if status == 429 else None
+                    self._send_json(status, {"error": {"message": "Injected error", "type": "stub_error",
+                                                       "code": None}}, headers)
+                elif self.path.endswith("/audio/transcriptions"):
+                    words = max(1, len(body) // 1024 * TRANSCRIPT_WORDS_PER_KB)
+                    self._send_json(200, {"text": make_transcript(words)})
+                elif self.path.endswith("/chat/completions"):
+                    self._chat(json.loads(body or b"{}"))
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def _chat(self, request):
+                structured = (request.get("response_format") or {}).get("type") == "json_object"
+                text = STRUCTURED_TEXT if structured else ANALYSIS_TEXT
+                prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4,
+                         "total_tokens": prompt_tokens + len(text) // 4}
+                base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": request.get("model", "stub")}
+                if not request.get("stream"):
+                    self._send_json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [{
+                        "index": 0, "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": text}}]})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                size = -(-len(text) // server.stream_chunks)
+                pieces = [text[i:i + size] for i in range(0, len(text), size)]
+                events = [{**base, "object": "chat.completion.chunk", "choices": [{
+                    "index": 0, "delta": {"content": piece}, "finish_reason": None}]} for piece in pieces]
+                events.append({**base, "object": "chat.completion.chunk", "usage": usage, "choices": [{
+                    "index": 0, "delta": {}, "finish_reason": "stop"}]})
+                for event in events:
+                    self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\n\n")
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI API stub")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8099, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="uniform",
+                        help="Distribution of the jitter (exponential: mean of --jitter seconds)")
+    parser.add_argument("--transcription-seconds-per-mb", type=float, default=0.0,
+                        help="Delay added to transcriptions per MB of audio")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with an error")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds of injected 429s")
+    parser.add_argument("--rate-limit", type=int, help="Requests accepted per --rate-window seconds")
+    parser.add_argument("--rate-window", type=float, default=1.0, help="Seconds of the rate limit window")
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                              error_rate=args.error_rate, retry_after=args.retry_after,
+                              rate_limit=args.rate_limit, rate_window=args.rate_window,
+                              latency_distribution=args.latency_distribution,
+                              transcription_seconds_per_mb=args.transcription_seconds_per_mb)
+    print(f"OpenAI stub listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
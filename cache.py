@@ -0,0 +1,273 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Both caches store string values and expose the same get/set/stats interface,
+# so callers can switch backends through configuration. Coroutines use
+# aget/aset, which keep disk access of the SQLite cache off the event loop.
+
+
+class MemoryLRUCache:
+    """In-process string cache with a bounded number of entries.
+
+    Least recently used entries are evicted beyond ``max_entries`` and entries
+    older than ``ttl`` seconds are treated as misses.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            ttl (float): Seconds an entry stays valid, or None to never expire
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Look up a value and mark it as recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key (str): Cache key
+            value (str): Value to store
+        """
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def aget(self, key):
+        """Look up a value from a coroutine; see get()."""
+        return self.get(key)
+
+    async def aset(self, key, value):
+        """Store a value from a coroutine; see set()."""
+        self.set(key, value)
+
+    def stats(self):
+        """Report cache usage counters.
+
+        Returns:
+            dict: Hits, misses, evictions and number of entries
+        """
+        with self._lock:
+            return {
+                "backend": "memory",
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+            }
+
+
+class SQLiteLRUCache:
+    """Persistent string cache stored in a SQLite file.
+
+    The total size of the stored values is bounded; when it is exceeded the
+    least recently used entries are evicted. The total is kept up to date in
+    its own row by every write, so no write has to sum the table. Entries
+    older than ``ttl`` seconds are treated as misses and purged. Safe to
+    share between threads and between processes using the same file.
+    """
+
+    def __init__(self, path, max_size_mb=200, ttl=None):
+        """Initialize the cache.
+
+        Args:
+            path (str): Path of the SQLite database file
+            max_size_mb (float): Maximum total size of the cached values in MB
+            ttl (float): Seconds an entry stays valid, or None to never expire
+        """
+        self.path = path
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " expires_at REAL)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(cache)")]
+        if "expires_at" not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN expires_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_last_access ON cache (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_size ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " total INTEGER NOT NULL)"
+        )
+        # Sums the table once, for files written before the total was kept
+        self._conn.execute("INSERT OR IGNORE INTO cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM cache")
+
+    def get(self, key):
+        """Look up a value and mark it as recently used.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            str: The cached value, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._delete([key])
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        """Store a value, evicting least recently used entries if needed.
+
+        Args:
+            key (str): Cache key
+            value (str): Value to store
+        """
+        size = len(value.encode("utf-8"))
+        if size > self.max_size:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, last_access, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, expires_at),
+                )
+                self._add_size(size - (row[0] if row else 0))
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _add_size(self, delta):
+        """Adjust the stored total size. Caller holds the lock, in a transaction."""
+        if delta:
+            self._conn.execute("UPDATE cache_size SET total = total + ? WHERE id = 0", (delta,))
+
+    def _total_size(self):
+        return self._conn.execute("SELECT total FROM cache_size WHERE id = 0").fetchone()[0]
+
+    def _delete(self, keys):
+        """Delete entries and subtract their size. Caller holds the lock, in a transaction."""
+        deleted = 0
+        for key in keys:
+            row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._add_size(-row[0])
+                deleted += 1
+        self.evictions += deleted
+
+    def _evict(self):
+        """Delete expired entries, then least recently used ones until the size bound holds.
+
+        Caller holds the lock, in a transaction.
+        """
+        expired = [key for (key,) in self._conn.execute(
+            "SELECT key FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )]
+        self._delete(expired)
+
+        total = self._total_size()
+        if total <= self.max_size:
+            return
+
+        to_delete = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY last_access"):
+            if total <= self.max_size:
+                break
+            to_delete.append(key)
+            total -= size
+        self._delete(to_delete)
+
+    async def aget(self, key):
+        """Look up a value from a coroutine, in a worker thread; see get()."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key, value):
+        """Store a value from a coroutine, in a worker thread; see set()."""
+        await asyncio.to_thread(self.set, key, value)
+
+    def stats(self):
+        """Report cache usage counters.
+
+        Returns:
+            dict: Hits, misses, evictions, number of entries and total size in bytes
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            size = self._total_size()
+            return {
+                "backend": "sqlite",
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "size_bytes": size,
+                "max_size_bytes": self.max_size,
+                "ttl": self.ttl,
+            }
@@ -0,0 +1,146 @@
+import heapq
+import re
+
+import numpy as np
+
+from tokenizer import sentence_spans
+
+# Frequent Portuguese words that carry no topic
+STOPWORDS = frozenset("""
+a à ao aos as às até com como da das de dela dele deles do dos e é ela ele eles em entre era essa esse
+esta está estão este eu foi for há isso isto já lá mais mas me mesmo meu minha muito na não nas nem
+no nos nós num numa o os ou para pela pelas pelo pelos por porque pra qual quando que quem se sem ser
+seu sua são só também te tem tá ter então tipo aí né daí assim aqui gente coisa vai vou bem bom
+uma um umas uns você vocês sobre sim ok olá oi tudo todo toda todos todas ainda agora depois
+""".split())
+
+# Words that usually mark a commitment; such sentences are boosted so action items survive
+ACTION_CUES = frozenset("""
+precisa precisamos preciso fazer faz vamos irá vai fica ficou responsável prazo entregar enviar
+mandar revisar agendar marcar definir decidimos decidiu combinado combinamos até segunda terça quarta
+quinta sexta sábado domingo amanhã semana mês próxima próximo
+""".split())
+ACTION_CUE_BOOST = 1.5
+
+WORD = re.compile(r'\w+', re.UNICODE)
+
+
+class ExtractiveFilter:
+    """Keeps the most informative sentences of a transcript, in their original order.
+
+    Each content word is weighted by its inverse document frequency across
+    the transcript's sentences (TF-IDF), and sentences are picked greedily by
+    the weight of the words they add that no kept sentence has yet, per
+    token. Long or repetitive sentences that restate covered topics, and
+    filler, are dropped first; sentences with commitment words get a boost so
+    action items survive. Sentences are kept up to a fraction of the
+    transcript or a token budget, or until nothing new is left to add.
+    """
+
+    def __init__(self, counter, keep_ratio=None, max_tokens=None):
+        """Initialize the filter.
+
+        Args:
+            counter (TokenCounter): Token counter for the analysis model
+            keep_ratio (float): Fraction of the transcript tokens to keep
+            max_tokens (int): Maximum tokens to keep; combined with keep_ratio
+                              the smaller limit applies
+        """
+        if keep_ratio is None and max_tokens is None:
+            raise ValueError("Set keep_ratio, max_tokens or both")
+        self.counter = counter
+        self.keep_ratio = keep_ratio
+        self.max_tokens = max_tokens
+
+    def _words(self, sentence):
+        """Content words of a sentence."""
+        return [word for word in WORD.findall(sentence.lower()) if len(word) > 2 and word not in STOPWORDS
+                and not word.isdigit()]
+
+    def _word_weights(self, sentence_words):
+        """Inverse document frequency of each word over the sentences."""
+        vocabulary = {}
+        for words in sentence_words:
+            for word in words:
+                vocabulary[word] = vocabulary.get(word, 0) + 1
+        frequency = np.fromiter(vocabulary.values(), dtype=np.float64, count=len(vocabulary))
+        weights = np.log((1 + len(sentence_words)) / (1 + frequency)) + 1
+        return dict(zip(vocabulary, weights.tolist()))
+
+    def select(self, sentences, tokens, budget):
+        """Choose the sentences to keep.
+
+        Args:
+            sentences (list): Sentence texts
+            tokens (numpy.ndarray): Tokens of each sentence
+            budget (int): Maximum tokens to keep
+
+        Returns:
+            numpy.ndarray: Boolean mask of the kept sentences
+        """
+        sentence_words = [set(self._words(sentence)) for sentence in sentences]
+        weights = self._word_weights(sentence_words)
+        boost = [ACTION_CUE_BOOST if ACTION_CUES.intersection(WORD.findall(sentence.lower())) else 1.0
+                 for sentence in sentences]
+
+        def gain(i, covered):
+            new_weight = sum(weights[word] for word in sentence_words[i] if word not in covered)
+            return new_weight * boost[i] / max(1, tokens[i])
+
+        # Lazy greedy: a sentence's gain only shrinks as words get covered, so
+        # a stale heap entry is rescored and only taken if it still leads
+        covered = set()
+        heap = [(-gain(i, covered), i) for i in range(len(sentences))]
+        heapq.heapify(heap)
+        kept = np.zeros(len(sentences), dtype=bool)
+        used = 0
+        while heap:
+            _, i = heapq.heappop(heap)
+            current = gain(i, covered)
+            if current <= 0:
+                continue
+            if heap and current < -heap[0][0]:
+                heapq.heappush(heap, (-current, i))
+                continue
+            if used + tokens[i] > budget:
+                continue
+            kept[i] = True
+            used += tokens[i]
+            covered |= sentence_words[i]
+        return kept
+
+    def filter(self, text, stats=None):
+        """Drop the least informative sentences of a text.
+
+        Args:
+            text (str): Transcript text
+            stats (dict): Optional dict filled with "prefilter_tokens_in",
+                          "prefilter_tokens_out", "prefilter_sentences_in" and
+                          "prefilter_sentences_out"
+
+        Returns:
+            str: The kept sentences in their original order
+        """
+        spans = sentence_spans(text)
+        sentences = [text[start:end] for start, end in spans]
+        tokens = np.array(self.counter.count_many(sentences), dtype=np.int64)
+        total = int(tokens.sum())
+
+        budget = total
+        if self.keep_ratio is not None:
+            budget = min(budget, int(total * self.keep_ratio))
+        if self.max_tokens is not None:
+            budget = min(budget, self.max_tokens)
+
+        if budget >= total or len(sentences) < 2:
+            kept = np.ones(len(sentences), dtype=bool)
+        else:
+            kept = self.select(sentences, tokens, budget)
+
+        result = "".join(sentence for sentence, keep in zip(sentences, kept) if keep)
+        if stats is not None:
+            stats["prefilter_tokens_in"] = total
+            stats["prefilter_tokens_out"] = int(tokens[kept].sum())
+            stats["prefilter_sentences_in"] = len(sentences)
+            stats["prefilter_sentences_out"] = int(kept.sum())
+        return result
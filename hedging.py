@@ -0,0 +1,218 @@
+import asyncio
+import bisect
+import math
+import threading
+import time
+from collections import deque
+
+from metrics import Counter, Gauge
+from tracing import span, current_span
+
+# Hedged requests: a call still running after the recent p95 (by default) of
+# its kind gets a duplicate, and whichever finishes first is used. The other
+# one is cancelled: its asyncio task is cancelled and its HTTP request
+# aborted. Calls are hedged from coroutines only, since a blocking call in a
+# thread could not be stopped; synchronous code hedges on
+# OutboundHTTP.run_sync(). Duplicates cost
+# money, so they are paid for from a budget that grows by ``max_extra`` per
+# call: at most that fraction of extra calls, in bursts of ``max_burst``.
+
+HEDGE_CALLS = Counter("hedge_calls", "Calls made through a hedger, by component", ["component"])
+HEDGES = Counter("hedges", "Duplicate calls sent for calls slower than the hedging threshold", ["component"])
+HEDGE_WINS = Counter("hedge_wins", "Hedged calls whose duplicate finished first", ["component"])
+HEDGES_SKIPPED = Counter("hedges_skipped", "Slow calls not hedged because the extra-call budget was spent",
+                         ["component"])
+HEDGE_THRESHOLD_SECONDS = Gauge("hedge_threshold_seconds",
+                                "Latency after which a call is hedged, per unit of size", ["component", "key"])
+
+
+class LatencyTracker:
+    """Percentile of the latest latencies of one kind of call, per unit of request size."""
+
+    def __init__(self, window=200):
+        """Initialize the tracker.
+
+        Args:
+            window (int): Latencies kept; older ones are forgotten so the
+                          percentile follows the provider's current speed
+        """
+        self._samples = deque(maxlen=window)
+        self._sorted = []
+
+    def __len__(self):
+        return len(self._samples)
+
+    def observe(self, seconds):
+        if len(self._samples) == self._samples.maxlen:
+            oldest = self._samples[0]
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._samples.append(seconds)
+        bisect.insort(self._sorted, seconds)
+
+    def percentile(self, percentile):
+        """Latency below which ``percentile`` percent of the kept latencies are."""
+        if not self._sorted:
+            return None
+        index = min(len(self._sorted) - 1, max(0, math.ceil(percentile / 100 * len(self._sorted)) - 1))
+        return self._sorted[index]
+
+
+class Hedger:
+    """Sends a duplicate of calls slower than a tracked latency percentile, within an extra-call budget."""
+
+    def __init__(self, component, percentile=95, max_extra=0.05, max_burst=5, min_samples=20,
+                 min_delay=1.0, window=200):
+        """Initialize the hedger.
+
+        Args:
+            component (str): Component name in metrics ("transcription", "analysis")
+            percentile (float): Latency percentile after which a call is hedged
+            max_extra (float): Extra calls allowed per call, e.g. 0.05 for at
+                               most 5% more calls
+            max_burst (int): Duplicates that can be sent in a row when the
+                             budget is full
+            min_samples (int): Latencies of a kind of call observed before its
+                               calls are hedged
+            min_delay (float): Shortest wait in seconds before hedging
+            window (int): Latest latencies the percentile is computed over
+        """
+        self.component = component
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.max_burst = max_burst
+        self.min_samples = max(1, min_samples)
+        self.min_delay = min_delay
+        self.window = window
+        self._trackers = {}
+        self._budget = float(max_burst)
+        self._counters = {"calls": 0, "hedges": 0, "wins": 0, "skipped": 0}
+        self._lock = threading.Lock()
+
+    def _threshold(self, key, size):
+        """Seconds after which a call of this kind and size is hedged, or None while too few are observed."""
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None or len(tracker) < self.min_samples:
+                return None
+            per_unit = tracker.percentile(self.percentile)
+        HEDGE_THRESHOLD_SECONDS.set(round(per_unit, 3), self.component, key)
+        return max(self.min_delay, per_unit * size)
+
+    def _start(self):
+        """Count a call and add its share to the extra-call budget."""
+        HEDGE_CALLS.inc(self.component)
+        with self._lock:
+            self._counters["calls"] += 1
+            self._budget = min(float(self.max_burst), self._budget + self.max_extra)
+
+    def _take_budget(self):
+        """Spend one duplicate from the budget if it has one."""
+        with self._lock:
+            if self._budget >= 1:
+                self._budget -= 1
+                self._counters["hedges"] += 1
+                allowed = True
+            else:
+                self._counters["skipped"] += 1
+                allowed = False
+        if allowed:
+            HEDGES.inc(self.component)
+            current_span().add("hedges")
+        else:
+            HEDGES_SKIPPED.inc(self.component)
+        return allowed
+
+    def _finish(self, key, size, started, hedge_won=False):
+        """Record the latency of the first call, or a win of the duplicate.
+
+        When the duplicate wins, the first call's own latency is unknown (it
+        is cancelled), and the time the caller saw is shorter: it is not
+        recorded, or every win would lower the threshold and lead to more
+        hedging.
+        """
+        seconds = time.perf_counter() - started
+        with self._lock:
+            if hedge_won:
+                self._counters["wins"] += 1
+            else:
+                self._trackers.setdefault(key, LatencyTracker(self.window)).observe(seconds / size)
+        if hedge_won:
+            HEDGE_WINS.inc(self.component)
+            current_span().add("hedge_wins")
+
+    async def acall(self, factory, key="default", size=1.0, failed=None):
+        """Await a call, hedging it if it is slow; the slower call is cancelled.
+
+        Args:
+            factory (callable): Returns a new awaitable of the call; invoked
+                                a second time for the duplicate
+            key (str): Kind of call whose latencies are tracked together, e.g. the model
+            size (float): Request size in the unit latencies are tracked per
+            failed (callable): Optional predicate telling that a returned
+                               result is a failure, so the other call is awaited
+
+        Returns:
+            The result of the first call to succeed (or the last failure)
+
+        Raises:
+            Exception: The error of the last call to fail when both failed
+        """
+        size = max(size, 1e-3)
+        self._start()
+        threshold = self._threshold(key, size)
+        started = time.perf_counter()
+        if threshold is None:
+            result = await factory()
+            self._finish(key, size, started)
+            return result
+
+        primary = asyncio.ensure_future(factory())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if done or not self._take_budget():
+                result = await primary
+                self._finish(key, size, started)
+                return result
+
+            hedge = asyncio.ensure_future(self._aduplicate(factory))
+            pending = {primary, hedge}
+            outcome = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    outcome = task
+                    if task.exception() is None and not (failed and failed(task.result())):
+                        self._finish(key, size, started, hedge_won=task is hedge)
+                        return task.result()
+            self._finish(key, size, started)
+            return outcome.result()
+        finally:
+            # The loser, or both calls if the caller was cancelled
+            for task in pending:
+                task.cancel()
+
+    async def _aduplicate(self, factory):
+        with span("hedge", {"component": self.component}):
+            return await factory()
+
+    def stats(self):
+        """Report calls, duplicates sent and won, and the current thresholds.
+
+        Returns:
+            dict: Counters, hedge and win rates, remaining budget and the
+                  hedging threshold per kind of call
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            thresholds = {key: round(tracker.percentile(self.percentile), 3)
+                          for key, tracker in self._trackers.items() if len(tracker) >= self.min_samples}
+            budget = self._budget
+        return {
+            **counters,
+            "hedge_rate": round(counters["hedges"] / counters["calls"], 4) if counters["calls"] else 0.0,
+            "win_rate": round(counters["wins"] / counters["hedges"], 4) if counters["hedges"] else 0.0,
+            "budget": round(budget, 3),
+            "percentile": self.percentile,
+            "thresholds": thresholds,
+        }
@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import os
+import uuid
+
+import ffmpeg
+from fastapi import HTTPException, Request
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# Room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Containers whose index may sit at the end of the file; ffmpeg cannot decode
+# them from a pipe, so they are spooled to disk instead
+SEEKABLE_EXTENSIONS = (".mp4", ".m4a", ".m4v", ".mov", ".3gp")
+SEEKABLE_CONTENT_TYPES = ("mp4", "m4a", "quicktime", "3gpp")
+
+
+class IngestedUpload:
+    """An uploaded audio file after ingest."""
+
+    def __init__(self, path, audio_hash, size, filename, content_type):
+        """Initialize the ingest result.
+
+        Args:
+            path (str): Path of the file handed to the transcription pipeline
+            audio_hash (str): SHA-256 hex digest of the uploaded bytes
+            size (int): Number of uploaded bytes
+            filename (str): Client-provided file name
+            content_type (str): Client-provided content type
+        """
+        self.path = path
+        self.audio_hash = audio_hash
+        self.size = size
+        self.filename = filename
+        self.content_type = content_type
+
+
+class FFmpegSink:
+    """Pipes upload bytes into ffmpeg as they arrive.
+
+    ffmpeg decodes while the upload is still in progress and writes 16 kHz
+    mono FLAC, so neither the raw upload nor a full PCM file is stored.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._process = None
+
+    async def start(self):
+        args = (
+            ffmpeg
+            .input('pipe:0')
+            .output(self.output_path, vn=None, ac=1, ar='16k', acodec='flac')
+            .global_args('-loglevel', 'error')
+            .compile(overwrite_output=True)
+        )
+        self._process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def write(self, data):
+        try:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg gave up on the input; reported by close()
+            pass
+
+    async def close(self):
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        if await self._process.wait() != 0:
+            raise HTTPException(status_code=400, detail="Could not decode the audio file")
+
+    async def abort(self):
+        if self._process and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+
+
+class FileSink:
+    """Writes upload bytes to disk unchanged, for containers ffmpeg must seek in.
+
+    File operations run in worker threads, so a slow disk does not block the event loop.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._file = None
+
+    async def start(self):
+        self._file = await asyncio.to_thread(open, self.output_path, "wb")
+
+    async def write(self, data):
+        await asyncio.to_thread(self._file.write, data)
+
+    async def close(self):
+        await asyncio.to_thread(self._file.close)
+
+    async def abort(self):
+        if self._file and not self._file.closed:
+            await asyncio.to_thread(self._file.close)
+
+
+def _needs_seekable_input(filename, content_type):
+    """Whether the upload format cannot be decoded from a pipe."""
+    if filename and filename.lower().endswith(SEEKABLE_EXTENSIONS):
+        return True
+    return any(marker in (content_type or "").lower() for marker in SEEKABLE_CONTENT_TYPES)
+
+
+async def ingest_upload(request: Request, field_name, upload_dir, max_bytes):
+    """Stream an audio file from a multipart request into the transcription pipeline.
+
+    The request body is parsed as it arrives. The size limit is enforced from
+    Content-Length before reading and from a running byte count while
+    reading, the bytes are hashed on the fly, and the audio is fed straight
+    to ffmpeg so decoding overlaps with the upload. Memory use does not grow
+    with the file size.
+
+    Args:
+        request (Request): The incoming request
+        field_name (str): Name of the multipart field holding the audio file
+        upload_dir (str): Directory for the ingested file
+        max_bytes (int): Maximum size of the audio file in bytes
+
+    Returns:
+        IngestedUpload: The ingested file
+
+    Raises:
+        HTTPException: 400 for a malformed request or undecodable audio,
+                       413 when the file exceeds max_bytes, 422 when the
+                       field is missing
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Request must be multipart/form-data")
+
+    max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+        raise HTTPException(status_code=413, detail=f"File exceeds the maximum size of {max_bytes / (1024 * 1024):g} MB")
+
+    # Parser callbacks only record events; they are handled asynchronously below
+    events = []
+    part = {"headers": {}, "field": b"", "value": b""}
+
+    def on_part_begin():
+        part["headers"] = {}
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].lower()] = part["value"]
+        part["field"], part["value"] = b"", b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition", b""))
+        events.append((
+            "begin",
+            disposition.get(b"name", b"").decode("utf-8", "replace"),
+            disposition.get(b"filename", b"").decode("utf-8", "replace"),
+            part["headers"].get(b"content-type", b"").decode("latin-1"),
+        ))
+
+    def on_part_data(data, start, end):
+        events.append(("data", data[start:end]))
+
+    def on_part_end():
+        events.append(("end",))
+
+    parser = multipart.MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    sink = None
+    in_audio_part = False
+    result = None
+    audio_hash = hashlib.sha256()
+    size = 0
+    body_size = 0
+    try:
+        async for chunk in request.stream():
+            body_size += len(chunk)
+            if body_size > max_body_bytes:
+                raise HTTPException(status_code=413, detail=f"File exceeds the maximum size of {max_bytes / (1024 * 1024):g} MB")
+            try:
+                parser.write(chunk)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+
+            for event in events:
+                if event[0] == "begin" and event[1] == field_name and result is None:
+                    _, _, filename, part_content_type = event
+                    if not part_content_type.startswith(("audio/", "video/")):
+                        raise HTTPException(status_code=400, detail="File must be an audio file")
+                    if _needs_seekable_input(filename, part_content_type):
+                        extension = os.path.splitext(filename)[1].lower() or ".mp4"
+                        sink = FileSink(os.path.join(upload_dir, f"{uuid.uuid4().hex}{extension}"))
+                    else:
+                        sink = FFmpegSink(os.path.join(upload_dir, f"{uuid.uuid4().hex}.flac"))
+                    await sink.start()
+                    in_audio_part = True
+                    result = IngestedUpload(sink.output_path, None, 0, filename, part_content_type)
+                elif event[0] == "data" and in_audio_part:
+                    size += len(event[1])
+                    if size > max_bytes:
+                        raise HTTPException(status_code=413, detail=f"File exceeds the maximum size of {max_bytes / (1024 * 1024):g} MB")
+                    audio_hash.update(event[1])
+                    await sink.write(event[1])
+                elif event[0] == "end" and in_audio_part:
+                    in_audio_part = False
+                    await sink.close()
+            events.clear()
+
+        parser.finalize()
+        if result is None:
+            raise HTTPException(status_code=422, detail=f"Field '{field_name}' is required")
+        if in_audio_part:
+            raise HTTPException(status_code=400, detail="Upload ended before the file was complete")
+    except BaseException:
+        if sink is not None:
+            await sink.abort()
+            if os.path.exists(sink.output_path):
+                os.remove(sink.output_path)
+        raise
+
+    result.audio_hash = audio_hash.hexdigest()
+    result.size = size
+    return result
@@ -0,0 +1,317 @@
+import contextvars
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from metrics import Counter, Histogram, ERRORS
+from tracing import span
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+JOB_QUEUE_WAIT_SECONDS = Histogram("job_queue_wait_seconds", "Seconds jobs waited for a worker")
+JOB_STAGE_SECONDS = Histogram("job_stage_duration_seconds", "Duration of job pipeline stages", ["stage"])
+JOBS_FINISHED = Counter("jobs_finished", "Jobs finished, by final state", ["state"])
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the job queue is at capacity."""
+
+
+class Job:
+    """A unit of background work tracked by the JobManager."""
+
+    def __init__(self, func, args=(), kwargs=None):
+        """Initialize the job.
+
+        The function runs in a copy of the submitter's context, so the job's
+        spans belong to the trace of the request that submitted it.
+
+        Args:
+            func (callable): Function to run. It receives the job as its first
+                             argument so it can report stage progress.
+            args (tuple): Extra positional arguments for the function
+            kwargs (dict): Extra keyword arguments for the function
+        """
+        self.id = uuid.uuid4().hex
+        self.state = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.current_stage = None
+        self.stages = OrderedDict()
+        self.stats = {}
+        self.result = None
+        self.error = None
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs or {}
+        self._context = contextvars.copy_context()
+        self._done = threading.Event()
+        self._callbacks = []
+        self._events = []
+        self._event_listeners = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        """bool: Whether the job has finished (successfully or not)."""
+        return self._done.is_set()
+
+    @contextmanager
+    def stage(self, name):
+        """Record the start and end timestamps of a pipeline stage, and trace it as a span.
+
+        Args:
+            name (str): Name of the stage (e.g. "transcription")
+        """
+        self.current_stage = name
+        self.stages[name] = {"started_at": time.time(), "finished_at": None}
+        self.emit("stage", {"stage": name, "status": "started"})
+        try:
+            with span(name, {"job.id": self.id}):
+                yield
+        finally:
+            self.stages[name]["finished_at"] = time.time()
+            JOB_STAGE_SECONDS.observe(self.stages[name]["finished_at"] - self.stages[name]["started_at"], name)
+            self.current_stage = None
+            self.emit("stage", {"stage": name, "status": "finished"})
+
+    def emit(self, event, data):
+        """Publish a progress event (e.g. a transcribed chunk) to the job's listeners.
+
+        Events are also kept so listeners that subscribe later can replay them.
+
+        Args:
+            event (str): Event name
+            data (dict): JSON-serializable event payload
+        """
+        with self._lock:
+            self._events.append((event, data))
+            listeners = list(self._event_listeners)
+        for listener in listeners:
+            try:
+                listener((event, data))
+            except Exception as e:
+                print(f"Error in job event listener for {self.id}: {e}")
+
+    def add_event_listener(self, listener):
+        """Subscribe to the job's progress events.
+
+        Args:
+            listener (callable): Function receiving each (event, data) tuple
+                                 emitted from now on; called on the worker thread
+
+        Returns:
+            list: The (event, data) tuples emitted before subscribing
+        """
+        with self._lock:
+            self._event_listeners.append(listener)
+            return list(self._events)
+
+    def remove_event_listener(self, listener):
+        """Unsubscribe a listener registered with add_event_listener."""
+        with self._lock:
+            if listener in self._event_listeners:
+                self._event_listeners.remove(listener)
+
+    def add_done_callback(self, callback):
+        """Register a callback to be invoked with the job once it finishes.
+
+        If the job has already finished the callback is invoked immediately.
+
+        Args:
+            callback (callable): Function taking the job as its only argument
+        """
+        with self._lock:
+            if not self.done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def remove_done_callback(self, callback):
+        """Unregister a callback registered with add_done_callback, e.g. when its waiter gives up."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes or the timeout expires.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait
+
+        Returns:
+            bool: True if the job finished, False on timeout
+        """
+        return self._done.wait(timeout)
+
+    def run(self):
+        """Execute the job function and record the outcome."""
+        self.state = JOB_RUNNING
+        self.started_at = time.time()
+        JOB_QUEUE_WAIT_SECONDS.observe(self.started_at - self.created_at)
+        try:
+            self.result = self._context.run(self._func, self, *self._args, **self._kwargs)
+            self.state = JOB_COMPLETED
+        except Exception as e:
+            self.error = e
+            self.state = JOB_FAILED
+            ERRORS.inc("job", type(e).__name__)
+        finally:
+            self.finished_at = time.time()
+            JOBS_FINISHED.inc(self.state)
+            self._finish()
+
+    def _finish(self):
+        """Mark the job as done and fire the registered callbacks."""
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+            self._event_listeners = []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in job callback for {self.id}: {e}")
+
+    def to_dict(self):
+        """Serialize the job status.
+
+        Returns:
+            dict: Job id, state, timestamps, stage timings, pipeline statistics and outcome
+        """
+        return {
+            "job_id": self.id,
+            "status": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "current_stage": self.current_stage,
+            "stages": {name: dict(times) for name, times in self.stages.items()},
+            "stats": dict(self.stats),
+            "result": self.result if self.state == JOB_COMPLETED else None,
+            "error": str(self.error) if self.error is not None else None,
+        }
+
+
+class JobManager:
+    """Runs jobs on a bounded pool of worker threads.
+
+    Jobs are queued in FIFO order; at most ``num_workers`` run at the same time
+    and at most ``max_queue_size`` may wait in the queue.
+    """
+
+    def __init__(self, num_workers=2, max_queue_size=20, max_finished_jobs=1000):
+        """Initialize the job manager.
+
+        Args:
+            num_workers (int): Number of worker threads processing jobs
+            max_queue_size (int): Maximum number of jobs waiting to be processed
+            max_finished_jobs (int): Number of finished jobs kept for status lookups
+        """
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self.max_finished_jobs = max_finished_jobs
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _ensure_workers(self):
+        """Start the worker threads on first use."""
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self):
+        """Pull jobs from the queue and run them forever."""
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._running += 1
+            try:
+                job.run()
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    if job.state == JOB_COMPLETED:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+                    self._evict_finished()
+                self._queue.task_done()
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs beyond ``max_finished_jobs``. Caller holds the lock."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a function for background execution.
+
+        Args:
+            func (callable): Function to run; receives the job as first argument
+            *args: Extra positional arguments for the function
+            **kwargs: Extra keyword arguments for the function
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self._ensure_workers()
+        job = Job(func, args, kwargs)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs waiting)")
+        return job
+
+    def get(self, job_id):
+        """Look up a job by id.
+
+        Args:
+            job_id (str): The job id
+
+        Returns:
+            Job: The job, or None if unknown or already evicted
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        """Report queue depth and worker utilization.
+
+        Returns:
+            dict: Worker count, queue depth, running jobs and finished job counters
+        """
+        with self._lock:
+            return {
+                "workers": self.num_workers,
+                "max_queue_size": self.max_queue_size,
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "tracked_jobs": len(self._jobs),
+            }
@@ -1,20 +1,210 @@
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional
+import asyncio
+import hashlib
+import inspect
+import json
 import re
+import time
+
+from cache import MemoryLRUCache
+from similarity import NearDuplicateIndex
+from tokenizer import TokenCounter, context_tokens, pack_spans
+from extractive import ExtractiveFilter
+from metrics import Counter, Histogram, ERRORS
+from outbound import OutboundHTTP
+from tracing import span, current_span
+
+# Analyses produced for a full meeting, in output order
+ANALYSIS_TASKS = ("insights", "action_items", "bullet_points")
+
+# Per-task messages: (no result, error, log description)
+TASK_MESSAGES = {
+    "insights": (
+        "Não foi possível extrair insights desta transcrição.",
+        "Ocorreu um erro ao analisar os insights da reunião.",
+        "extracting insights",
+    ),
+    "action_items": (
+        "Não foi possível extrair itens de ação desta transcrição.",
+        "Ocorreu um erro ao analisar os itens de ação da reunião.",
+        "extracting action items",
+    ),
+    "bullet_points": (
+        "Não foi possível extrair pontos de resumo desta transcrição.",
+        "Ocorreu um erro ao gerar o resumo da reunião.",
+        "generating bullet points",
+    ),
+}
+
+# Analysis modes: one prompt per (task, chunk), or one structured prompt per chunk
+ANALYSIS_MODE_PER_TASK = "per_task"
+ANALYSIS_MODE_SINGLE_PASS = "single_pass"
+
+# Agent stream events carrying response text (current and older agno releases)
+STREAM_CONTENT_EVENTS = ("RunContent", "RunResponseContent", "RunResponse")
+# Agent stream events reporting a failed run
+STREAM_ERROR_EVENTS = ("RunError", "RunResponseError")
+
+# How chunk results of a task are combined: merged with near-duplicate removal,
+# or reduced by the model in tiers until one consolidated result remains
+COMBINE_MERGE = "merge"
+COMBINE_MAP_REDUCE = "map_reduce"
+
+# Pipeline stages that call the model, each with its own configurable model:
+# per-chunk extraction, intermediate reduce tiers, and the call producing the
+# final result (last reduce tier, or the only chunk of a short transcript)
+STAGE_MAP = "map"
+STAGE_REDUCE = "reduce"
+STAGE_FINAL = "final"
+
+# Per-task instructions for consolidating partial results in map-reduce mode
+REDUCE_INSTRUCTIONS = {
+    "insights": (
+        "insights",
+        "Liste no máximo 5 insights principais da reunião, unindo os que forem equivalentes.",
+    ),
+    "action_items": (
+        "itens de ação",
+        "Liste todos os itens de ação sem repetições, indicando para cada um a tarefa, "
+        "quem é responsável (se mencionado) e o prazo (se mencionado).",
+    ),
+    "bullet_points": (
+        "pontos de resumo",
+        "Organize os pontos de discussão em uma única lista de marcadores (bullet points) clara e concisa, "
+        "sem repetições e na ordem em que foram discutidos.",
+    ),
+}
+
+# Context tokens kept free of transcript text for the prompt instructions and the response
+PROMPT_RESERVE_TOKENS = 4096
+
+# Part of every result cache key; bump whenever a prompt changes so stale results are not reused
+PROMPT_VERSION = "1"
+
+ANALYSIS_STEP_SECONDS = Histogram("analysis_step_duration_seconds",
+                                  "Duration of transcript preparation steps before the model calls", ["step"])
+ANALYSIS_CALL_SECONDS = Histogram("analysis_call_duration_seconds", "Duration of one model call, retries included",
+                                  ["stage", "model"])
+ANALYSIS_CALLS = Counter("analysis_calls", "Model calls by stage, model and result (ok, error or cache_hit)",
+                         ["stage", "model", "result"])
+ANALYSIS_TOKENS = Counter("analysis_tokens", "Model tokens by stage, model and kind (input or output)",
+                          ["stage", "model", "kind"])
+
+
+class ActionItem(BaseModel):
+    task: str = Field(..., description="A tarefa a ser realizada")
+    owner: Optional[str] = Field(None, description="Quem é responsável, se mencionado")
+    deadline: Optional[str] = Field(None, description="Prazo, se mencionado")
+
+
+class ChunkAnalysis(BaseModel):
+    """Structured result of the single-pass analysis of one transcript chunk."""
+    insights: List[str] = Field(default_factory=list, description="Principais insights e descobertas")
+    action_items: List[ActionItem] = Field(default_factory=list, description="Itens de ação ou tarefas mencionadas")
+    bullet_points: List[str] = Field(default_factory=list, description="Tópicos que resumem a discussão")
 
 class MeetingAnalyzer:
     """Handles analysis of meeting transcripts using Agno AI agents."""
     
-    def __init__(self, model_id="gpt-4.1", chunk_size=10000, overlap=1000):
+    def __init__(self, model_id="gpt-4.1", chunk_tokens=8000, overlap_tokens=200, max_concurrency=8,
+                 analysis_mode=ANALYSIS_MODE_PER_TASK, result_cache=None, duplicate_threshold=0.7,
+                 combine_strategy=COMBINE_MERGE, reduce_fan_in=4, stage_models=None, prefilter_ratio=None,
+                 prefilter_tokens=None, outbound=None, hedger=None):
         """Initialize the meeting analyzer.
         
         Args:
             model_id (str): The model ID to use for the AI agent
-            chunk_size (int): Maximum size in characters for each transcript chunk
-            overlap (int): Number of characters to overlap between chunks
+            chunk_tokens (int): Maximum size in model tokens of each transcript chunk;
+                                capped by the model's context window
+            overlap_tokens (int): Maximum tokens of whole sentences repeated from
+                                  the previous chunk
+            max_concurrency (int): Maximum number of LLM calls in flight for one analysis
+            analysis_mode (str): "per_task" sends each chunk once per analysis;
+                                 "single_pass" sends each chunk once and asks for
+                                 all analyses as one structured JSON object
+            result_cache: Cache for per-chunk model results with aget/aset/stats
+                          (see cache.py); defaults to an in-memory LRU cache
+            duplicate_threshold (float): Word-set similarity (Jaccard) above which
+                                         points from different chunks are merged
+            combine_strategy (str): "merge" joins the chunk results and drops
+                                    near-duplicate points; "map_reduce" has the
+                                    model consolidate them in tiers
+            reduce_fan_in (int): Maximum chunk results consolidated per call in
+                                 "map_reduce" mode
+            stage_models (dict): Model per stage ("map", "reduce", "final"),
+                                 overriding model_id; e.g. a cheaper model for
+                                 "map" and "reduce"
+            prefilter_ratio (float): If set, only this fraction of the transcript
+                                     tokens (the highest-ranked sentences) is analyzed
+            prefilter_tokens (int): If set, at most this many transcript tokens
+                                    are analyzed
+            outbound (OutboundHTTP): Shared HTTP clients with connection pooling
+                                     and retries for model calls; a new one by
+                                     default
+            hedger (Hedger): If set, model calls slower than its latency
+                             percentile (per stage and model) are sent again
+                             and the first successful response is used
         """
-        self.agent = Agent(
-            model=OpenAIChat(id=model_id),
+        if analysis_mode not in (ANALYSIS_MODE_PER_TASK, ANALYSIS_MODE_SINGLE_PASS):
+            raise ValueError(f"Unknown analysis mode: {analysis_mode}")
+        if combine_strategy not in (COMBINE_MERGE, COMBINE_MAP_REDUCE):
+            raise ValueError(f"Unknown combine strategy: {combine_strategy}")
+        self.model_id = model_id
+        self.stage_models = {stage: model_id for stage in (STAGE_MAP, STAGE_REDUCE, STAGE_FINAL)}
+        self.stage_models.update({stage: model for stage, model in (stage_models or {}).items() if model})
+        self.token_counter = TokenCounter(self.stage_models[STAGE_MAP])
+        smallest_context = min(context_tokens(model) for model in self.stage_models.values())
+        self.chunk_tokens = max(1, min(chunk_tokens, smallest_context - PROMPT_RESERVE_TOKENS))
+        self.prefilter = None
+        if prefilter_ratio is not None or prefilter_tokens is not None:
+            self.prefilter = ExtractiveFilter(self.token_counter, keep_ratio=prefilter_ratio,
+                                              max_tokens=prefilter_tokens)
+        self.overlap_tokens = overlap_tokens
+        self.max_concurrency = max(1, max_concurrency)
+        self.duplicate_threshold = duplicate_threshold
+        self.combine_strategy = combine_strategy
+        self.reduce_fan_in = max(2, reduce_fan_in)
+        self.analysis_mode = analysis_mode
+        self.result_cache = result_cache if result_cache is not None else MemoryLRUCache()
+        self.outbound = outbound if outbound is not None else OutboundHTTP()
+        self.hedger = hedger
+        self._agent_loaded = False
+    
+    @property
+    def loaded(self):
+        """bool: Whether the model client libraries have been loaded, by warm_up or a first request."""
+        return self._agent_loaded
+    
+    def warm_up(self):
+        """Load the model client libraries and the tokenizer ahead of the first request."""
+        self._create_agent()
+        self.token_counter.warm_up()
+    
+    def _create_agent(self, structured=False, model_id=None):
+        """Create an agent configured for meeting analysis.
+        
+        Concurrent calls each get their own agent so runs never share state.
+        
+        Args:
+            structured (bool): Whether the model must answer with a JSON object
+            model_id (str): Model to use; defaults to the analyzer's model_id
+            
+        Returns:
+            Agent: A new meeting analysis agent
+        """
+        # agno and openai take most of the import time; loaded on first use
+        from agno.agent import Agent
+        from agno.models.openai import OpenAIChat
+        self._agent_loaded = True
+        
+        request_params = {"response_format": {"type": "json_object"}} if structured else None
+        # Outside an event loop there is no pooled client and the SDK's own is used
+        http_client = self.outbound.async_client()
+        model = OpenAIChat(id=model_id or self.model_id, request_params=request_params, http_client=http_client,
+                           max_retries=0 if http_client is not None else None)
+        return Agent(
+            model=model,
             description="You are an expert meeting assistant that analyzes transcripts of business meetings in Portuguese.",
             instructions=[
                 "When analyzing meeting transcripts, focus on identifying key insights, action items, and important discussion points.",
@@ -24,8 +214,6 @@ class MeetingAnalyzer:
             ],
             markdown=False
         )
-        self.chunk_size = chunk_size
-        self.overlap = overlap
     
     def _strip_html_markdown(self, text):
         """Strip HTML and Markdown formatting from text.
@@ -63,46 +251,65 @@ class MeetingAnalyzer:
         
         return text
     
-    def _split_transcript_into_chunks(self, transcript):
-        """Split a large transcript into overlapping chunks.
+    def _prefilter(self, transcript, stats=None):
+        """Drop the least informative sentences before chunking, if a pre-filter is configured.
         
         Args:
             transcript (str): The full transcript text
+            stats (dict): Optional dict filled with the pre-filter statistics
+                          (see ExtractiveFilter.filter) and "prefilter_seconds"
             
         Returns:
-            list: List of transcript chunks
+            str: The transcript to analyze
         """
-        # If transcript is smaller than chunk size, return it as a single chunk
-        if len(transcript) <= self.chunk_size:
-            return [transcript]
-            
-        chunks = []
-        start = 0
+        if self.prefilter is None:
+            return transcript
         
-        while start < len(transcript):
-            # Calculate end position for this chunk
-            end = start + self.chunk_size
-            
-            # If this isn't the last chunk, try to break at a sentence boundary
-            if end < len(transcript):
-                # Look for sentence boundaries (., !, ?) within 200 chars of the end
-                search_area = transcript[max(end - 200, start):min(end + 200, len(transcript))]
-                
-                # Find the last sentence boundary in the search area
-                for punct in ['. ', '! ', '? ']:
-                    last_boundary = search_area.rfind(punct)
-                    if last_boundary != -1:
-                        # Adjust end to break at this sentence boundary
-                        end = max(end - 200, start) + last_boundary + 2  # +2 to include the punctuation and space
-                        break
+        started = time.time()
+        with span("prefilter") as prefilter_span:
+            filtered = self.prefilter.filter(transcript, stats)
+            prefilter_span.set("input.chars", len(transcript))
+            prefilter_span.set("output.chars", len(filtered))
+        ANALYSIS_STEP_SECONDS.observe(time.time() - started, "prefilter")
+        if stats is not None:
+            stats["prefilter_seconds"] = round(time.time() - started, 3)
+        return filtered
+    
+    def _split_transcript_into_chunks(self, transcript, stats=None):
+        """Split a large transcript into overlapping chunks that fit the token budget.
+        
+        Whole sentences are packed greedily up to chunk_tokens, and each chunk
+        repeats up to overlap_tokens of sentences from the previous one, so
+        the transcript is covered in as few calls and input tokens as possible.
+        
+        Args:
+            transcript (str): The full transcript text
+            stats (dict): Optional dict filled with "analysis_chunks",
+                          "transcript_tokens", "analysis_chunk_tokens" (input
+                          tokens sent per analysis, overlap included) and "tokenizer"
             
-            # Add this chunk to our list
-            chunks.append(transcript[start:min(end, len(transcript))])
+        Returns:
+            list: List of transcript chunks
+        """
+        started = time.time()
+        with span("chunking") as chunking_span:
+            transcript_tokens = self.token_counter.count(transcript)
             
-            # Start next chunk, with overlap
-            start = max(0, end - self.overlap)
+            # If transcript fits the budget, return it as a single chunk
+            if transcript_tokens <= self.chunk_tokens:
+                spans = [(0, len(transcript), transcript_tokens)]
+            else:
+                spans = pack_spans(transcript, self.token_counter, self.chunk_tokens, self.overlap_tokens)
+            chunking_span.set("transcript.tokens", transcript_tokens)
+            chunking_span.set("chunks", len(spans))
+        ANALYSIS_STEP_SECONDS.observe(time.time() - started, "chunking")
         
-        return chunks
+        if stats is not None:
+            stats["analysis_chunks"] = len(spans)
+            stats["transcript_tokens"] = transcript_tokens
+            stats["analysis_chunk_tokens"] = sum(tokens for _, _, tokens in spans)
+            stats["tokenizer"] = self.token_counter.name
+        return [transcript[start:end] for start, end, _ in spans]
     
     def _combine_analysis_results(self, results_list):
         """Combine multiple analysis results into a single coherent result.
@@ -123,8 +330,8 @@ class MeetingAnalyzer:
         # For multiple results, we need to consolidate
         combined = ""
         
-        # Extract unique points by removing duplicates
-        seen_points = set()
+        # Extract unique points by removing near-duplicates (same words, any order)
+        seen_points = NearDuplicateIndex(threshold=self.duplicate_threshold)
         
         for result in results_list:
             # Clean the result
@@ -150,190 +357,797 @@ class MeetingAnalyzer:
             
             # Add only unique points
             for point in points:
-                # Create a simplified version for comparison (lowercase, no punctuation)
-                simplified = ''.join(c.lower() for c in point if c.isalnum() or c.isspace())
-                
-                # Check if we've seen a similar point
-                is_duplicate = False
-                for seen in seen_points:
-                    # Check for high similarity (80% match)
-                    if len(simplified) > 0 and len(seen) > 0:
-                        similarity = sum(1 for a, b in zip(simplified, seen) if a == b) / max(len(simplified), len(seen))
-                        if similarity > 0.8:
-                            is_duplicate = True
-                            break
-                
-                if not is_duplicate:
-                    seen_points.add(simplified)
+                if seen_points.add(point):
                     combined += point + '\n\n'
         
         return combined.strip()
     
-    def extract_insights(self, transcript):
-        """Extract key insights from the meeting transcript.
+    def _insights_prompt(self, chunk, i, total):
+        """Build the insights prompt for one transcript chunk."""
+        return f"""
+                Analise a seguinte {'parte da ' if total > 1 else ''}transcrição de reunião e identifique os principais insights e descobertas:
+                
+                {chunk}
+                
+                {'Esta é a parte ' + str(i+1) + ' de ' + str(total) + ' da transcrição completa.' if total > 1 else ''}
+                Liste no máximo {'3' if total > 1 else '5'} insights principais que foram discutidos nesta {'parte da ' if total > 1 else ''}reunião.
+                Não use formatação HTML ou markdown na sua resposta.
+                """
+    
+    def _action_items_prompt(self, chunk, i, total):
+        """Build the action items prompt for one transcript chunk."""
+        return f"""
+                Analise a seguinte {'parte da ' if total > 1 else ''}transcrição de reunião e identifique todos os itens de ação ou tarefas mencionadas:
+                
+                {chunk}
+                
+                {'Esta é a parte ' + str(i+1) + ' de ' + str(total) + ' da transcrição completa.' if total > 1 else ''}
+                Para cada item de ação, indique:
+                - A tarefa a ser realizada
+                - Quem é responsável (se mencionado)
+                - Prazo (se mencionado)
+                Não use formatação HTML ou markdown na sua resposta.
+                """
+    
+    def _bullet_points_prompt(self, chunk, i, total):
+        """Build the bullet points prompt for one transcript chunk."""
+        return f"""
+                Analise a seguinte {'parte da ' if total > 1 else ''}transcrição de reunião e crie uma lista de tópicos que resuma a discussão:
+                
+                {chunk}
+                
+                {'Esta é a parte ' + str(i+1) + ' de ' + str(total) + ' da transcrição completa.' if total > 1 else ''}
+                Organize os pontos de discussão em uma lista de marcadores (bullet points) clara e concisa.
+                Não use formatação HTML ou markdown na sua resposta.
+                """
+    
+    def _build_prompt(self, task, chunk, i, total):
+        """Build the prompt for one (task, chunk) analysis call.
         
         Args:
-            transcript (str): Meeting transcript text
+            task (str): One of ANALYSIS_TASKS
+            chunk (str): Transcript chunk text
+            i (int): Index of the chunk
+            total (int): Total number of chunks
             
         Returns:
-            str: Key insights from the meeting, or a default message if analysis fails
+            str: The prompt to send to the model
         """
-        try:
-            # Split transcript into chunks if necessary
-            chunks = self._split_transcript_into_chunks(transcript)
+        builders = {
+            "insights": self._insights_prompt,
+            "action_items": self._action_items_prompt,
+            "bullet_points": self._bullet_points_prompt,
+        }
+        return builders[task](chunk, i, total)
+    
+    def _chunk_stage(self, total):
+        """Stage of the per-chunk calls: the only chunk's result is the final result."""
+        return STAGE_FINAL if total == 1 else STAGE_MAP
+    
+    def _record_usage(self, stats, stage, started, response=None, cached=False):
+        """Add one model call (or cache hit) to the metrics and to the per-stage accounting in stats["usage"].
+        
+        Args:
+            stats (dict): Statistics dict of the request, or None to skip accounting
+            stage (str): STAGE_MAP, STAGE_REDUCE or STAGE_FINAL
+            started (float): time.time() when the call started
+            response: The agent response, carrying token metrics
+            cached (bool): Whether the result came from the result cache
+        """
+        finished = time.time()
+        model = self.stage_models[stage]
+        call_span = current_span()
+        call_span.set("model", model)
+        call_span.set("cache_hit", cached)
+        if cached:
+            ANALYSIS_CALLS.inc(stage, model, "cache_hit")
+        else:
+            input_tokens, output_tokens = self._response_tokens(response)
+            call_span.add("calls")
+            call_span.add("input_tokens", input_tokens)
+            call_span.add("output_tokens", output_tokens)
+            ANALYSIS_CALL_SECONDS.observe(finished - started, stage, model)
+            ANALYSIS_CALLS.inc(stage, model, "error" if self._response_failed(response) else "ok")
+            ANALYSIS_TOKENS.inc(stage, model, "input", amount=input_tokens)
+            ANALYSIS_TOKENS.inc(stage, model, "output", amount=output_tokens)
+        if stats is None:
+            return
+        usage = stats.setdefault("usage", {}).setdefault(stage, {
+            "model": model,
+            "calls": 0,
+            "cache_hits": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "latency_seconds": 0.0,
+            "max_latency_seconds": 0.0,
+            "started_at": started,
+            "finished_at": finished,
+        })
+        usage["started_at"] = min(usage["started_at"], started)
+        usage["finished_at"] = max(usage["finished_at"], finished)
+        if cached:
+            usage["cache_hits"] += 1
+            return
+        
+        usage["calls"] += 1
+        usage["input_tokens"] += input_tokens
+        usage["output_tokens"] += output_tokens
+        usage["latency_seconds"] = round(usage["latency_seconds"] + finished - started, 3)
+        usage["max_latency_seconds"] = round(max(usage["max_latency_seconds"], finished - started), 3)
+    
+    def _response_failed(self, response):
+        """Whether agno reported the run as failed (its content is then the error message)."""
+        return str(getattr(getattr(response, "status", None), "value", "")).upper() == "ERROR"
+    
+    def _response_tokens(self, response):
+        """Read (input, output) token counts from an agent response's metrics."""
+        metrics = getattr(response, "metrics", None)
+        if metrics is None:
+            return 0, 0
+        if isinstance(metrics, dict):
+            # Older agno releases keep one value per model request
+            counts = [metrics.get("input_tokens", 0), metrics.get("output_tokens", 0)]
+            return tuple(sum(count) if isinstance(count, list) else count or 0 for count in counts)
+        return getattr(metrics, "input_tokens", 0) or 0, getattr(metrics, "output_tokens", 0) or 0
+    
+    async def _arun_prompt(self, prompt, semaphore, structured=False, stage=STAGE_MAP, stats=None):
+        """Run a prompt on a fresh agent, limited by the shared semaphore.
+        
+        Args:
+            prompt (str): The prompt to send
+            semaphore (asyncio.Semaphore): Limits the number of calls in flight
+            structured (bool): Whether to request a JSON object response
+            stage (str): Pipeline stage, selecting the model (see stage_models)
+            stats (dict): Optional dict receiving per-stage token and latency accounting
             
-            # Process each chunk
-            all_insights = []
+        Returns:
+            str: The response content, or None if the response had no content
+        """
+        async with semaphore:
+            started = time.time()
+            model_id = self.stage_models[stage]
+            if self.hedger is None:
+                agent = self._create_agent(structured=structured, model_id=model_id)
+                response = await agent.arun(prompt, stream=False)
+            else:
+                # Latency grows with the prompt, per thousand tokens; short prompts are dominated by fixed overhead
+                size = max(1.0, self.token_counter.count(prompt) / 1000)
+                # Each attempt runs on its own agent; a failed run waits for the other attempt
+                response = await self.hedger.acall(
+                    lambda: self._create_agent(structured=structured, model_id=model_id).arun(prompt, stream=False),
+                    key=f"{stage}:{model_id}", size=size, failed=self._response_failed
+                )
+        self._record_usage(stats, stage, started, response)
+        # agno reports a failed model call as a run whose content is the error message
+        if self._response_failed(response):
+            ERRORS.inc("analysis", "ModelCallFailed")
+            raise Exception(f"Model call failed: {response.content}")
+        
+        # Extract the content from the response
+        if response and hasattr(response, 'content'):
+            return response.content
+        return None
+    
+    def _result_cache_key(self, task, chunk, total):
+        """Build the result cache key for one (task, chunk) call.
+        
+        The key covers the whitespace-normalized chunk text, model, task and
+        prompt version. Whether the transcript has several parts changes the
+        prompt, so it is part of the key; the part number is not.
+        
+        Args:
+            task (str): One of ANALYSIS_TASKS, or "structured" for single-pass results
+            chunk (str): Transcript chunk text
+            total (int): Total number of chunks
             
-            for i, chunk in enumerate(chunks):
-                chunk_prompt = f"""
-                Analise a seguinte {'parte da ' if len(chunks) > 1 else ''}transcrição de reunião e identifique os principais insights e descobertas:
+        Returns:
+            str: The cache key
+        """
+        normalized = " ".join(chunk.split())
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        parts = "multi" if total > 1 else "single"
+        model_id = self.stage_models[self._chunk_stage(total)]
+        return f"{digest}:{model_id}:{task}:{PROMPT_VERSION}:{parts}"
+    
+    async def _arun_task_chunk(self, task, chunk, i, total, semaphore, stats=None):
+        """Run one (task, chunk) analysis call, reusing a cached result if present.
+        
+        Args:
+            task (str): One of ANALYSIS_TASKS
+            chunk (str): Transcript chunk text
+            i (int): Index of the chunk
+            total (int): Total number of chunks
+            semaphore (asyncio.Semaphore): Limits the number of calls in flight
+            stats (dict): Optional dict receiving per-stage accounting
+            
+        Returns:
+            str: The response content, or None if the response had no content
+        """
+        key = self._result_cache_key(task, chunk, total)
+        prompt = self._build_prompt(task, chunk, i, total)
+        stage = self._chunk_stage(total)
+        attributes = {"task": task, "chunk": i, "chunks": total, "stage": stage, "chunk.chars": len(chunk)}
+        with span("analysis_call", attributes):
+            return await self._arun_cached(key, prompt, semaphore, stage, stats)
+    
+    async def _arun_cached(self, key, prompt, semaphore, stage=STAGE_MAP, stats=None):
+        """Run a prompt unless the result cache already holds its result.
+        
+        Args:
+            key (str): Result cache key of the prompt
+            prompt (str): The prompt to send
+            semaphore (asyncio.Semaphore): Limits the number of calls in flight
+            stage (str): Pipeline stage, selecting the model
+            stats (dict): Optional dict receiving per-stage accounting
+            
+        Returns:
+            str: The response content, or None if the response had no content
+        """
+        content = await self.result_cache.aget(key)
+        if content is not None:
+            self._record_usage(stats, stage, time.time(), cached=True)
+            return content
+        
+        content = await self._arun_prompt(prompt, semaphore, stage=stage, stats=stats)
+        if content is not None:
+            await self.result_cache.aset(key, content)
+        return content
+    
+    def _future_outcome(self, future):
+        """Return the result of a finished future, or its exception."""
+        return future.exception() or future.result()
+    
+    async def _acombine_task_outcomes(self, task, outcomes, semaphore, stats=None):
+        """Combine the chunk results of one task into its final text.
+        
+        Args:
+            task (str): One of ANALYSIS_TASKS
+            outcomes (list): Response content or exception of each chunk, in chunk order
+            semaphore (asyncio.Semaphore): Limits the number of reduce calls in flight
+            stats (dict): Optional dict filled with reduce statistics
+            
+        Returns:
+            str: The combined result, or the task's fallback message
+        """
+        no_result_message, error_message, description = TASK_MESSAGES[task]
+        
+        errors = [r for r in outcomes if isinstance(r, BaseException)]
+        if errors:
+            print(f"Error {description}: {str(errors[0])}")
+            return error_message
+        
+        # Combine results from all chunks
+        contents = [r for r in outcomes if r is not None]
+        if contents:
+            return await self._acombine_contents(task, contents, semaphore, stats)
+        return no_result_message
+    
+    async def _acombine_contents(self, task, contents, semaphore, stats=None):
+        """Combine the non-empty chunk results of one task with the configured strategy."""
+        with span("combine", {"task": task, "parts": len(contents), "strategy": self.combine_strategy}):
+            if self.combine_strategy == COMBINE_MAP_REDUCE and len(contents) > 1:
+                return await self._areduce(task, contents, semaphore, stats)
+            return self._combine_analysis_results(contents)
+    
+    def _reduce_prompt(self, task, parts, first, last, total):
+        """Build the prompt consolidating partial results of one task.
+        
+        Args:
+            task (str): One of ANALYSIS_TASKS
+            parts (list): Partial results, in transcript order
+            first (int): Index of the first transcript chunk the parts cover
+            last (int): Index of the last transcript chunk the parts cover
+            total (int): Total number of transcript chunks
+            
+        Returns:
+            str: The prompt to send to the model
+        """
+        kind, instructions = REDUCE_INSTRUCTIONS[task]
+        sections = "\n\n".join(f"Resultado {n}:\n{part.strip()}" for n, part in enumerate(parts, 1))
+        return f"""
+                Os resultados abaixo são {kind} extraídos, em ordem, das partes {first + 1} a {last + 1} de {total} de uma transcrição de reunião.
                 
-                {chunk}
+                {sections}
                 
-                {'Esta é a parte ' + str(i+1) + ' de ' + str(len(chunks)) + ' da transcrição completa.' if len(chunks) > 1 else ''}
-                Liste no máximo {'3' if len(chunks) > 1 else '5'} insights principais que foram discutidos nesta {'parte da ' if len(chunks) > 1 else ''}reunião.
+                Consolide-os em um único resultado. {instructions}
                 Não use formatação HTML ou markdown na sua resposta.
                 """
-                
-                # Using run method directly to get the response
-                response = self.agent.run(chunk_prompt, stream=False)
-                
-                # Extract the content from the response
-                if response and hasattr(response, 'content'):
-                    all_insights.append(response.content)
-                    
-            # Combine insights from all chunks
-            if all_insights:
-                return self._combine_analysis_results(all_insights)
-            else:
-                return "Não foi possível extrair insights desta transcrição."
-                
-        except Exception as e:
-            print(f"Error extracting insights: {str(e)}")
-            return "Ocorreu um erro ao analisar os insights da reunião."
     
-    def extract_action_items(self, transcript):
-        """Extract action items from the meeting transcript.
+    def _reduce_groups(self, parts):
+        """Group consecutive partial results for one reduce tier.
+        
+        Each group holds at most reduce_fan_in results and, beyond its first
+        two, only as many as fit chunk_tokens, so every reduce call has a
+        bounded context. Groups always hold at least two results, so every
+        tier shrinks.
         
         Args:
-            transcript (str): Meeting transcript text
+            parts (list): (first, last, text) partial results, in order
             
         Returns:
-            str: Action items identified in the meeting, or a default message if analysis fails
+            list: Lists of consecutive partial results
         """
-        try:
-            # Split transcript into chunks if necessary
-            chunks = self._split_transcript_into_chunks(transcript)
+        tokens = self.token_counter.count_many([text for _, _, text in parts])
+        groups = []
+        current, current_tokens = [], 0
+        for part, part_tokens in zip(parts, tokens):
+            if len(current) >= self.reduce_fan_in or \
+                    (len(current) >= 2 and current_tokens + part_tokens > self.chunk_tokens):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+        # A lone trailing result joins the previous group
+        if len(current) == 1 and groups and len(groups[-1]) < self.reduce_fan_in:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+        return groups
+    
+    async def _areduce(self, task, contents, semaphore, stats=None):
+        """Consolidate chunk results with the model in tiers of bounded fan-in.
+        
+        Each tier groups consecutive results (see _reduce_groups) and reduces
+        all groups concurrently, until one result remains; the depth grows
+        with the logarithm of the number of chunks. A failed reduce call
+        falls back to merging its group without the model.
+        
+        Args:
+            task (str): One of ANALYSIS_TASKS
+            contents (list): Chunk results, in chunk order
+            semaphore (asyncio.Semaphore): Limits the number of calls in flight
+            stats (dict): Optional dict; "reduce_tiers", "reduce_calls" and the
+                          per-stage accounting are updated
+            
+        Returns:
+            str: The consolidated result
+        """
+        total = len(contents)
+        parts = [(i, i, content) for i, content in enumerate(contents)]
+        tiers = 0
+        
+        async def reduce_group(group, stage):
+            first, last = group[0][0], group[-1][1]
+            texts = [text for _, _, text in group]
+            if len(group) == 1:
+                return first, last, texts[0]
             
-            # Process each chunk
-            all_action_items = []
+            prompt = self._reduce_prompt(task, texts, first, last, total)
+            digest = hashlib.sha256("\x00".join(" ".join(text.split()) for text in texts).encode("utf-8")).hexdigest()
+            model_id = self.stage_models[stage]
+            key = f"{digest}:{model_id}:reduce-{task}:{PROMPT_VERSION}:{first}-{last}/{total}"
+            attributes = {"task": task, "first_chunk": first, "last_chunk": last, "tier": tiers, "stage": stage}
+            try:
+                with span("reduce_call", attributes):
+                    content = await self._arun_cached(key, prompt, semaphore, stage, stats)
+            except Exception as e:
+                print(f"Error reducing {task} parts {first + 1}-{last + 1}/{total}: {e}")
+                content = None
+            return first, last, content or self._combine_analysis_results(texts)
+        
+        while len(parts) > 1:
+            groups = self._reduce_groups(parts)
+            # The last tier produces the final result
+            stage = STAGE_FINAL if len(groups) == 1 else STAGE_REDUCE
+            parts = list(await asyncio.gather(*(reduce_group(group, stage) for group in groups)))
+            tiers += 1
+            if stats is not None:
+                stats["reduce_calls"] = stats.get("reduce_calls", 0) + sum(1 for group in groups if len(group) > 1)
+        
+        if stats is not None:
+            stats["reduce_tiers"] = max(stats.get("reduce_tiers", 0), tiers)
+        return self._strip_html_markdown(parts[0][2])
+    
+    async def _aanalyze_tasks(self, transcript, tasks, on_result=None, stats=None):
+        """Run the given analyses over every transcript chunk concurrently.
+        
+        All (task, chunk) calls are issued at once, limited by max_concurrency,
+        and each task's chunk results are combined in chunk order exactly as
+        the sequential path does, as soon as that task's chunks are done.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            tasks (iterable): Analyses to run, from ANALYSIS_TASKS
+            on_result (callable): Optional callback receiving (task, result)
+                                  as each task finishes
+            stats (dict): Optional dict filled with chunking statistics
+                          (see _split_transcript_into_chunks)
             
+        Returns:
+            dict: Combined result for each task, or its fallback message
+        """
+        tasks = list(tasks)
+        if self.analysis_mode == ANALYSIS_MODE_SINGLE_PASS:
+            return await self._aanalyze_single_pass(transcript, tasks, on_result, stats)
+        
+        # Split transcript into chunks if necessary
+        chunks = self._split_transcript_into_chunks(self._prefilter(transcript, stats), stats)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        # Identical chunks share a single call
+        calls = {}
+        for task in tasks:
             for i, chunk in enumerate(chunks):
-                chunk_prompt = f"""
-                Analise a seguinte {'parte da ' if len(chunks) > 1 else ''}transcrição de reunião e identifique todos os itens de ação ou tarefas mencionadas:
+                key = self._result_cache_key(task, chunk, len(chunks))
+                if key not in calls:
+                    calls[key] = asyncio.ensure_future(
+                        self._arun_task_chunk(task, chunk, i, len(chunks), semaphore, stats)
+                    )
+        
+        async def finish_task(task):
+            task_calls = [calls[self._result_cache_key(task, chunk, len(chunks))] for chunk in chunks]
+            outcomes = await asyncio.gather(*task_calls, return_exceptions=True)
+            result = await self._acombine_task_outcomes(task, outcomes, semaphore, stats)
+            if on_result:
+                on_result(task, result)
+            return result
+        
+        results = await asyncio.gather(*(finish_task(task) for task in tasks))
+        return dict(zip(tasks, results))
+    
+    async def _astream_prompt(self, prompt, stage=STAGE_MAP):
+        """Run a prompt on a fresh agent and yield the response text as it is generated.
+        
+        Args:
+            prompt (str): The prompt to send
+            stage (str): Pipeline stage, selecting the model
+            
+        Yields:
+            str: Pieces of the response content
+        """
+        model = self.stage_models[stage]
+        started = time.time()
+        stream = self._create_agent(model_id=model).arun(prompt, stream=True)
+        # Older agno releases return a coroutine resolving to the iterator
+        if inspect.isawaitable(stream):
+            stream = await stream
+        async for event in stream:
+            content = getattr(event, "content", None)
+            if getattr(event, "event", None) in STREAM_ERROR_EVENTS:
+                ANALYSIS_CALLS.inc(stage, model, "error")
+                ERRORS.inc("analysis", "ModelCallFailed")
+                raise Exception(f"Model call failed: {content}")
+            if getattr(event, "event", None) in STREAM_CONTENT_EVENTS and isinstance(content, str) and content:
+                yield content
+        ANALYSIS_CALL_SECONDS.observe(time.time() - started, stage, model)
+        ANALYSIS_CALLS.inc(stage, model, "ok")
+    
+    async def astream_task(self, task, transcript):
+        """Run one analysis and yield its text as the model generates it.
+        
+        Every chunk is analyzed concurrently, limited by max_concurrency, and
+        streams its own tokens; cached chunk results are sent in one piece.
+        The combined result, identical to what the non-streaming methods
+        return, comes last.
+        
+        Args:
+            task (str): One of ANALYSIS_TASKS
+            transcript (str): Meeting transcript text
+            
+        Yields:
+            tuple: ("token", {"chunk", "chunks", "text"}) for each piece of a
+                   chunk's response, then ("result", {"task", "text"})
+        """
+        chunks = self._split_transcript_into_chunks(self._prefilter(transcript))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pieces = asyncio.Queue()
+        
+        async def run_chunk(i, chunk):
+            key = self._result_cache_key(task, chunk, len(chunks))
+            content = await self.result_cache.aget(key)
+            if content is not None:
+                pieces.put_nowait((i, content))
+                return content
+            
+            parts = []
+            async with semaphore:
+                prompt = self._build_prompt(task, chunk, i, len(chunks))
+                async for piece in self._astream_prompt(prompt, self._chunk_stage(len(chunks))):
+                    parts.append(piece)
+                    pieces.put_nowait((i, piece))
+            content = "".join(parts) or None
+            if content is not None:
+                await self.result_cache.aset(key, content)
+            return content
+        
+        calls = asyncio.gather(*(run_chunk(i, chunk) for i, chunk in enumerate(chunks)), return_exceptions=True)
+        calls.add_done_callback(lambda _: pieces.put_nowait(None))
+        try:
+            while True:
+                piece = await pieces.get()
+                if piece is None:
+                    break
+                yield "token", {"chunk": piece[0], "chunks": len(chunks), "text": piece[1]}
+        finally:
+            # Stop the model calls if the consumer goes away
+            if not calls.done():
+                calls.cancel()
+        
+        result = await self._acombine_task_outcomes(task, calls.result(), semaphore)
+        yield "result", {"task": task, "text": result}
+    
+    def _structured_prompt(self, chunk, i, total):
+        """Build the single-pass prompt asking for all analyses of one chunk as JSON."""
+        schema = json.dumps(ChunkAnalysis.model_json_schema(), ensure_ascii=False)
+        return f"""
+                Analise a seguinte {'parte da ' if total > 1 else ''}transcrição de reunião:
                 
                 {chunk}
                 
-                {'Esta é a parte ' + str(i+1) + ' de ' + str(len(chunks)) + ' da transcrição completa.' if len(chunks) > 1 else ''}
-                Para cada item de ação, indique:
-                - A tarefa a ser realizada
-                - Quem é responsável (se mencionado)
-                - Prazo (se mencionado)
-                Não use formatação HTML ou markdown na sua resposta.
-                """
-                
-                # Using run method directly to get the response
-                response = self.agent.run(chunk_prompt, stream=False)
+                {'Esta é a parte ' + str(i+1) + ' de ' + str(total) + ' da transcrição completa.' if total > 1 else ''}
+                Responda apenas com um objeto JSON válido que siga este JSON Schema:
+                {schema}
                 
-                # Extract the content from the response
-                if response and hasattr(response, 'content'):
-                    all_action_items.append(response.content)
-                    
-            # Combine action items from all chunks
-            if all_action_items:
-                return self._combine_analysis_results(all_action_items)
-            else:
-                return "Não foi possível extrair itens de ação desta transcrição."
-                
-        except Exception as e:
-            print(f"Error extracting action items: {str(e)}")
-            return "Ocorreu um erro ao analisar os itens de ação da reunião."
+                - insights: no máximo {'3' if total > 1 else '5'} insights principais que foram discutidos nesta {'parte da ' if total > 1 else ''}reunião.
+                - action_items: todos os itens de ação ou tarefas mencionadas, com a tarefa, quem é responsável (se mencionado) e o prazo (se mencionado); use null quando não mencionado.
+                - bullet_points: os pontos de discussão em uma lista clara e concisa.
+                Não use formatação HTML ou markdown nos textos.
+                """
     
-    def generate_bullet_points(self, transcript):
-        """Generate bullet point summary of the discussion.
+    def _parse_chunk_analysis(self, content):
+        """Validate a model response against the ChunkAnalysis schema.
         
         Args:
-            transcript (str): Meeting transcript text
+            content (str): Raw response content
             
         Returns:
-            str: Bullet point summary of the meeting discussion, or a default message if analysis fails
+            ChunkAnalysis: The validated result
+            
+        Raises:
+            ValueError: If the response is not a valid ChunkAnalysis object
         """
+        if isinstance(content, ChunkAnalysis):
+            return content
+        
+        text = (content or "").strip()
+        # Tolerate a surrounding markdown code fence
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
         try:
-            # Split transcript into chunks if necessary
-            chunks = self._split_transcript_into_chunks(transcript)
+            return ChunkAnalysis.model_validate_json(text)
+        except ValidationError as e:
+            raise ValueError(f"Invalid structured analysis response: {e}")
+    
+    async def _arun_structured(self, chunk, i, total, semaphore, stats=None):
+        """Analyze one chunk in a single structured call, reusing cached results.
+        
+        Args:
+            chunk (str): Transcript chunk text
+            i (int): Index of the chunk
+            total (int): Total number of chunks
+            semaphore (asyncio.Semaphore): Limits the number of calls in flight
+            stats (dict): Optional dict receiving per-stage accounting
             
-            # Process each chunk
-            all_bullet_points = []
+        Returns:
+            ChunkAnalysis: The structured result for the chunk
+        """
+        stage = self._chunk_stage(total)
+        attributes = {"task": "structured", "chunk": i, "chunks": total, "stage": stage, "chunk.chars": len(chunk)}
+        with span("analysis_call", attributes):
+            key = self._result_cache_key("structured", chunk, total)
+            cached = await self.result_cache.aget(key)
+            if cached is not None:
+                self._record_usage(stats, stage, time.time(), cached=True)
+                return ChunkAnalysis.model_validate_json(cached)
             
+            prompt = self._structured_prompt(chunk, i, total)
+            try:
+                content = await self._arun_prompt(prompt, semaphore, structured=True, stage=stage, stats=stats)
+                result = self._parse_chunk_analysis(content)
+            except ValueError as e:
+                # Ask once more before giving up on a malformed response
+                ERRORS.inc("analysis", "MalformedResponse")
+                print(f"Retrying chunk {i+1}/{total}: {e}")
+                content = await self._arun_prompt(prompt, semaphore, structured=True, stage=stage, stats=stats)
+                result = self._parse_chunk_analysis(content)
+            
+            await self.result_cache.aset(key, result.model_dump_json())
+            return result
+    
+    def _format_structured_field(self, analysis, task):
+        """Render one field of a structured chunk result as plain text.
+        
+        Args:
+            analysis (ChunkAnalysis): Structured chunk result
+            task (str): One of ANALYSIS_TASKS
+            
+        Returns:
+            str: Plain text list in the same style as the per-task prompts produce
+        """
+        if task == "insights":
+            return "\n".join(f"{n}. {insight}" for n, insight in enumerate(analysis.insights, 1))
+        if task == "action_items":
+            lines = []
+            for item in analysis.action_items:
+                line = f"• {item.task}"
+                if item.owner:
+                    line += f" — Responsável: {item.owner}"
+                if item.deadline:
+                    line += f" — Prazo: {item.deadline}"
+                lines.append(line)
+            return "\n".join(lines)
+        return "\n".join(f"• {point}" for point in analysis.bullet_points)
+    
+    async def _aanalyze_single_pass(self, transcript, tasks, on_result=None, stats=None):
+        """Analyze each chunk once and merge the structured results per field.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            tasks (list): Analyses to return, from ANALYSIS_TASKS
+            on_result (callable): Optional callback receiving (task, result)
+                                  for each task once all chunks are done
+            stats (dict): Optional dict filled with chunking statistics
+            
+        Returns:
+            dict: Combined result for each task, or its fallback message
+        """
+        chunks = self._split_transcript_into_chunks(self._prefilter(transcript, stats), stats)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        try:
+            # Identical chunks share a single call
+            calls = {}
             for i, chunk in enumerate(chunks):
-                chunk_prompt = f"""
-                Analise a seguinte {'parte da ' if len(chunks) > 1 else ''}transcrição de reunião e crie uma lista de tópicos que resuma a discussão:
-                
-                {chunk}
-                
-                {'Esta é a parte ' + str(i+1) + ' de ' + str(len(chunks)) + ' da transcrição completa.' if len(chunks) > 1 else ''}
-                Organize os pontos de discussão em uma lista de marcadores (bullet points) clara e concisa.
-                Não use formatação HTML ou markdown na sua resposta.
-                """
-                
-                # Using run method directly to get the response
-                response = self.agent.run(chunk_prompt, stream=False)
-                
-                # Extract the content from the response
-                if response and hasattr(response, 'content'):
-                    all_bullet_points.append(response.content)
-                    
-            # Combine bullet points from all chunks
-            if all_bullet_points:
-                return self._combine_analysis_results(all_bullet_points)
-            else:
-                return "Não foi possível extrair pontos de resumo desta transcrição."
-                
+                key = self._result_cache_key("structured", chunk, len(chunks))
+                if key not in calls:
+                    calls[key] = asyncio.ensure_future(
+                        self._arun_structured(chunk, i, len(chunks), semaphore, stats)
+                    )
+            await asyncio.gather(*calls.values())
+            analyses = [
+                calls[self._result_cache_key("structured", chunk, len(chunks))].result()
+                for chunk in chunks
+            ]
         except Exception as e:
-            print(f"Error generating bullet points: {str(e)}")
-            return "Ocorreu um erro ao gerar o resumo da reunião."
+            results = {}
+            for task in tasks:
+                _, error_message, description = TASK_MESSAGES[task]
+                print(f"Error {description}: {str(e)}")
+                results[task] = error_message
+                if on_result:
+                    on_result(task, error_message)
+            return results
+        
+        async def finish_task(task):
+            contents = [self._format_structured_field(analysis, task) for analysis in analyses]
+            contents = [content for content in contents if content]
+            if contents:
+                result = await self._acombine_contents(task, contents, semaphore, stats)
+            else:
+                result = TASK_MESSAGES[task][0]
+            if on_result:
+                on_result(task, result)
+            return result
+        
+        results = await asyncio.gather(*(finish_task(task) for task in tasks))
+        return dict(zip(tasks, results))
     
-    def analyze_transcript(self, transcript):
-        """Perform complete analysis of the meeting transcript.
+    def _run_sync(self, coroutine):
+        """Run a coroutine to completion from synchronous code.
+        
+        The coroutine runs on the outbound layer's long-lived event loop, so
+        every synchronous analysis (one per meeting job) shares its HTTP
+        client and connection pool.
+        
+        Args:
+            coroutine: The coroutine to run
+            
+        Returns:
+            The coroutine result
+        """
+        return self.outbound.run_sync(coroutine)
+    
+    async def aextract_insights(self, transcript):
+        """Extract key insights from the meeting transcript (async).
         
         Args:
             transcript (str): Meeting transcript text
             
+        Returns:
+            str: Key insights from the meeting, or a default message if analysis fails
+        """
+        return (await self._aanalyze_tasks(transcript, ["insights"]))["insights"]
+    
+    async def aextract_action_items(self, transcript):
+        """Extract action items from the meeting transcript (async).
+        
+        Args:
+            transcript (str): Meeting transcript text
+            
+        Returns:
+            str: Action items identified in the meeting, or a default message if analysis fails
+        """
+        return (await self._aanalyze_tasks(transcript, ["action_items"]))["action_items"]
+    
+    async def agenerate_bullet_points(self, transcript):
+        """Generate bullet point summary of the discussion (async).
+        
+        Args:
+            transcript (str): Meeting transcript text
+            
+        Returns:
+            str: Bullet point summary of the meeting discussion, or a default message if analysis fails
+        """
+        return (await self._aanalyze_tasks(transcript, ["bullet_points"]))["bullet_points"]
+    
+    def extract_insights(self, transcript):
+        """Extract key insights from the meeting transcript.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            
+        Returns:
+            str: Key insights from the meeting, or a default message if analysis fails
+        """
+        return self._run_sync(self.aextract_insights(transcript))
+    
+    def extract_action_items(self, transcript):
+        """Extract action items from the meeting transcript.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            
+        Returns:
+            str: Action items identified in the meeting, or a default message if analysis fails
+        """
+        return self._run_sync(self.aextract_action_items(transcript))
+    
+    def generate_bullet_points(self, transcript):
+        """Generate bullet point summary of the discussion.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            
+        Returns:
+            str: Bullet point summary of the meeting discussion, or a default message if analysis fails
+        """
+        return self._run_sync(self.agenerate_bullet_points(transcript))
+    
+    async def aanalyze_transcript(self, transcript, on_section=None, stats=None):
+        """Perform complete analysis of the meeting transcript (async).
+        
+        The three analyses and all their chunks run concurrently.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            on_section (callable): Optional callback receiving (section, text)
+                                   as each analysis finishes
+            stats (dict): Optional dict filled with chunking statistics: number of
+                          chunks, transcript tokens and input tokens per analysis
+            
         Returns:
             dict: Analysis results including insights, action items, and bullet points
         """
         # If transcript is too short, return default messages
         if not transcript or len(transcript.strip()) < 50:
-            return {
+            results = {
                 "insights": "A transcrição é muito curta para análise.",
                 "action_items": "A transcrição é muito curta para análise.",
                 "bullet_points": "A transcrição é muito curta para análise."
             }
+            if on_section:
+                for task in ANALYSIS_TASKS:
+                    on_section(task, results[task])
+            return results
+        
+        def on_result(task, result):
+            if on_section:
+                on_section(task, self._strip_html_markdown(result))
         
-        # Process each analysis in sequence
-        insights = self.extract_insights(transcript)
-        action_items = self.extract_action_items(transcript)
-        bullet_points = self.generate_bullet_points(transcript)
+        results = await self._aanalyze_tasks(transcript, ANALYSIS_TASKS, on_result, stats)
         
         # Ensure all results are clean, plain text
-        insights = self._strip_html_markdown(insights)
-        action_items = self._strip_html_markdown(action_items)
-        bullet_points = self._strip_html_markdown(bullet_points)
-        
-        # Return combined results
-        return {
-            "insights": insights,
-            "action_items": action_items,
-            "bullet_points": bullet_points
-        } 
\ No newline at end of file
+        return {task: self._strip_html_markdown(results[task]) for task in ANALYSIS_TASKS}
+    
+    def analyze_transcript(self, transcript, on_section=None, stats=None):
+        """Perform complete analysis of the meeting transcript.
+        
+        Args:
+            transcript (str): Meeting transcript text
+            on_section (callable): Optional callback receiving (section, text)
+                                   as each analysis finishes
+            stats (dict): Optional dict filled with chunking statistics
+            
+        Returns:
+            dict: Analysis results including insights, action items, and bullet points
+        """
+        return self._run_sync(self.aanalyze_transcript(transcript, on_section, stats))
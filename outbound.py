@@ -0,0 +1,494 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import email.utils
+import json
+import math
+import random
+import threading
+import time
+import weakref
+
+from metrics import Counter, Histogram, ERRORS
+from tokenizer import ESTIMATED_CHARS_PER_TOKEN
+from tracing import span, current_span
+
+# httpx is imported when the first client is built, keeping application start-up cheap
+
+# Statuses worth retrying: request timeout, conflict, rate limit and server errors
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+# A 429 with this error code means the account is out of credit; retrying cannot help
+QUOTA_ERROR_CODE = "insufficient_quota"
+
+# Scheduler budget of transcription calls, which are limited by requests only
+TRANSCRIPTION_BUDGET = "audio"
+# Completion tokens assumed for a chat call that does not set a maximum
+DEFAULT_COMPLETION_TOKENS = 1024
+
+OPENAI_REQUEST_SECONDS = Histogram("openai_request_duration_seconds",
+                                   "Duration of one request attempt to the OpenAI API, until the response headers",
+                                   ["endpoint"])
+OPENAI_REQUESTS = Counter("openai_requests", "Request attempts to the OpenAI API, by endpoint and status or error",
+                          ["endpoint", "status"])
+OPENAI_REQUEST_BYTES = Counter("openai_request_bytes", "Request body bytes sent to the OpenAI API", ["endpoint"])
+OPENAI_RETRIES = Counter("openai_retries", "Retried OpenAI API requests, by reason", ["reason"])
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring the server's Retry-After."""
+
+    def __init__(self, max_retries=4, base_delay=0.5, max_delay=30.0, retry_statuses=RETRY_STATUSES):
+        """Initialize the policy.
+
+        Args:
+            max_retries (int): Retries after the first attempt (0 disables retrying)
+            base_delay (float): Upper bound in seconds of the first backoff
+            max_delay (float): Upper bound in seconds of any wait, Retry-After included
+            retry_statuses (set): HTTP statuses that are retried
+        """
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def should_retry(self, attempt, response=None):
+        """Whether a failed attempt is retried.
+
+        Args:
+            attempt (int): Zero-based attempt that failed
+            response: The httpx response, or None if the request raised a
+                      connection or timeout error
+
+        Returns:
+            bool: True to retry
+        """
+        if attempt >= self.max_retries:
+            return False
+        if response is None:
+            return True
+        if response.status_code not in self.retry_statuses:
+            return False
+        if response.status_code == 429:
+            response.read()
+            return QUOTA_ERROR_CODE not in response.text
+        return True
+
+    async def ashould_retry(self, attempt, response=None):
+        """Async version of should_retry, for responses of an async client."""
+        if response is not None and response.status_code == 429 and attempt < self.max_retries:
+            await response.aread()
+        return self.should_retry(attempt, response)
+
+    def delay(self, attempt, response=None):
+        """Seconds to wait before retrying.
+
+        Args:
+            attempt (int): Zero-based attempt that failed
+            response: The httpx response, if any
+
+        Returns:
+            float: The server's Retry-After when given, otherwise a random
+                   wait up to base_delay * 2 ** attempt; at most max_delay
+        """
+        retry_after = self.retry_after(response) if response is not None else None
+        if retry_after is not None:
+            # A little jitter so clients told the same time do not all return at once
+            return min(self.max_delay, retry_after + random.uniform(0, self.base_delay))
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response):
+        """Seconds requested by the Retry-After (or OpenAI's retry-after-ms) header, if any."""
+        milliseconds = response.headers.get("retry-after-ms")
+        if milliseconds:
+            try:
+                return max(0.0, float(milliseconds) / 1000)
+            except ValueError:
+                pass
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class TimeoutPolicy:
+    """Per-request timeouts that grow with the size of the request body.
+
+    Uploading and processing a 24 MB audio chunk takes far longer than a
+    short chat request; a single fixed timeout is either too short for the
+    former or too long to notice a stalled connection on the latter.
+    """
+
+    def __init__(self, connect=10.0, base=60.0, upload_bytes_per_second=256 * 1024,
+                 processing_bytes_per_second=512 * 1024):
+        """Initialize the policy.
+
+        Args:
+            connect (float): Seconds to establish a connection
+            base (float): Read and write timeout in seconds of an empty request
+            upload_bytes_per_second (float): Slowest upload rate tolerated; sets
+                                             the extra write timeout per byte
+            processing_bytes_per_second (float): Slowest server processing rate
+                                                 tolerated; sets the extra read
+                                                 timeout per byte
+        """
+        self.connect = connect
+        self.base = base
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.processing_bytes_per_second = processing_bytes_per_second
+
+    def for_size(self, size):
+        """Timeouts for a request body.
+
+        Args:
+            size (int): Request body size in bytes
+
+        Returns:
+            dict: httpx timeout extension ("connect", "read", "write", "pool")
+        """
+        return {
+            "connect": self.connect,
+            "read": self.base + size / self.processing_bytes_per_second,
+            "write": self.base + size / self.upload_bytes_per_second,
+            "pool": self.base,
+        }
+
+
+class _RetryTransport:
+    """Sync httpx transport that applies OutboundHTTP's timeouts and retries."""
+
+    def __init__(self, outbound, transport):
+        self.outbound = outbound
+        self.transport = transport
+
+    def handle_request(self, request):
+        import httpx
+
+        # Buffer the body so it can be sent again
+        body = request.read()
+        request.extensions = {**request.extensions, "timeout": self.outbound.timeouts.for_size(len(body))}
+        budget, tokens = self.outbound._call_budget(request, body)
+        attributes = {"endpoint": self.outbound._endpoint(request), "request.bytes": len(body),
+                      "budget": budget, "estimated_tokens": tokens}
+        with span("openai_request", attributes) as request_span:
+            attempt = 0
+            while True:
+                if self.outbound.scheduler:
+                    waited = self.outbound.scheduler.acquire(budget, tokens)
+                    request_span.add("scheduler_wait_seconds", round(waited, 3))
+                self.outbound._count("attempts")
+                started = time.perf_counter()
+                try:
+                    response = self.transport.handle_request(request)
+                except (httpx.TimeoutException, httpx.NetworkError) as e:
+                    self.outbound._observe(request, len(body), started, type(e).__name__)
+                    if not self.outbound.retry.should_retry(attempt):
+                        raise
+                    wait = self.outbound.retry.delay(attempt)
+                    self.outbound._retrying(request, attempt, type(e).__name__, wait)
+                else:
+                    self.outbound._observe(request, len(body), started, response.status_code)
+                    if response.status_code < 400:
+                        if self.outbound._has_usage(request, response):
+                            response.read()
+                            self.outbound._settle(budget, tokens, response)
+                        return response
+                    if not self.outbound.retry.should_retry(attempt, response):
+                        return response
+                    wait = self.outbound.retry.delay(attempt, response)
+                    response.close()
+                    self.outbound._retrying(request, attempt, response.status_code, wait, budget)
+                time.sleep(wait)
+                attempt += 1
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _AsyncRetryTransport:
+    """Async httpx transport that applies OutboundHTTP's timeouts and retries."""
+
+    def __init__(self, outbound, transport):
+        self.outbound = outbound
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        import httpx
+
+        body = await request.aread()
+        request.extensions = {**request.extensions, "timeout": self.outbound.timeouts.for_size(len(body))}
+        budget, tokens = self.outbound._call_budget(request, body)
+        attributes = {"endpoint": self.outbound._endpoint(request), "request.bytes": len(body),
+                      "budget": budget, "estimated_tokens": tokens}
+        with span("openai_request", attributes) as request_span:
+            attempt = 0
+            while True:
+                if self.outbound.scheduler:
+                    waited = await self.outbound.scheduler.aacquire(budget, tokens)
+                    request_span.add("scheduler_wait_seconds", round(waited, 3))
+                self.outbound._count("attempts")
+                started = time.perf_counter()
+                try:
+                    response = await self.transport.handle_async_request(request)
+                except (httpx.TimeoutException, httpx.NetworkError) as e:
+                    self.outbound._observe(request, len(body), started, type(e).__name__)
+                    if not self.outbound.retry.should_retry(attempt):
+                        raise
+                    wait = self.outbound.retry.delay(attempt)
+                    self.outbound._retrying(request, attempt, type(e).__name__, wait)
+                else:
+                    self.outbound._observe(request, len(body), started, response.status_code)
+                    if response.status_code < 400:
+                        if self.outbound._has_usage(request, response):
+                            await response.aread()
+                            self.outbound._settle(budget, tokens, response)
+                        return response
+                    if not await self.outbound.retry.ashould_retry(attempt, response):
+                        return response
+                    wait = self.outbound.retry.delay(attempt, response)
+                    await response.aclose()
+                    self.outbound._retrying(request, attempt, response.status_code, wait, budget)
+                await asyncio.sleep(wait)
+                attempt += 1
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+
+class OutboundHTTP:
+    """Shared HTTP clients for calls to the OpenAI API.
+
+    All transcription and analysis calls go through the same keep-alive
+    connection pool instead of one per SDK client, with timeouts scaled to
+    the request size and failed requests (connection errors, timeouts, 429
+    and 5xx responses) retried with backoff. Retrying here, below the SDKs,
+    means a rate-limited chunk is resent on its own instead of failing the
+    whole meeting.
+
+    With a scheduler, every attempt (retries included) first waits for its
+    model's request and token budget; estimated tokens are corrected with
+    the usage of non-streamed responses, and a 429 pauses the model's budget.
+
+    httpx async connections belong to the event loop that opened them, so
+    each event loop gets its own async client; the sync client is shared by
+    all threads. Synchronous callers run their async work with run_sync() on
+    one long-lived background loop, so it shares that loop's client and
+    connections instead of creating a new client per ``asyncio.run``.
+    """
+
+    def __init__(self, max_connections=32, max_keepalive_connections=16, keepalive_expiry=30.0,
+                 retry=None, timeouts=None, scheduler=None):
+        """Initialize the clients (built on first use).
+
+        Args:
+            max_connections (int): Maximum open connections per client
+            max_keepalive_connections (int): Idle connections kept open per client
+            keepalive_expiry (float): Seconds an idle connection is kept open
+            retry (RetryPolicy): Retry policy; defaults to RetryPolicy()
+            timeouts (TimeoutPolicy): Timeout policy; defaults to TimeoutPolicy()
+            scheduler (OutboundScheduler): Rate-limit budgets the calls wait
+                                           for; None to send them at once
+        """
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.retry = retry or RetryPolicy()
+        self.timeouts = timeouts or TimeoutPolicy()
+        self.scheduler = scheduler
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._lock = threading.Lock()
+        self._counters = {"attempts": 0, "retries": 0}
+        self._retry_reasons = {}
+
+    def _limits(self):
+        import httpx
+
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_keepalive_connections,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    def client(self):
+        """The shared sync client.
+
+        Returns:
+            httpx.Client: Client to pass as ``http_client`` to ``openai.OpenAI``
+        """
+        import httpx
+
+        with self._lock:
+            if self._client is None:
+                transport = _RetryTransport(self, httpx.HTTPTransport(limits=self._limits()))
+                self._client = httpx.Client(transport=transport, timeout=self.timeouts.for_size(0))
+            return self._client
+
+    def async_client(self):
+        """The async client of the running event loop.
+
+        Returns:
+            httpx.AsyncClient: Client to pass as ``http_client`` to
+                               ``openai.AsyncOpenAI``, or None when called
+                               outside an event loop (the SDK default is used)
+        """
+        import httpx
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                transport = _AsyncRetryTransport(self, httpx.AsyncHTTPTransport(limits=self._limits()))
+                client = httpx.AsyncClient(transport=transport, timeout=self.timeouts.for_size(0))
+                self._async_clients[loop] = client
+            return client
+
+    def _background_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="outbound-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run_sync(self, coroutine):
+        """Run a coroutine on the shared background event loop and wait for its result.
+
+        The coroutine runs in a copy of the caller's context, so its spans and
+        call scheduling follow the caller. Many callers can wait at once;
+        their coroutines run concurrently on the loop.
+
+        Args:
+            coroutine: The coroutine to run
+
+        Returns:
+            The coroutine result
+        """
+        loop = self._background_loop()
+        result = concurrent.futures.Future()
+
+        def done(task):
+            if task.cancelled():
+                result.cancel()
+            elif task.exception() is not None:
+                result.set_exception(task.exception())
+            else:
+                result.set_result(task.result())
+
+        def start():
+            # Tasks copy the current context, which is the caller's here
+            asyncio.ensure_future(coroutine).add_done_callback(done)
+
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return result.result()
+
+    @staticmethod
+    def _call_budget(request, body):
+        """Scheduler budget of a request and its estimated tokens.
+
+        Chat calls are budgeted per model, with the prompt estimated from its
+        length plus the completion limit; transcription calls share one
+        request-only budget.
+
+        Returns:
+            tuple: (budget name, estimated tokens)
+        """
+        path = request.url.path
+        if path.endswith("/chat/completions"):
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return "chat", DEFAULT_COMPLETION_TOKENS
+            characters = sum(len(json.dumps(message.get("content"), ensure_ascii=False))
+                             for message in payload.get("messages", []))
+            completion = (payload.get("max_completion_tokens") or payload.get("max_tokens")
+                          or DEFAULT_COMPLETION_TOKENS)
+            return payload.get("model", "chat"), math.ceil(characters / ESTIMATED_CHARS_PER_TOKEN) + completion
+        if "/audio/" in path:
+            return TRANSCRIPTION_BUDGET, 0
+        return path, 0
+
+    def _has_usage(self, request, response):
+        """Whether a successful response reports token usage that can be read without consuming a stream."""
+        return (self.scheduler is not None and request.url.path.endswith("/chat/completions")
+                and response.headers.get("content-type", "").startswith("application/json"))
+
+    def _settle(self, budget, estimated, response):
+        """Correct the scheduler's token estimate with the usage of a read response."""
+        try:
+            actual = response.json()["usage"]["total_tokens"]
+        except (ValueError, KeyError, TypeError):
+            return
+        self.scheduler.settle(budget, estimated, actual)
+
+    @staticmethod
+    def _endpoint(request):
+        """Metrics label of a request: "chat", "audio" or its path."""
+        path = request.url.path
+        if path.endswith("/chat/completions"):
+            return "chat"
+        if "/audio/" in path:
+            return "audio"
+        return path
+
+    def _observe(self, request, size, started, status):
+        """Record an attempt's duration, size and outcome (status code or error name) in the metrics."""
+        endpoint = self._endpoint(request)
+        OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+        OPENAI_REQUESTS.inc(endpoint, status)
+        current_span().set("status", status)
+        OPENAI_REQUEST_BYTES.inc(endpoint, amount=size)
+        if not isinstance(status, int) or status >= 400:
+            ERRORS.inc("openai", status)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _retrying(self, request, attempt, reason, wait, budget=None):
+        """Count and log a retry; a 429 also pauses the budget of the rate-limited model."""
+        if reason == 429 and budget is not None and self.scheduler:
+            self.scheduler.throttle(budget, wait)
+        with self._lock:
+            self._counters["retries"] += 1
+            self._retry_reasons[str(reason)] = self._retry_reasons.get(str(reason), 0) + 1
+        OPENAI_RETRIES.inc(reason)
+        current_span().add("retries")
+        print(f"Retrying {request.method} {request.url.path} after {reason} "
+              f"(retry {attempt + 1}/{self.retry.max_retries}) in {wait:.1f}s")
+
+    def stats(self):
+        """Report request counters.
+
+        Returns:
+            dict: Attempts sent, retries and retries by reason (status code or error)
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "retry_reasons": dict(self._retry_reasons),
+                "async_clients": len(self._async_clients),
+                "max_connections": self.max_connections,
+                "max_retries": self.retry.max_retries,
+            }
@@ -0,0 +1,207 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Both limiters implement a token bucket per client key and expose the same
+# acquire/stats interface, so callers can switch backends through configuration.
+# A bucket holds up to ``capacity`` units and refills at ``capacity / period``
+# units per second; a request costing ``cost`` units is allowed if the bucket
+# holds that many. A bucket left idle long enough to refill completely is
+# indistinguishable from a new one, so it is dropped.
+
+
+def _refill(tokens, updated_at, now, capacity, rate):
+    """Units in a bucket at ``now``, given its level at ``updated_at``."""
+    return min(capacity, tokens + (now - updated_at) * rate)
+
+
+def _take(tokens, cost, rate):
+    """Apply a request to a refilled bucket.
+
+    Returns:
+        tuple: (allowed, units left, seconds until the request would be allowed)
+    """
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate
+
+
+class MemoryRateLimiter:
+    """In-process token-bucket rate limiter.
+
+    Buckets are kept in least recently updated order; each call drops the
+    buckets that have refilled completely, and the least recently updated
+    ones beyond ``max_keys``, so memory stays bounded and every call is
+    amortized O(1). Limits only apply within one process.
+    """
+
+    def __init__(self, capacity, period, max_keys=10000):
+        """Initialize the limiter.
+
+        Args:
+            capacity (float): Units a client may spend in a burst
+            period (float): Seconds for an empty bucket to refill completely
+            max_keys (int): Maximum number of clients tracked
+        """
+        self.capacity = float(capacity)
+        self.period = float(period)
+        self.rate = self.capacity / self.period
+        self.max_keys = max_keys
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key, cost=1.0):
+        """Spend units from a client's bucket.
+
+        Args:
+            key (str): Client key (API key or IP address)
+            cost (float): Units the request costs; capped at the capacity
+
+        Returns:
+            tuple: (allowed, seconds to wait before retrying when not allowed)
+        """
+        cost = min(float(cost), self.capacity)
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+            tokens = _refill(tokens, updated_at, now, self.capacity, self.rate)
+            allowed, tokens, retry_after = _take(tokens, cost, self.rate)
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+            if allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            return allowed, retry_after
+
+    def _evict(self, now):
+        """Drop full buckets and the oldest ones beyond max_keys. Caller holds the lock."""
+        while self._buckets:
+            key, (tokens, updated_at) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_keys and tokens + (now - updated_at) * self.rate < self.capacity:
+                break
+            del self._buckets[key]
+            self.evictions += 1
+
+    def stats(self):
+        """Report limiter counters.
+
+        Returns:
+            dict: Allowed and rejected requests, evictions and tracked clients
+        """
+        with self._lock:
+            return {
+                "backend": "memory",
+                "capacity": self.capacity,
+                "period": self.period,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+                "keys": len(self._buckets),
+                "max_keys": self.max_keys,
+            }
+
+
+class SQLiteRateLimiter:
+    """Token-bucket rate limiter stored in a SQLite file.
+
+    Every process using the same file shares the buckets, so limits hold
+    across uvicorn workers. Each call reads and writes one row in an
+    immediate transaction; buckets that have refilled completely are purged
+    every ``purge_interval`` seconds.
+    """
+
+    def __init__(self, path, capacity, period, purge_interval=60.0):
+        """Initialize the limiter.
+
+        Args:
+            path (str): Path of the SQLite database file
+            capacity (float): Units a client may spend in a burst
+            period (float): Seconds for an empty bucket to refill completely
+            purge_interval (float): Seconds between purges of full buckets
+        """
+        self.path = path
+        self.capacity = float(capacity)
+        self.period = float(period)
+        self.rate = self.capacity / self.period
+        self.purge_interval = purge_interval
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " key TEXT PRIMARY KEY,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_updated_at ON buckets (updated_at)")
+
+    def acquire(self, key, cost=1.0):
+        """Spend units from a client's bucket.
+
+        Args:
+            key (str): Client key (API key or IP address)
+            cost (float): Units the request costs; capped at the capacity
+
+        Returns:
+            tuple: (allowed, seconds to wait before retrying when not allowed)
+        """
+        cost = min(float(cost), self.capacity)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = _refill(row[0], row[1], now, self.capacity, self.rate) if row else self.capacity
+                allowed, tokens, retry_after = _take(tokens, cost, self.rate)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                if now - self._last_purge >= self.purge_interval:
+                    self._purge(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            return allowed, retry_after
+
+    def _purge(self, now):
+        """Delete buckets idle long enough to be full again. Caller holds the lock."""
+        deleted = self._conn.execute("DELETE FROM buckets WHERE updated_at <= ?", (now - self.period,)).rowcount
+        self.evictions += max(0, deleted)
+        self._last_purge = now
+
+    def stats(self):
+        """Report limiter counters of this process and the number of tracked clients.
+
+        Returns:
+            dict: Allowed and rejected requests, evictions and tracked clients
+        """
+        with self._lock:
+            keys = self._conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+            return {
+                "backend": "sqlite",
+                "capacity": self.capacity,
+                "period": self.period,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+                "keys": keys,
+            }
@@ -0,0 +1,353 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from metrics import Histogram
+
+# Call priorities: interactive requests (a user waiting on an extract-* call)
+# are dispatched before batch work (meeting jobs)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+# Job and priority of the outbound calls made in the current context
+_call_context = contextvars.ContextVar("outbound_call_context", default=(None, PRIORITY_BATCH))
+
+SCHEDULER_WAIT_SECONDS = Histogram("openai_scheduler_wait_seconds",
+                                   "Seconds outbound calls waited for rate-limit budget, by priority", ["priority"])
+
+
+@contextmanager
+def call_context(job=None, priority=PRIORITY_BATCH):
+    """Attribute the outbound calls made inside the block to a job and priority.
+
+    The context follows asyncio tasks created inside the block; threads
+    must be started with ``contextvars.copy_context().run`` to inherit it.
+
+    Args:
+        job (str): Job the calls belong to; calls of different jobs share
+                   the budgets fairly
+        priority (int): PRIORITY_INTERACTIVE or PRIORITY_BATCH
+    """
+    token = _call_context.set((job, priority))
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def current_call_context():
+    """(job, priority) of the outbound calls made in the current context."""
+    return _call_context.get()
+
+
+class _Bucket:
+    """Token bucket refilling ``limit`` units per minute.
+
+    It holds at most ``burst_seconds`` worth of refill: providers enforce
+    per-minute limits over shorter windows, so spending a whole minute's
+    budget at once would still be throttled. A call larger than the
+    capacity waits for a full bucket and leaves it in debt.
+    """
+
+    def __init__(self, limit, burst_seconds):
+        self.limit = float(limit)
+        self.rate = self.limit / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount, now):
+        """Seconds until ``amount`` units (at most the capacity) are available (0 if they are now)."""
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+
+class _Waiter:
+    """A call waiting for budget."""
+
+    __slots__ = ("tokens", "job", "priority", "enqueued", "granted", "grant")
+
+    def __init__(self, tokens, job, priority, grant):
+        self.tokens = tokens
+        self.job = job
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.grant = grant
+
+
+class _Budget:
+    """Request and token buckets of one model, with the calls waiting for them."""
+
+    def __init__(self, rpm, tpm, burst_seconds):
+        self.requests = _Bucket(rpm, burst_seconds) if rpm else None
+        self.tokens = _Bucket(tpm, burst_seconds) if tpm else None
+        self.paused_until = 0.0
+        # Per priority, the waiting calls of each job, in round-robin order
+        self.queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self.waiting = 0
+        self.granted = 0
+        self.throttled = 0
+
+    def wait_for(self, tokens, now):
+        """Seconds until a call of ``tokens`` estimated tokens fits the budget."""
+        wait = max(0.0, self.paused_until - now)
+        if self.requests:
+            wait = max(wait, self.requests.wait_for(1, now))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.wait_for(tokens, now))
+        return wait
+
+    def take(self, tokens):
+        if self.requests:
+            self.requests.level -= 1
+        if self.tokens:
+            self.tokens.level -= tokens
+        self.granted += 1
+
+    def next_waiter(self):
+        """The waiter to serve next: highest priority, then the job whose turn it is."""
+        for priority in sorted(self.queues):
+            jobs = self.queues[priority]
+            if jobs:
+                return next(iter(jobs.values()))[0]
+        return None
+
+    def enqueue(self, waiter):
+        self.queues[waiter.priority].setdefault(waiter.job, deque()).append(waiter)
+        self.waiting += 1
+
+    def dequeue(self, waiter):
+        """Remove a waiter; its job moves to the back of the round robin."""
+        jobs = self.queues[waiter.priority]
+        calls = jobs.pop(waiter.job)
+        calls.remove(waiter)
+        if calls:
+            jobs[waiter.job] = calls
+        self.waiting -= 1
+
+    def usage(self, now):
+        """Share of each bucket currently spent."""
+        usage = {}
+        for name, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            if bucket:
+                bucket.refill(now)
+                usage[name] = {"limit_per_minute": bucket.limit, "capacity": round(bucket.capacity, 1),
+                               "available": round(bucket.level, 1),
+                               "used_ratio": round(1 - bucket.level / bucket.capacity, 3)}
+        return usage
+
+
+class OutboundScheduler:
+    """Process-wide admission control for calls to a rate-limited API.
+
+    Each model has a requests-per-minute and a tokens-per-minute budget,
+    both token buckets. A call that does not fit waits in a queue; waiting
+    calls are served by priority (interactive before batch) and, within a
+    priority, round-robin between jobs, so one long meeting cannot starve
+    the others. Token counts are estimates made before the call and are
+    corrected with the actual usage when it is known. A 429 from the API
+    pauses the model's queue for the Retry-After period, so concurrent
+    calls do not all hit the limit again.
+    """
+
+    def __init__(self, rpm=None, tpm=None, limits=None, burst_seconds=10.0):
+        """Initialize the scheduler.
+
+        Args:
+            rpm (int): Requests per minute allowed for each model; None or 0
+                       for no limit
+            tpm (int): Tokens per minute allowed for each model; None or 0
+                       for no limit
+            limits (dict): (rpm, tpm) overriding the defaults for specific
+                           models or endpoint groups
+            burst_seconds (float): Seconds of budget that can be spent at once
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.burst_seconds = burst_seconds
+        self.limits = dict(limits or {})
+        self._budgets = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._dispatcher = None
+        self._wait_stats = {name: {"calls": 0, "waited": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+                            for name in PRIORITY_NAMES.values()}
+
+    def _budget(self, model):
+        """Budget of a model, created on first use. Caller holds the lock."""
+        budget = self._budgets.get(model)
+        if budget is None:
+            rpm, tpm = self.limits.get(model, (self.rpm, self.tpm))
+            budget = self._budgets[model] = _Budget(rpm, tpm, self.burst_seconds)
+        return budget
+
+    def _admit(self, model, tokens, grant):
+        """Grant a call at once if its budget allows and nobody is waiting, else queue it.
+
+        Returns:
+            _Waiter: The waiter, with ``granted`` set if admitted immediately
+        """
+        job, priority = current_call_context()
+        waiter = _Waiter(tokens, job, priority, grant)
+        with self._lock:
+            budget = self._budget(model)
+            if not budget.waiting and budget.wait_for(tokens, waiter.enqueued) == 0:
+                budget.take(tokens)
+                waiter.granted = True
+                self._record_wait(waiter, 0.0)
+                return waiter
+            budget.enqueue(waiter)
+            self._start_dispatcher()
+            self._wakeup.notify()
+            return waiter
+
+    def acquire(self, model, tokens=0):
+        """Wait until a call fits the model's budget, blocking the thread.
+
+        Args:
+            model (str): Model or endpoint group the call is made to
+            tokens (int): Estimated tokens of the call
+
+        Returns:
+            float: Seconds waited
+        """
+        event = threading.Event()
+        waiter = self._admit(model, tokens, event.set)
+        if not waiter.granted:
+            event.wait()
+        return time.monotonic() - waiter.enqueued
+
+    async def aacquire(self, model, tokens=0):
+        """Wait until a call fits the model's budget, without blocking the event loop.
+
+        Args:
+            model (str): Model or endpoint group the call is made to
+            tokens (int): Estimated tokens of the call
+
+        Returns:
+            float: Seconds waited
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._admit(model, tokens, grant)
+        if not waiter.granted:
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        # Granted as it was cancelled: give the budget back
+                        self._refund(model, waiter.tokens)
+                    else:
+                        self._budget(model).dequeue(waiter)
+                raise
+        return time.monotonic() - waiter.enqueued
+
+    def _refund(self, model, tokens):
+        """Return an unused grant. Caller holds the lock."""
+        budget = self._budget(model)
+        if budget.requests:
+            budget.requests.level = min(budget.requests.capacity, budget.requests.level + 1)
+        if budget.tokens:
+            budget.tokens.level = min(budget.tokens.capacity, budget.tokens.level + tokens)
+        self._wakeup.notify()
+
+    def settle(self, model, estimated, actual):
+        """Correct a call's token charge with its actual usage.
+
+        Args:
+            model (str): Model the call was made to
+            estimated (int): Tokens charged when the call was admitted
+            actual (int): Tokens the API reported
+        """
+        with self._lock:
+            budget = self._budget(model)
+            if budget.tokens:
+                budget.tokens.level = min(budget.tokens.capacity, budget.tokens.level + estimated - actual)
+                self._wakeup.notify()
+
+    def throttle(self, model, seconds):
+        """Stop admitting calls to a model for a while, after the API rate limited one.
+
+        Args:
+            model (str): Model that answered 429
+            seconds (float): Seconds to pause (the response's Retry-After)
+        """
+        with self._lock:
+            budget = self._budget(model)
+            budget.paused_until = max(budget.paused_until, time.monotonic() + seconds)
+            budget.throttled += 1
+
+    def _record_wait(self, waiter, seconds):
+        """Count a granted call and its queue wait. Caller holds the lock."""
+        stats = self._wait_stats[PRIORITY_NAMES[waiter.priority]]
+        SCHEDULER_WAIT_SECONDS.observe(seconds, PRIORITY_NAMES[waiter.priority])
+        stats["calls"] += 1
+        if seconds > 0:
+            stats["waited"] += 1
+            stats["wait_seconds"] += seconds
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], seconds)
+
+    def _start_dispatcher(self):
+        """Start the dispatcher thread if needed. Caller holds the lock."""
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name="outbound-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        """Grant waiting calls as their budgets refill."""
+        with self._lock:
+            while True:
+                timeout = None
+                now = time.monotonic()
+                for budget in self._budgets.values():
+                    while budget.waiting:
+                        waiter = budget.next_waiter()
+                        wait = budget.wait_for(waiter.tokens, now)
+                        if wait > 0:
+                            timeout = wait if timeout is None else min(timeout, wait)
+                            break
+                        budget.take(waiter.tokens)
+                        budget.dequeue(waiter)
+                        waiter.granted = True
+                        self._record_wait(waiter, now - waiter.enqueued)
+                        waiter.grant()
+                self._wakeup.wait(timeout)
+
+    def stats(self):
+        """Report budget usage and queue waits.
+
+        Returns:
+            dict: For each model, bucket limits, availability and share used,
+                  calls waiting, granted and throttled; for each priority,
+                  calls granted, how many waited, and total and maximum wait
+        """
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for model, budget in self._budgets.items():
+                models[model] = {
+                    **budget.usage(now),
+                    "waiting": budget.waiting,
+                    "granted": budget.granted,
+                    "throttled": budget.throttled,
+                    "paused_seconds": round(max(0.0, budget.paused_until - now), 3),
+                }
+            waits = {name: {**stats, "wait_seconds": round(stats["wait_seconds"], 3),
+                            "max_wait_seconds": round(stats["max_wait_seconds"], 3)}
+                     for name, stats in self._wait_stats.items()}
+            return {"rpm": self.rpm, "tpm": self.tpm, "models": models, "priorities": waits}
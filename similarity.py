@@ -0,0 +1,107 @@
+import re
+import zlib
+
+import numpy as np
+
+# Modulus of the MinHash permutations: a Mersenne prime larger than any
+# CRC32 token hash, small enough that a * x + b fits in 64 bits
+MINHASH_PRIME = (1 << 31) - 1
+
+# Leading list marker of a point ("1.", "2)", "•", "-")
+LIST_MARKER = re.compile(r'^\s*(?:\d+[.)]|[•\-*])\s*')
+
+
+class NearDuplicateIndex:
+    """Index of short texts that detects near-duplicates in near-linear time.
+
+    Texts are compared as sets of lowercase words, so reordered or shifted
+    wording still matches. Each text gets a MinHash signature; locality
+    sensitive hashing over bands of the signature finds the few previously
+    added texts that may be similar, and only those are compared exactly
+    (Jaccard similarity of the word sets).
+    """
+
+    def __init__(self, threshold=0.7, num_perm=64, bands=16, seed=1):
+        """Initialize the index.
+
+        Args:
+            threshold (float): Jaccard similarity of the word sets at or above
+                               which two texts are duplicates
+            num_perm (int): Number of MinHash permutations
+            bands (int): Number of LSH bands; must divide num_perm. More bands
+                         find lower-similarity candidates at a higher cost.
+            seed (int): Seed of the permutations, fixed so results are reproducible
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MINHASH_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, MINHASH_PRIME, size=(num_perm, 1)).astype(np.uint64)
+        self._buckets = [{} for _ in range(bands)]
+        self._token_sets = []
+        self._exact = set()
+
+    def tokens(self, text):
+        """Split a text into its set of normalized words.
+
+        List markers are dropped, then the text is lowercased and reduced to
+        letters, digits and spaces.
+
+        Args:
+            text (str): Text to tokenize
+
+        Returns:
+            frozenset: The words of the text
+        """
+        text = LIST_MARKER.sub('', text)
+        simplified = ''.join(c.lower() if c.isalnum() else ' ' for c in text)
+        return frozenset(simplified.split())
+
+    def _signature(self, tokens):
+        """Compute the MinHash signature of a word set."""
+        hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens), dtype=np.uint64,
+                             count=len(tokens))
+        return ((self._a * hashes + self._b) % MINHASH_PRIME).min(axis=1)
+
+    def _band_keys(self, signature):
+        """Split a signature into one hashable key per LSH band."""
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, text):
+        """Add a text unless it is a near-duplicate of a text already added.
+
+        Args:
+            text (str): Text to add
+
+        Returns:
+            bool: True if the text was added, False if it is a duplicate.
+                  Texts without any words are always added.
+        """
+        tokens = self.tokens(text)
+        if not tokens:
+            return True
+        if tokens in self._exact:
+            return False
+
+        band_keys = self._band_keys(self._signature(tokens))
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for candidate in candidates:
+            other = self._token_sets[candidate]
+            if len(tokens & other) / len(tokens | other) >= self.threshold:
+                return False
+
+        index = len(self._token_sets)
+        self._token_sets.append(tokens)
+        self._exact.add(tokens)
+        for band, key in enumerate(band_keys):
+            self._buckets[band].setdefault(key, []).append(index)
+        return True
+
+    def __len__(self):
+        return len(self._token_sets)
@@ -0,0 +1,118 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Readiness states reported by the API
+STARTUP_UP = "up"           # Serving requests; backends load on first use
+STARTUP_WARMING = "warming" # Backends are being loaded in the background
+STARTUP_WARMED = "warmed"   # Backends loaded; requests pay no start-up cost
+STARTUP_FAILED = "failed"   # Warm-up raised; backends load on first use
+
+
+class StartupProfile:
+    """Records how long each start-up step takes and whether the backends are warmed.
+
+    Steps are timed from the creation of the profile, which should happen
+    as early as possible during the application import.
+    """
+
+    def __init__(self):
+        """Initialize the profile and start its clock."""
+        self.started = time.perf_counter()
+        self.state = STARTUP_UP
+        self.error = None
+        self.steps = []
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Record a step covering the time since the previous step finished.
+
+        Args:
+            name (str): Step name shown in the report
+        """
+        now = time.perf_counter()
+        with self._lock:
+            previous = self.steps[-1]["finished_at"] if self.steps else 0.0
+            self.steps.append({
+                "step": name,
+                "seconds": round(now - self.started - previous, 4),
+                "finished_at": round(now - self.started, 4),
+            })
+
+    @contextmanager
+    def step(self, name):
+        """Time a block of start-up work.
+
+        Args:
+            name (str): Step name shown in the report
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.steps.append({
+                    "step": name,
+                    "seconds": round(time.perf_counter() - started, 4),
+                    "finished_at": round(time.perf_counter() - self.started, 4),
+                })
+
+    def warm_up(self, steps):
+        """Run warm-up steps in a background thread.
+
+        Args:
+            steps (list): (name, callable) pairs run in order
+
+        Returns:
+            threading.Thread: The started thread
+        """
+        def run():
+            try:
+                for name, function in steps:
+                    with self.step(name):
+                        function()
+                self.state = STARTUP_WARMED
+            except Exception as e:
+                print(f"Warning: warm-up failed, backends will load on first use: {e}")
+                self.error = str(e)
+                self.state = STARTUP_FAILED
+            print(f"Startup profile: {self.report()}")
+
+        # Set before the thread starts, so readiness never reports the gap in between as ready
+        self.state = STARTUP_WARMING
+        thread = threading.Thread(target=run, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def warmed(self):
+        """bool: Whether the backends have been loaded."""
+        return self.state == STARTUP_WARMED
+
+    @property
+    def ready(self):
+        """bool: Whether no warm-up is in progress; without one, backends load on first use."""
+        return self.state != STARTUP_WARMING
+
+    def loaded_on_first_use(self):
+        """Record that requests loaded the backends, when warm-up was disabled or failed."""
+        with self._lock:
+            if self.state in (STARTUP_UP, STARTUP_FAILED):
+                self.state = STARTUP_WARMED
+
+    def report(self):
+        """Report the start-up state and step timings.
+
+        Returns:
+            dict: State, seconds since the profile started, warm-up error if
+                  any, and each step's duration and finish time
+        """
+        with self._lock:
+            report = {
+                "status": self.state,
+                "uptime_seconds": round(time.perf_counter() - self.started, 3),
+                "steps": list(self.steps),
+            }
+        if self.error:
+            report["error"] = self.error
+        return report
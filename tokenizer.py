@@ -0,0 +1,189 @@
+import math
+import re
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # Optional; token counts are estimated without it
+    tiktoken = None
+
+# Context window of the chat models the analyzer is used with, in tokens
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4.1": 1047576,
+    "gpt-4.1-mini": 1047576,
+    "gpt-4.1-nano": 1047576,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_TOKENS = 128000
+
+# Encoding used when tiktoken does not know the model
+FALLBACK_ENCODING = "o200k_base"
+
+# Characters per token assumed without tiktoken. Slightly below what
+# o200k_base averages on Portuguese and English prose, so estimates err high.
+ESTIMATED_CHARS_PER_TOKEN = 3.5
+
+# Sentence boundaries: end punctuation (plus closing quotes or brackets)
+# followed by whitespace, or a line break
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])["\')\]]*\s+|\n+')
+# A word and the whitespace after it
+WORD = re.compile(r'\S+\s*')
+# Sentences longer than a whole chunk are packed in runs of words of at most this many tokens
+WORD_RUN_TOKENS = 32
+
+
+class TokenCounter:
+    """Counts model tokens with tiktoken, or estimates them when it is unavailable.
+
+    The encoding is loaded on first use: tiktoken downloads it unless it is
+    in TIKTOKEN_CACHE_DIR, which would otherwise slow down every start.
+    """
+
+    def __init__(self, model_id):
+        """Initialize the counter.
+
+        Args:
+            model_id (str): Model whose tokenizer is used
+        """
+        self.model_id = model_id
+        self._encoding = None
+        self._loaded = tiktoken is None
+        self._lock = threading.Lock()
+
+    def _get_encoding(self):
+        """The tiktoken encoding, loaded on first call, or None to estimate."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        try:
+                            self._encoding = tiktoken.encoding_for_model(self.model_id)
+                        except KeyError:
+                            self._encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+                    except Exception as e:
+                        # The encoding files could not be loaded (e.g. no network access)
+                        print(f"Warning: tiktoken unavailable for {self.model_id}, estimating token counts: {e}")
+                    self._loaded = True
+        return self._encoding
+
+    def warm_up(self):
+        """Load the encoding ahead of the first count."""
+        self._get_encoding()
+
+    @property
+    def name(self):
+        """str: The tokenizer in use, e.g. "tiktoken:o200k_base" or "estimate"."""
+        encoding = self._get_encoding()
+        return f"tiktoken:{encoding.name}" if encoding else "estimate"
+
+    def count(self, text):
+        """Count the tokens of a text.
+
+        Args:
+            text (str): Text to count
+
+        Returns:
+            int: Number of tokens
+        """
+        return self.count_many([text])[0]
+
+    def count_many(self, texts):
+        """Count the tokens of several texts.
+
+        Args:
+            texts (list): Texts to count
+
+        Returns:
+            list: Number of tokens of each text
+        """
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return [len(tokens) for tokens in encoding.encode_ordinary_batch(list(texts))]
+        return [math.ceil(len(text) / ESTIMATED_CHARS_PER_TOKEN) for text in texts]
+
+
+def context_tokens(model_id):
+    """Context window of a model in tokens, or DEFAULT_CONTEXT_TOKENS if unknown."""
+    for name in sorted(MODEL_CONTEXT_TOKENS, key=len, reverse=True):
+        if model_id == name or model_id.startswith(name + "-"):
+            return MODEL_CONTEXT_TOKENS[name]
+    return DEFAULT_CONTEXT_TOKENS
+
+
+def sentence_spans(text):
+    """Split a text into sentences.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: (start, end) offsets of each sentence including its trailing
+              whitespace, covering the whole text in order
+    """
+    spans = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        if match.end() > start:
+            spans.append((start, match.end()))
+            start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def pack_spans(text, counter, max_tokens, overlap_tokens):
+    """Group the sentences of a text into chunks that fit a token budget.
+
+    Sentences are packed greedily until the next one would exceed
+    ``max_tokens``. Each chunk after the first starts with the last whole
+    sentences of the previous chunk, up to ``overlap_tokens``. A sentence
+    longer than the budget (e.g. unpunctuated speech) is packed as short
+    runs of words instead.
+
+    Args:
+        text (str): Text to split
+        counter (TokenCounter): Token counter for the model
+        max_tokens (int): Maximum tokens per chunk
+        overlap_tokens (int): Maximum tokens repeated from the previous chunk
+
+    Returns:
+        list: (start, end, tokens) of each chunk
+    """
+    pieces = []
+    spans = sentence_spans(text)
+    for (start, end), tokens in zip(spans, counter.count_many([text[s:e] for s, e in spans])):
+        if tokens <= max_tokens:
+            pieces.append((start, end, tokens))
+            continue
+        words = [(start + m.start(), start + m.end()) for m in WORD.finditer(text[start:end])]
+        for (word_start, word_end), word_tokens in zip(words, counter.count_many([text[s:e] for s, e in words])):
+            if pieces and pieces[-1][1] == word_start and pieces[-1][0] >= start \
+                    and pieces[-1][2] + word_tokens <= min(max_tokens, WORD_RUN_TOKENS):
+                pieces[-1] = (pieces[-1][0], word_end, pieces[-1][2] + word_tokens)
+            else:
+                pieces.append((word_start, word_end, word_tokens))
+
+    chunks = []
+    first = 0
+    while first < len(pieces):
+        last = first
+        total = pieces[first][2]
+        while last + 1 < len(pieces) and total + pieces[last + 1][2] <= max_tokens:
+            last += 1
+            total += pieces[last][2]
+        chunks.append((pieces[first][0], pieces[last][1], total))
+        if last + 1 >= len(pieces):
+            break
+
+        # Start the next chunk with the tail of this one
+        next_first = last + 1
+        overlap = 0
+        while next_first - 1 > first and overlap + pieces[next_first - 1][2] <= overlap_tokens:
+            next_first -= 1
+            overlap += pieces[next_first][2]
+        first = next_first
+    return chunks
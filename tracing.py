@@ -0,0 +1,318 @@
+import contextvars
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+# Span-based tracing of the pipeline. A span times one operation (a request,
+# a job stage, a transcription chunk, an analysis call) and records its
+# attributes; spans started inside it are its children and share its trace
+# id. The current span follows asyncio tasks, and threads started with
+# ``contextvars.copy_context().run``. Finished spans are handed to an
+# exporter on a background thread, so tracing adds a few microseconds per
+# span to the traced code.
+
+# W3C trace context header: version-trace id-parent span id-flags
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+# Span statuses
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation of a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes",
+                 "status", "error")
+
+    def __init__(self, name, trace_id, parent_id=None, attributes=None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.error = None
+
+    def set(self, key, value):
+        """Set an attribute of the span."""
+        self.attributes[key] = value
+
+    def add(self, key, amount=1):
+        """Add to a numeric attribute of the span, starting from 0."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    @property
+    def traceparent(self):
+        """str: W3C traceparent header value continuing this span's trace."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self):
+        """Serialize the finished span.
+
+        Returns:
+            dict: Ids, name, start and end (seconds since the epoch), duration,
+                  status, error and attributes
+        """
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_ns / 1e9,
+            "end_time": self.end_ns / 1e9,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoSpan:
+    """Stand-in returned by current_span() outside any span; attributes are dropped."""
+
+    trace_id = None
+    span_id = None
+
+    def set(self, key, value):
+        pass
+
+    def add(self, key, amount=1):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class JSONLExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path):
+        """Initialize the exporter.
+
+        Args:
+            path (str): File the spans are appended to; its directory is created
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+
+
+class OTLPExporter:
+    """Sends finished spans to an OpenTelemetry collector with OTLP over HTTP (JSON encoding)."""
+
+    def __init__(self, endpoint, service_name="meeting-analysis-api", headers=None, timeout=10.0):
+        """Initialize the exporter.
+
+        Args:
+            endpoint (str): Collector base URL (e.g. http://localhost:4318);
+                            spans are posted to its /v1/traces path
+            service_name (str): service.name resource attribute
+            headers (dict): Extra request headers, e.g. for authentication
+            timeout (float): Seconds to wait for the collector
+        """
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else endpoint + "/v1/traces"
+        self.service_name = service_name
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _span(self, span):
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # Internal
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": self._value(value)} for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error or ""} if span.status == STATUS_ERROR else {"code": 1},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+    def export(self, spans):
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [self._span(span) for span in spans]}],
+        }]}
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode("utf-8"),
+                                         headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Tracer:
+    """Creates spans and exports the finished ones in batches from a background thread.
+
+    Without an exporter spans are still created, so trace ids can be
+    returned to clients, but they are discarded when they end.
+    """
+
+    def __init__(self, exporter=None, max_queue_size=10000, batch_size=512, flush_interval=2.0):
+        """Initialize the tracer.
+
+        Args:
+            exporter: Object with an ``export(spans)`` method (JSONLExporter,
+                      OTLPExporter), or None to discard spans
+            max_queue_size (int): Finished spans buffered for export; spans
+                                  beyond it are dropped and counted
+            batch_size (int): Spans exported per call
+            flush_interval (float): Seconds between exports of a partial batch
+        """
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._counters = {"exported": 0, "dropped": 0, "export_errors": 0}
+
+    @contextmanager
+    def span(self, name, attributes=None, traceparent=None):
+        """Time a block as a span, child of the current span.
+
+        Args:
+            name (str): Span name
+            attributes (dict): Initial attributes
+            traceparent (str): W3C traceparent header of the caller; starts
+                               the span in the caller's trace when there is
+                               no current span
+
+        Yields:
+            Span: The span, current inside the block
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id, attributes)
+        else:
+            match = TRACEPARENT_PATTERN.match(traceparent or "")
+            if match and match.group(1) != "0" * 32:
+                span = Span(name, match.group(1), match.group(2), attributes)
+            else:
+                span = Span(name, secrets.token_hex(16), None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = STATUS_ERROR
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span)
+
+    def _finish(self, span):
+        if self.exporter is None:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            with self._lock:
+                self._counters["dropped"] += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+                    self._thread.start()
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def _export_loop(self):
+        """Export the buffered spans every flush_interval, or sooner once a batch is full."""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _export(self, batch):
+        try:
+            self.exporter.export(batch)
+            with self._lock:
+                self._counters["exported"] += len(batch)
+        except Exception as e:
+            with self._lock:
+                self._counters["export_errors"] += 1
+                self._counters["dropped"] += len(batch)
+            print(f"Error exporting {len(batch)} span(s): {e}")
+
+    def flush(self):
+        """Export the spans buffered so far, in batches, from the calling thread."""
+        # One flush at a time, so a returning flush has seen every span buffered before it
+        with self._export_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                self._export(batch)
+
+    def stats(self):
+        """Report spans exported, dropped and failed exports."""
+        with self._lock:
+            return {**self._counters, "queued": self._queue.qsize(),
+                    "exporter": type(self.exporter).__name__ if self.exporter else None}
+
+
+# Process-wide tracer the pipeline modules record spans with; see configure()
+TRACER = Tracer()
+
+
+def configure(exporter, **kwargs):
+    """Replace the process-wide tracer with one exporting to ``exporter``.
+
+    Args:
+        exporter: Span exporter, or None to discard spans
+        **kwargs: Other Tracer arguments
+
+    Returns:
+        Tracer: The new tracer
+    """
+    global TRACER
+    TRACER = Tracer(exporter, **kwargs)
+    return TRACER
+
+
+def span(name, attributes=None, traceparent=None):
+    """Time a block as a span of the process-wide tracer (see Tracer.span)."""
+    return TRACER.span(name, attributes, traceparent)
+
+
+def current_span():
+    """The span of the current context, or a stand-in ignoring attributes outside any span."""
+    return _current_span.get() or NO_SPAN
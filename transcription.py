@@ -1,31 +1,147 @@
 import os
 import tempfile
+import contextvars
 import math
+import resource
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import ffmpeg
-from pydub import AudioSegment
-import speech_recognition as sr
-from openai import OpenAI
+import numpy as np
 from dotenv import load_dotenv
 
+from metrics import Counter, Histogram, ERRORS
+from outbound import OutboundHTTP
+from tracing import span, current_span
+from vad import EnergyVAD, SAMPLE_RATE, BYTES_PER_SAMPLE, FRAME_SECONDS, FRAME_SAMPLES
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Size of 16 kHz, 16-bit mono PCM WAV output
+WAV_BYTES_PER_SECOND = 16000 * 2
+WAV_HEADER_BYTES = 44
+# Fraction of max_chunk_size targeted per chunk, leaving room for packet rounding
+CHUNK_SIZE_MARGIN = 0.98
+# Stretch of compressed segments so encoder padding does not create a tiny trailing chunk
+SEGMENT_TIME_PADDING = 1.01
+# Re-splits allowed when a variable bitrate chunk overshoots max_chunk_size
+MAX_SEGMENT_ATTEMPTS = 4
+# Bytes moved per read/write when streaming decoded PCM
+PCM_BLOCK_BYTES = FRAME_SAMPLES * BYTES_PER_SAMPLE * 1000
+
+# Output formats for transcription chunks (all accepted by the Whisper API).
+# Lossy bitrates are tuned for 16 kHz mono speech.
+CHUNK_CODECS = {
+    "wav": {"extension": "wav", "acodec": "pcm_s16le", "bitrate": None},
+    "flac": {"extension": "flac", "acodec": "flac", "bitrate": None},
+    "mp3": {"extension": "mp3", "acodec": "libmp3lame", "bitrate": "32k"},
+    "opus": {"extension": "ogg", "acodec": "libopus", "bitrate": "24k"},
+}
+
+TRANSCRIPTION_STEP_SECONDS = Histogram("transcription_step_duration_seconds",
+                                       "Duration of audio preparation steps", ["step"])
+TRANSCRIPTION_CHUNK_SECONDS = Histogram("transcription_chunk_duration_seconds",
+                                        "Duration of the transcription of one audio chunk, retries included",
+                                        ["backend"])
+TRANSCRIPTION_CHUNKS = Counter("transcription_chunks", "Audio chunks transcribed, by backend and result",
+                               ["backend", "result"])
+TRANSCRIPTION_AUDIO_SECONDS = Counter("transcription_audio_seconds", "Seconds of audio prepared for transcription")
+
 class AudioTranscriber:
     """Handles transcription of audio files using different methods."""
     
-    def __init__(self, use_openai=True, max_chunk_size_mb=24):
+    def __init__(self, use_openai=True, max_chunk_size_mb=24, max_concurrent_chunks=4,
+                 model="whisper-1", language="pt", chunk_codec="wav", chunk_bitrate=None,
+                 trim_silence=False, min_silence_seconds=1.0, outbound=None, hedger=None):
         """Initialize the transcriber.
         
         Args:
             use_openai (bool): Whether to use OpenAI's Whisper API (True) 
                               or local speech recognition (False)
             max_chunk_size_mb (int): Maximum size in MB for audio chunks when using OpenAI
+            max_concurrent_chunks (int): Maximum number of chunks uploaded to OpenAI
+                                         at the same time (1 disables parallel uploads)
+            model (str): OpenAI transcription model
+            language (str): ISO-639-1 language of the audio
+            chunk_codec (str): Format of the transcription chunks, one of
+                               CHUNK_CODECS ("wav", "flac", "mp3", "opus").
+                               Local speech recognition always uses "wav".
+            chunk_bitrate (str): Bitrate for lossy codecs (e.g. "24k"); defaults
+                                 to the codec's speech bitrate in CHUNK_CODECS
+            trim_silence (bool): Whether to drop long pauses with voice activity
+                                 detection and cut chunks inside pauses
+            min_silence_seconds (float): Shortest pause removed when trim_silence is set
+            outbound (OutboundHTTP): Shared HTTP clients with connection pooling
+                                     and retries for OpenAI calls; a new one
+                                     by default
+            hedger (Hedger): If set, chunk uploads slower than its latency
+                             percentile (per MB of audio) are sent again and
+                             the first transcript back is used
         """
+        if chunk_codec not in CHUNK_CODECS:
+            raise ValueError(f"Unknown chunk codec: {chunk_codec}")
         self.use_openai = use_openai
+        self.chunk_codec = chunk_codec if use_openai else "wav"
+        self.chunk_bitrate = chunk_bitrate or CHUNK_CODECS[self.chunk_codec]["bitrate"]
+        self.trim_silence = trim_silence
+        self.vad = EnergyVAD(min_silence_seconds=min_silence_seconds)
+        self.model = model
+        self.language = language
+        self.max_concurrent_chunks = max(1, max_concurrent_chunks)
         # Convert MB to bytes, keeping slightly under the limit for safety
         self.max_chunk_size = max_chunk_size_mb * 1024 * 1024
-        if use_openai:
-            self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Backends are imported and created on first use, so importing this
+        # module stays cheap; the local recognizer is never loaded with use_openai
+        self.outbound = outbound if outbound is not None else OutboundHTTP()
+        self.hedger = hedger
+        self._client = None
+        self._client_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """OpenAI: The API client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    # Retries happen in the shared transport, honoring Retry-After
+                    self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                                          http_client=self.outbound.client(), max_retries=0)
+        return self._client
+    
+    @property
+    def loaded(self):
+        """bool: Whether the transcription backend has been loaded, by warm_up or a first request."""
+        if self.use_openai:
+            return self._client is not None
+        return "speech_recognition" in sys.modules
+    
+    def warm_up(self):
+        """Load the transcription backend ahead of the first request."""
+        if self.use_openai:
+            self.client
+        else:
+            import speech_recognition  # noqa: F401
+    
+    def cache_key(self, audio_hash):
+        """Build the transcript cache key for an audio file.
+        
+        Args:
+            audio_hash (str): SHA-256 hex digest of the original audio file
+            
+        Returns:
+            str: Key combining the audio hash, transcription backend, language
+                 and silence trimming setting
+        """
+        backend = self.model if self.use_openai else "speech_recognition"
+        key = f"{audio_hash}:{backend}:{self.language}"
+        # Trimmed audio can transcribe slightly differently
+        if self.trim_silence:
+            key += f":vad{self.vad.min_silence_seconds}"
+        return key
     
     def convert_to_wav(self, audio_file_path):
         """Convert audio file to WAV format for compatibility using ffmpeg.
@@ -127,62 +243,475 @@ class AudioTranscriber:
         
         return chunk_paths
     
-    def transcribe_with_openai(self, audio_file_path):
-        """Transcribe audio using OpenAI's Whisper API.
+    def _cleanup_chunks(self, chunk_paths, audio_file_path):
+        """Remove chunk files created by split_audio or prepare_chunks and their temp directory.
+        
+        Args:
+            chunk_paths (list): Paths returned by split_audio or prepare_chunks
+            audio_file_path (str): Path to the original audio file, which is kept
+        """
+        chunk_dirs = {os.path.dirname(path) for path in chunk_paths if path != audio_file_path}
+        for chunk_dir in chunk_dirs:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+    
+    def _transcribe_chunk_with_openai(self, chunk_path):
+        """Send a single audio file to OpenAI's Whisper API.
+        
+        Args:
+            chunk_path (str): Path to the audio chunk
+            
+        Returns:
+            str: Transcribed text of the chunk
+        """
+        attributes = {"chunk": os.path.basename(chunk_path), "chunk.bytes": os.path.getsize(chunk_path),
+                      "model": self.model}
+        started = time.perf_counter()
+        try:
+            with span("transcribe_chunk", attributes) as chunk_span, open(chunk_path, "rb") as audio_file:
+                response = self.client.audio.transcriptions.create(
+                    model=self.model,
+                    file=audio_file,
+                    language=self.language
+                )
+                chunk_span.set("transcript.chars", len(response.text))
+        except Exception as e:
+            TRANSCRIPTION_CHUNKS.inc("openai", "error")
+            ERRORS.inc("transcription", type(e).__name__)
+            raise
+        finally:
+            TRANSCRIPTION_CHUNK_SECONDS.observe(time.perf_counter() - started, "openai")
+        TRANSCRIPTION_CHUNKS.inc("openai", "ok")
+        return response.text
+    
+    async def _atranscribe_chunk_with_openai(self, chunk_path, audio):
+        """Send a single audio file to OpenAI's Whisper API from an event loop.
+        
+        Cancelling the call aborts its HTTP request.
+        
+        Args:
+            chunk_path (str): Path to the audio chunk
+            audio (bytes): Content of the chunk, read beforehand so the event loop does not block on disk
+            
+        Returns:
+            str: Transcribed text of the chunk
+        """
+        from openai import AsyncOpenAI
+        
+        attributes = {"chunk": os.path.basename(chunk_path), "chunk.bytes": len(audio), "model": self.model}
+        started = time.perf_counter()
+        try:
+            with span("transcribe_chunk", attributes) as chunk_span:
+                client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                                     http_client=self.outbound.async_client(), max_retries=0)
+                response = await client.audio.transcriptions.create(
+                    model=self.model,
+                    file=(os.path.basename(chunk_path), audio),
+                    language=self.language
+                )
+                chunk_span.set("transcript.chars", len(response.text))
+        except Exception as e:
+            TRANSCRIPTION_CHUNKS.inc("openai", "error")
+            ERRORS.inc("transcription", type(e).__name__)
+            raise
+        finally:
+            TRANSCRIPTION_CHUNK_SECONDS.observe(time.perf_counter() - started, "openai")
+        TRANSCRIPTION_CHUNKS.inc("openai", "ok")
+        return response.text
+    
+    def _transcribe_chunk_hedged(self, chunk_path):
+        """Transcribe a chunk, hedging a slow upload when a hedger is configured.
+        
+        Hedged uploads run on the outbound layer's event loop, so the slower
+        of the two is aborted instead of running on unobserved.
+        
+        Args:
+            chunk_path (str): Path to the audio chunk
+            
+        Returns:
+            str: Transcribed text of the chunk
+        """
+        if self.hedger is None:
+            return self._transcribe_chunk_with_openai(chunk_path)
+        with open(chunk_path, "rb") as audio_file:
+            audio = audio_file.read()
+        # Latency grows with the audio sent; chunks under 1 MB are dominated by fixed overhead
+        size_mb = max(1.0, len(audio) / (1024 * 1024))
+        return self.outbound.run_sync(self.hedger.acall(
+            lambda: self._atranscribe_chunk_with_openai(chunk_path, audio), key=self.model, size=size_mb
+        ))
+    
+    def _transcribe_chunks_concurrently(self, chunk_paths, on_chunk=None):
+        """Transcribe chunks in parallel, keeping their original order.
+        
+        A failing chunk does not cancel the others; failures are reported
+        once every chunk has finished. Retries of failed requests happen in
+        the outbound layer.
+        
+        Args:
+            chunk_paths (list): Paths to the audio chunks
+            on_chunk (callable): Optional callback receiving (index, total, text)
+                                 as each chunk finishes, in completion order
+            
+        Returns:
+            list: Transcribed text of each chunk, in the order of chunk_paths
+        """
+        total = len(chunk_paths)
+        transcripts = [None] * total
+        errors = {}
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_chunks, total)) as executor:
+            # Each chunk runs in a copy of the caller's context, keeping its outbound call job and priority
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._transcribe_chunk_hedged, chunk_path): i
+                for i, chunk_path in enumerate(chunk_paths)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    transcripts[i] = future.result()
+                    print(f"Transcribed chunk {i+1}/{total}")
+                    if on_chunk:
+                        on_chunk(i, total, transcripts[i])
+                except Exception as e:
+                    print(f"Error transcribing chunk {i+1}/{total}: {e}")
+                    errors[i] = e
+        
+        if errors:
+            failed = ", ".join(str(i + 1) for i in sorted(errors))
+            first_error = errors[min(errors)]
+            raise Exception(f"Failed to transcribe chunk(s) {failed} of {total}: {first_error}")
+        
+        return transcripts
+    
+    def _chunk_output_args(self):
+        """ffmpeg output arguments for the configured chunk codec (16 kHz mono)."""
+        args = {"acodec": CHUNK_CODECS[self.chunk_codec]["acodec"], "ac": 1, "ar": "16k"}
+        if CHUNK_CODECS[self.chunk_codec]["bitrate"]:
+            args["audio_bitrate"] = self.chunk_bitrate
+        return args
+    
+    def _segment_encoded(self, encoded_path, temp_dir, extension, duration, chunks_needed):
+        """Cut an encoded file into chunks under max_chunk_size with a stream copy.
+        
+        Variable bitrate codecs can overshoot the estimate, so the cut is
+        repeated with more chunks until every chunk fits.
+        
+        Args:
+            encoded_path (str): Path to the encoded audio
+            temp_dir (str): Directory receiving the chunks
+            extension (str): File extension of the codec
+            duration (float): Duration of the audio in seconds
+            chunks_needed (int): Initial number of chunks
+        """
+        for _ in range(MAX_SEGMENT_ATTEMPTS):
+            # Slightly longer segments so encoder padding does not spill into a tiny extra chunk
+            segment_time = duration / chunks_needed * SEGMENT_TIME_PADDING
+            (
+                ffmpeg
+                .input(encoded_path)
+                .output(
+                    os.path.join(temp_dir, f"chunk_%03d.{extension}"),
+                    acodec='copy', f='segment', segment_time=segment_time, reset_timestamps=1
+                )
+                .run(quiet=True, overwrite_output=True)
+            )
+            chunk_paths = [os.path.join(temp_dir, name) for name in os.listdir(temp_dir) if name.startswith("chunk_")]
+            largest = max(os.path.getsize(path) for path in chunk_paths)
+            if largest <= self.max_chunk_size:
+                return
+            for path in chunk_paths:
+                os.unlink(path)
+            chunks_needed = math.ceil(chunks_needed * largest / (self.max_chunk_size * CHUNK_SIZE_MARGIN))
+        raise Exception(f"Could not split audio into chunks under {self.max_chunk_size} bytes")
+    
+    def prepare_chunks(self, audio_file_path, stats=None):
+        """Decode an audio file once and produce the transcription chunks.
+        
+        The input is probed once and decoded by a single ffmpeg invocation.
+        For WAV chunks the size is known from the PCM bitrate, so that run
+        uses the segment muxer to write the size-bounded chunks directly.
+        For compressed codecs the audio is encoded once to a single file; its
+        actual encoded bitrate then sizes the chunks, and if it exceeds
+        max_chunk_size it is cut with a stream copy (no decoding or
+        re-encoding). This replaces convert_to_wav followed by split_audio,
+        which wrote the full WAV and then re-read it once per chunk.
+        
+        With trim_silence set, see _prepare_chunks_with_vad instead.
+        
+        Args:
+            audio_file_path (str): Path to the audio file (any format ffmpeg reads)
+            stats (dict): Optional dict filled with the audio duration, chunk
+                          count and, when trimming, the removed silence and
+                          the number of speech segments kept
+            
+        Returns:
+            list: Paths to the chunks, in order, inside a new temporary directory
+        """
+        if stats is None:
+            stats = {}
+        if self.trim_silence:
+            return self._prepare_chunks_with_vad(audio_file_path, stats)
+        
+        # Probe once; the duration drives the chunk sizing
+        try:
+            with TRANSCRIPTION_STEP_SECONDS.time("probe"):
+                probe = ffmpeg.probe(audio_file_path)
+            duration = float(probe['format'].get('duration') or probe['streams'][0]['duration'])
+        except Exception as e:
+            raise Exception(f"Error getting audio duration: {e}")
+        
+        extension = CHUNK_CODECS[self.chunk_codec]["extension"]
+        temp_dir = tempfile.mkdtemp()
+        started = time.time()
+        cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        try:
+            if self.chunk_codec == "wav":
+                # 16 kHz, 16-bit mono PCM; keep a small margin for packet boundaries
+                estimated_size = duration * WAV_BYTES_PER_SECOND + WAV_HEADER_BYTES
+                chunks_needed = max(1, math.ceil(estimated_size / (self.max_chunk_size * CHUNK_SIZE_MARGIN)))
+                stream = ffmpeg.input(audio_file_path)
+                if chunks_needed == 1:
+                    stream = stream.output(os.path.join(temp_dir, f"chunk_000.{extension}"), **self._chunk_output_args())
+                else:
+                    stream = stream.output(
+                        os.path.join(temp_dir, f"chunk_%03d.{extension}"),
+                        f='segment', segment_time=duration / chunks_needed, reset_timestamps=1,
+                        **self._chunk_output_args()
+                    )
+                with TRANSCRIPTION_STEP_SECONDS.time("encode"):
+                    stream.run(quiet=True, overwrite_output=True)
+            else:
+                # Encode once, then size the chunks from the actual encoded bitrate
+                encoded_path = os.path.join(temp_dir, f"encoded.{extension}")
+                with TRANSCRIPTION_STEP_SECONDS.time("encode"):
+                    (
+                        ffmpeg
+                        .input(audio_file_path)
+                        .output(encoded_path, **self._chunk_output_args())
+                        .run(quiet=True, overwrite_output=True)
+                    )
+                encoded_size = os.path.getsize(encoded_path)
+                chunks_needed = max(1, math.ceil(encoded_size / (self.max_chunk_size * CHUNK_SIZE_MARGIN)))
+                if chunks_needed == 1:
+                    os.rename(encoded_path, os.path.join(temp_dir, f"chunk_000.{extension}"))
+                else:
+                    with TRANSCRIPTION_STEP_SECONDS.time("segment"):
+                        self._segment_encoded(encoded_path, temp_dir, extension, duration, chunks_needed)
+                    os.unlink(encoded_path)
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise Exception(f"Error preparing audio chunks with ffmpeg: {e}")
+        
+        chunk_paths = sorted(os.path.join(temp_dir, name) for name in os.listdir(temp_dir))
+        cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu_time = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+        chunks_mb = sum(os.path.getsize(path) for path in chunk_paths) / (1024 * 1024)
+        print(f"Prepared {len(chunk_paths)} {self.chunk_codec} chunk(s) from {duration:.0f}s of audio "
+              f"in {time.time() - started:.1f}s (ffmpeg CPU {cpu_time:.1f}s, {chunks_mb:.1f} MB)")
+        stats["audio_seconds"] = duration
+        TRANSCRIPTION_AUDIO_SECONDS.inc(amount=duration)
+        current_span().set("audio_seconds", round(duration, 3))
+        current_span().set("chunks", len(chunk_paths))
+        current_span().set("chunks.bytes", round(chunks_mb * 1024 * 1024))
+        stats["chunks"] = len(chunk_paths)
+        return chunk_paths
+    
+    def _chunk_bytes_per_second(self):
+        """Upper estimate of the encoded size per second of the chunk codec."""
+        if CHUNK_CODECS[self.chunk_codec]["bitrate"]:
+            bitrate = str(self.chunk_bitrate).lower()
+            bits = float(bitrate[:-1]) * 1000 if bitrate.endswith("k") else float(bitrate)
+            return bits / 8
+        # Lossless FLAC stays below raw PCM
+        return WAV_BYTES_PER_SECOND
+    
+    def _decode_with_energies(self, audio_file_path, raw_path):
+        """Decode audio to raw 16 kHz mono PCM on disk, measuring frame levels on the way.
         
         Args:
             audio_file_path (str): Path to the audio file
+            raw_path (str): Path receiving the raw PCM samples
             
         Returns:
-            str: Transcribed text
+            numpy.ndarray: Level of each frame in dBFS
+        """
+        process = (
+            ffmpeg
+            .input(audio_file_path)
+            .output('pipe:', format='s16le', acodec='pcm_s16le', ac=1, ar='16k')
+            .global_args('-loglevel', 'error')
+            .run_async(pipe_stdout=True)
+        )
+        energies = []
+        pending = b""
+        with open(raw_path, "wb") as raw:
+            while True:
+                data = process.stdout.read(PCM_BLOCK_BYTES)
+                if not data:
+                    break
+                raw.write(data)
+                pending += data
+                usable = len(pending) - len(pending) % (FRAME_SAMPLES * BYTES_PER_SAMPLE)
+                if usable:
+                    energies.append(self.vad.frame_energies(np.frombuffer(pending[:usable], dtype=np.int16)))
+                    pending = pending[usable:]
+        if process.wait() != 0:
+            raise Exception("ffmpeg could not decode the audio")
+        return np.concatenate(energies) if energies else np.array([], dtype=np.float32)
+    
+    def _encode_trimmed(self, raw_path, plan, temp_dir):
+        """Encode the kept audio into chunks with a single ffmpeg invocation.
+        
+        The kept segments are streamed from the raw PCM file into ffmpeg,
+        which cuts a new chunk at each planned boundary.
+        
+        Args:
+            raw_path (str): Raw 16 kHz mono PCM of the whole recording
+            plan (list): Chunk plan from EnergyVAD.plan_chunks
+            temp_dir (str): Directory receiving the chunks
+            
+        Returns:
+            list: Paths to the chunks, in order
         """
+        extension = CHUNK_CODECS[self.chunk_codec]["extension"]
+        sample_ranges = [
+            [(int(round(start * SAMPLE_RATE)), int(round(end * SAMPLE_RATE))) for start, end in chunk]
+            for chunk in plan
+        ]
+        
+        # Chunk boundaries on the trimmed timeline
+        boundaries = []
+        kept_samples = 0
+        for ranges in sample_ranges[:-1]:
+            kept_samples += sum(end - start for start, end in ranges)
+            boundaries.append(f"{kept_samples / SAMPLE_RATE:.3f}")
+        
+        stream = ffmpeg.input('pipe:', format='s16le', ar='16k', ac=1)
+        if boundaries:
+            stream = stream.output(
+                os.path.join(temp_dir, f"chunk_%03d.{extension}"),
+                f='segment', segment_times=",".join(boundaries), reset_timestamps=1,
+                **self._chunk_output_args()
+            )
+        else:
+            stream = stream.output(os.path.join(temp_dir, f"chunk_000.{extension}"), **self._chunk_output_args())
+        process = stream.global_args('-loglevel', 'error').run_async(pipe_stdin=True, overwrite_output=True)
+        
         try:
-            # Check file size and split if necessary
-            chunk_paths = self.split_audio(audio_file_path)
+            with open(raw_path, "rb") as raw:
+                for ranges in sample_ranges:
+                    for start, end in ranges:
+                        raw.seek(start * BYTES_PER_SAMPLE)
+                        remaining = (end - start) * BYTES_PER_SAMPLE
+                        while remaining > 0:
+                            data = raw.read(min(PCM_BLOCK_BYTES, remaining))
+                            if not data:
+                                break
+                            process.stdin.write(data)
+                            remaining -= len(data)
+        finally:
+            process.stdin.close()
+        if process.wait() != 0:
+            raise Exception("ffmpeg could not encode the trimmed audio")
+        
+        return sorted(os.path.join(temp_dir, name) for name in os.listdir(temp_dir) if name.startswith("chunk_"))
+    
+    def _prepare_chunks_with_vad(self, audio_file_path, stats):
+        """Drop long silences and cut chunks inside pauses.
+        
+        The audio is decoded once to raw PCM while frame levels are measured.
+        Voice activity detection then selects the speech to keep and places
+        chunk boundaries in pauses, and a single ffmpeg run encodes only the
+        kept audio into chunks.
+        
+        Args:
+            audio_file_path (str): Path to the audio file
+            stats (dict): Filled with audio_seconds, removed_silence_seconds,
+                          chunks and speech_segments
+            
+        Returns:
+            list: Paths to the chunks, in order, inside a new temporary directory
+        """
+        temp_dir = tempfile.mkdtemp()
+        raw_path = os.path.join(temp_dir, "decoded.raw")
+        started = time.time()
+        try:
+            with TRANSCRIPTION_STEP_SECONDS.time("decode"), span("decode"):
+                energies = self._decode_with_energies(audio_file_path, raw_path)
+            segments = self.vad.speech_segments(energies)
+            original_seconds = len(energies) * FRAME_SECONDS
+            
+            plan = []
+            chunk_paths = []
+            max_chunk_seconds = self.max_chunk_size * CHUNK_SIZE_MARGIN / self._chunk_bytes_per_second()
+            for _ in range(MAX_SEGMENT_ATTEMPTS if segments else 0):
+                plan = self.vad.plan_chunks(segments, energies, max_chunk_seconds)
+                with TRANSCRIPTION_STEP_SECONDS.time("encode"), span("encode", {"chunks": len(plan)}):
+                    chunk_paths = self._encode_trimmed(raw_path, plan, temp_dir)
+                largest = max(os.path.getsize(path) for path in chunk_paths)
+                if largest <= self.max_chunk_size:
+                    break
+                # Variable bitrate overshoot: plan shorter chunks and encode again
+                for path in chunk_paths:
+                    os.unlink(path)
+                max_chunk_seconds *= self.max_chunk_size * CHUNK_SIZE_MARGIN / largest
+            else:
+                if segments:
+                    raise Exception(f"Could not split audio into chunks under {self.max_chunk_size} bytes")
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise Exception(f"Error preparing audio chunks with ffmpeg: {e}")
+        finally:
+            if os.path.exists(raw_path):
+                os.unlink(raw_path)
+        
+        kept_seconds = sum(end - start for start, end in segments)
+        stats["audio_seconds"] = original_seconds
+        TRANSCRIPTION_AUDIO_SECONDS.inc(amount=original_seconds)
+        current_span().set("audio_seconds", round(original_seconds, 3))
+        current_span().set("removed_silence_seconds", round(original_seconds - kept_seconds, 3))
+        current_span().set("chunks", len(chunk_paths))
+        stats["removed_silence_seconds"] = round(original_seconds - kept_seconds, 3)
+        stats["chunks"] = len(chunk_paths)
+        stats["speech_segments"] = sum(len(chunk_segments) for chunk_segments in plan)
+        print(f"Prepared {len(chunk_paths)} {self.chunk_codec} chunk(s) from {original_seconds:.0f}s of audio "
+              f"in {time.time() - started:.1f}s, removed {original_seconds - kept_seconds:.0f}s of silence")
+        if not chunk_paths:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return chunk_paths
+    
+    def transcribe_chunks_with_openai(self, chunk_paths, on_chunk=None):
+        """Transcribe prepared audio chunks using OpenAI's Whisper API.
+        
+        Args:
+            chunk_paths (list): Paths to the audio chunks, in order
+            on_chunk (callable): Optional callback receiving (index, total, text)
+                                 as each chunk finishes
             
-            # If we have multiple chunks, transcribe each and combine
+        Returns:
+            str: Transcribed text
+        """
+        try:
+            # If we have multiple chunks, transcribe them in parallel and combine
             if len(chunk_paths) > 1:
-                transcripts = []
-                for i, chunk_path in enumerate(chunk_paths):
-                    print(f"Transcribing chunk {i+1}/{len(chunk_paths)}...")
-                    with open(chunk_path, "rb") as audio_file:
-                        response = self.client.audio.transcriptions.create(
-                            model="whisper-1",
-                            file=audio_file,
-                            language="pt"  # Portuguese (Brazil)
-                        )
-                    transcripts.append(response.text)
-                    
-                    # Clean up the chunk file if it's not the original
-                    if chunk_path != audio_file_path:
-                        os.unlink(chunk_path)
+                print(f"Transcribing {len(chunk_paths)} chunks "
+                      f"({min(self.max_concurrent_chunks, len(chunk_paths))} at a time)...")
+                transcripts = self._transcribe_chunks_concurrently(chunk_paths, on_chunk)
                 
                 # Combine all transcripts
                 return " ".join(transcripts)
             else:
                 # Single file case
-                with open(audio_file_path, "rb") as audio_file:
-                    response = self.client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        language="pt"  # Portuguese (Brazil)
-                    )
-                return response.text
+                transcript = self._transcribe_chunk_hedged(chunk_paths[0])
+                if on_chunk:
+                    on_chunk(0, 1, transcript)
+                return transcript
                 
         except Exception as e:
-            # Clean up any remaining chunk files
-            for path in chunk_paths:
-                if path != audio_file_path and os.path.exists(path):
-                    os.unlink(path)
-            
-            # Clean up the temp directory if it exists
-            if len(chunk_paths) > 1:
-                os.rmdir(os.path.dirname(chunk_paths[0]))
-                
             raise Exception(f"Error with OpenAI transcription: {e}")
     
-    def transcribe_with_local(self, audio_file_path):
-        """Transcribe audio using local speech recognition.
+    def transcribe_with_openai(self, audio_file_path):
+        """Transcribe audio using OpenAI's Whisper API.
         
         Args:
             audio_file_path (str): Path to the audio file
@@ -190,62 +719,100 @@ class AudioTranscriber:
         Returns:
             str: Transcribed text
         """
+        chunk_paths = []
+        try:
+            # Check file size and split if necessary
+            with TRANSCRIPTION_STEP_SECONDS.time("split_audio"), span("split_audio"):
+                chunk_paths = self.split_audio(audio_file_path)
+            return self.transcribe_chunks_with_openai(chunk_paths)
+        finally:
+            # Clean up the chunk files and their temp directory
+            self._cleanup_chunks(chunk_paths, audio_file_path)
+    
+    def transcribe_chunks_with_local(self, chunk_paths, on_chunk=None):
+        """Transcribe prepared audio chunks using local speech recognition.
+        
+        Args:
+            chunk_paths (list): Paths to the WAV chunks, in order
+            on_chunk (callable): Optional callback receiving (index, total, text)
+                                 as each chunk finishes
+            
+        Returns:
+            str: Transcribed text
+        """
+        import speech_recognition as sr
+        
         recognizer = sr.Recognizer()
         try:
-            # For local transcription, we'll also need to handle large files
-            chunk_paths = self.split_audio(audio_file_path)
             transcripts = []
             
             for i, chunk_path in enumerate(chunk_paths):
                 print(f"Transcribing chunk {i+1}/{len(chunk_paths)}...")
-                with sr.AudioFile(chunk_path) as source:
+                started = time.perf_counter()
+                with span("transcribe_chunk", {"chunk": os.path.basename(chunk_path), "model": "speech_recognition"}), \
+                        sr.AudioFile(chunk_path) as source:
                     audio_data = recognizer.record(source)
-                    text = recognizer.recognize_google(audio_data, language="pt-BR")
+                    text = recognizer.recognize_google(audio_data, language=f"{self.language}-BR" if self.language == "pt" else self.language)
                     transcripts.append(text)
-                
-                # Clean up the chunk file if it's not the original
-                if chunk_path != audio_file_path:
-                    os.unlink(chunk_path)
+                TRANSCRIPTION_CHUNK_SECONDS.observe(time.perf_counter() - started, "local")
+                TRANSCRIPTION_CHUNKS.inc("local", "ok")
+                if on_chunk:
+                    on_chunk(i, len(chunk_paths), text)
             
-            # Clean up the temp directory if it exists
-            if len(chunk_paths) > 1:
-                os.rmdir(os.path.dirname(chunk_paths[0]))
-                
             return " ".join(transcripts)
             
         except Exception as e:
-            # Clean up any remaining chunk files
-            for path in chunk_paths:
-                if path != audio_file_path and os.path.exists(path):
-                    os.unlink(path)
-            
-            # Clean up the temp directory if it exists
-            if len(chunk_paths) > 1 and os.path.exists(os.path.dirname(chunk_paths[0])):
-                os.rmdir(os.path.dirname(chunk_paths[0]))
-                
+            TRANSCRIPTION_CHUNKS.inc("local", "error")
+            ERRORS.inc("transcription", type(e).__name__)
             raise Exception(f"Error with local transcription: {e}")
     
-    def transcribe(self, audio_file_path):
+    def transcribe_with_local(self, audio_file_path):
+        """Transcribe audio using local speech recognition.
+        
+        Args:
+            audio_file_path (str): Path to the audio file
+            
+        Returns:
+            str: Transcribed text
+        """
+        chunk_paths = []
+        try:
+            # For local transcription, we'll also need to handle large files
+            with TRANSCRIPTION_STEP_SECONDS.time("split_audio"), span("split_audio"):
+                chunk_paths = self.split_audio(audio_file_path)
+            return self.transcribe_chunks_with_local(chunk_paths)
+        finally:
+            # Clean up the chunk files and their temp directory
+            self._cleanup_chunks(chunk_paths, audio_file_path)
+    
+    def transcribe(self, audio_file_path, stats=None, on_chunk=None):
         """Main method to transcribe an audio file.
         
         Args:
             audio_file_path (str): Path to the audio file
+            stats (dict): Optional dict filled with audio preparation statistics
+                          (see prepare_chunks)
+            on_chunk (callable): Optional callback receiving (index, total, text)
+                                 as each chunk is transcribed
             
         Returns:
             str: Transcribed text
         """
-        # Convert audio to WAV format
-        wav_file_path = self.convert_to_wav(audio_file_path)
+        # Convert and split the audio in a single ffmpeg pass
+        with TRANSCRIPTION_STEP_SECONDS.time("prepare_chunks"), span("prepare_chunks", {"codec": self.chunk_codec}):
+            chunk_paths = self.prepare_chunks(audio_file_path, stats)
+        if not chunk_paths:
+            # Nothing but silence
+            return ""
         
         try:
             # Choose transcription method
             if self.use_openai:
-                transcript = self.transcribe_with_openai(wav_file_path)
+                transcript = self.transcribe_chunks_with_openai(chunk_paths, on_chunk)
             else:
-                transcript = self.transcribe_with_local(wav_file_path)
+                transcript = self.transcribe_chunks_with_local(chunk_paths, on_chunk)
             
             return transcript
         finally:
-            # Clean up temporary file
-            if os.path.exists(wav_file_path):
-                os.unlink(wav_file_path) 
\ No newline at end of file
+            # Clean up the chunks and their temporary directory
+            self._cleanup_chunks(chunk_paths, audio_file_path)
@@ -0,0 +1,134 @@
+import numpy as np
+
+# Audio format produced by the transcription pipeline: 16 kHz, 16-bit mono PCM
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+# Analysis frame length for the energy detector
+FRAME_SECONDS = 0.03
+FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_SECONDS)
+
+
+class EnergyVAD:
+    """Energy-based voice activity detection on 16 kHz mono PCM.
+
+    Frames louder than an adaptive threshold (noise floor plus a margin) are
+    speech. Pauses longer than ``min_silence_seconds`` are dropped, keeping
+    ``padding_seconds`` of audio around the speech so words are not clipped.
+    """
+
+    def __init__(self, min_silence_seconds=1.0, padding_seconds=0.25, threshold_db=12.0,
+                 min_speech_db=-55.0):
+        """Initialize the detector.
+
+        Args:
+            min_silence_seconds (float): Shortest pause that is removed
+            padding_seconds (float): Audio kept on each side of a speech segment
+            threshold_db (float): Margin above the noise floor for a frame to count as speech
+            min_speech_db (float): Absolute level (dBFS) below which a frame is never speech
+        """
+        self.min_silence_seconds = min_silence_seconds
+        self.padding_seconds = padding_seconds
+        self.threshold_db = threshold_db
+        self.min_speech_db = min_speech_db
+
+    def frame_energies(self, pcm):
+        """Compute the RMS level of each complete frame.
+
+        Args:
+            pcm (numpy.ndarray): int16 samples; a length that is a multiple of FRAME_SAMPLES
+
+        Returns:
+            numpy.ndarray: Level of each frame in dBFS
+        """
+        frames = pcm[:len(pcm) - len(pcm) % FRAME_SAMPLES].astype(np.float32).reshape(-1, FRAME_SAMPLES)
+        rms = np.sqrt(np.mean(np.square(frames / 32768.0), axis=1))
+        return 20 * np.log10(np.maximum(rms, 1e-10))
+
+    def speech_segments(self, energies):
+        """Find the audio to keep.
+
+        Args:
+            energies (numpy.ndarray): Frame levels from frame_energies
+
+        Returns:
+            list: (start, end) times in seconds of the kept segments, in order
+        """
+        if len(energies) == 0:
+            return []
+
+        noise_floor = np.percentile(energies, 10)
+        speech = energies > max(noise_floor + self.threshold_db, self.min_speech_db)
+        if not speech.any():
+            return []
+
+        # Runs of speech frames, as [start, end) frame indices
+        padded = np.concatenate(([False], speech, [False]))
+        edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+        runs = edges.reshape(-1, 2)
+
+        # Merge runs separated by pauses shorter than min_silence_seconds
+        min_gap = int(round(self.min_silence_seconds / FRAME_SECONDS))
+        merged = [list(runs[0])]
+        for start, end in runs[1:]:
+            if start - merged[-1][1] < min_gap:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        total = len(energies) * FRAME_SECONDS
+        segments = []
+        for start, end in merged:
+            seg_start = max(0.0, float(start) * FRAME_SECONDS - self.padding_seconds)
+            seg_end = min(total, float(end) * FRAME_SECONDS + self.padding_seconds)
+            if segments and seg_start <= segments[-1][1]:
+                segments[-1] = (segments[-1][0], seg_end)
+            else:
+                segments.append((seg_start, seg_end))
+        return segments
+
+    def plan_chunks(self, segments, energies, max_chunk_seconds):
+        """Group kept segments into chunks with boundaries inside pauses.
+
+        Segments are packed greedily up to ``max_chunk_seconds``. A single
+        segment longer than that (continuous speech) is cut at its quietest
+        frame in the last quarter of the allowed length.
+
+        Args:
+            segments (list): (start, end) kept segments from speech_segments
+            energies (numpy.ndarray): Frame levels from frame_energies
+            max_chunk_seconds (float): Maximum kept audio per chunk
+
+        Returns:
+            list: One list of (start, end) source segments per chunk
+        """
+        chunks = []
+        current = []
+        current_seconds = 0.0
+
+        for start, end in segments:
+            while end - start > max_chunk_seconds:
+                if current:
+                    chunks.append(current)
+                    current, current_seconds = [], 0.0
+                cut = self._quietest_time(energies, start + max_chunk_seconds * 0.75, start + max_chunk_seconds)
+                chunks.append([(start, cut)])
+                start = cut
+
+            if current and current_seconds + (end - start) > max_chunk_seconds:
+                chunks.append(current)
+                current, current_seconds = [], 0.0
+            current.append((start, end))
+            current_seconds += end - start
+
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _quietest_time(self, energies, window_start, window_end):
+        """Time of the quietest frame between two times, in seconds."""
+        first = int(window_start / FRAME_SECONDS)
+        last = max(first + 1, int(window_end / FRAME_SECONDS))
+        window = energies[first:last]
+        if len(window) == 0:
+            return window_end
+        return float(first + int(np.argmin(window))) * FRAME_SECONDS